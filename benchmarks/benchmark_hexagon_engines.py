@@ -0,0 +1,60 @@
+"""
+Compare the two ``make_hexagon_overlay()`` engines.
+
+Builds hexagon grids of shrinking cell sizes over a square area
+with both the ``"sql"`` and ``"numpy"`` engines, and prints the
+runtime and cell count for each.
+
+Usage:
+
+    python benchmarks/benchmark_hexagon_engines.py [HOST] [AREA_KM]
+
+HOST is a profile in the configuration file (defaults to localhost)
+and AREA_KM is the side of the covered square in KM (defaults to 50).
+"""
+import sys
+import time
+
+from postgis_helpers import PostgreSQL, configurations
+
+EPSG = 26918  # UTM 18N, in meters
+CELL_SIZES = [1, 0.1, 0.01]
+
+
+def main(host: str = "localhost", area_km: float = 50) -> None:
+
+    db = PostgreSQL("pgis_benchmark_hexagons", verbosity="errors", **configurations()[host])
+
+    side = area_km * 1000
+    db.execute(
+        f"""
+        DROP TABLE IF EXISTS benchmark_area;
+        CREATE TABLE benchmark_area AS
+        SELECT
+            1 AS uid,
+            ST_MakeEnvelope(
+                500000, 4400000, {500000 + side}, {4400000 + side}, {EPSG}
+            )::geometry(POLYGON, {EPSG}) AS geom;
+    """
+    )
+
+    print(f"{'cell km2':>10} {'engine':>8} {'cells':>12} {'seconds':>10}")
+
+    for cell_size in CELL_SIZES:
+        for engine in ["sql", "numpy"]:
+            start_time = time.perf_counter()
+
+            db.make_hexagon_overlay(
+                "benchmark_hexagons", "benchmark_area", EPSG, cell_size, engine=engine
+            )
+
+            runtime = time.perf_counter() - start_time
+            cells = db.query_as_single_item("SELECT COUNT(*) FROM benchmark_hexagons")
+
+            print(f"{cell_size:>10} {engine:>8} {cells:>12,} {runtime:>10.2f}")
+
+    db.db_delete()
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *[float(arg) for arg in sys.argv[2:3]])
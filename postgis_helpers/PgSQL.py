@@ -13,24 +13,99 @@ Create a database and import a shapefile:
     >>> bike_gdf = db.query_as_geo_df("select * from bike_lanes")
 
 """
+from __future__ import annotations
+
+import io
 import os
+import json
+import re
+import math
+import hashlib
+import time
+import uuid
+import tempfile
 import subprocess
-import pandas as pd
-import geopandas as gpd
-
-import psycopg2
-import sqlalchemy
-from geoalchemy2 import Geometry, WKTElement
 
-from typing import Union
+from typing import Union, TYPE_CHECKING
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .sql_helpers import sql_hex_grid_function_definition
-from .general_helpers import now, report_time_delta, dt_as_time
+from .general_helpers import now, report_time_delta, dt_as_time, lazy_import
 from .geopandas_helpers import spatialize_point_dataframe
+from .grid_helpers import grid_as_ewkb, coordinates_to_h3
+from .io_helpers import (
+    copy_between_connections,
+    is_compressed,
+    CompressedWriter,
+    DecompressedReader,
+    verify_checksum,
+    COMPRESSION_EXTENSIONS,
+)
 from .console import _console, RichStyle, RichSyntax
 from .config_helpers import DEFAULT_DATA_INBOX, DEFAULT_DATA_OUTBOX
 
+# The heavy dependencies only load once a method actually uses them
+if TYPE_CHECKING:
+    import pandas as pd
+    import geopandas as gpd
+    import psycopg2
+    import sqlalchemy
+    import geoalchemy2
+    import shapely
+else:
+    pd = lazy_import("pandas")
+    gpd = lazy_import("geopandas")
+    psycopg2 = lazy_import("psycopg2")
+    sqlalchemy = lazy_import("sqlalchemy")
+    geoalchemy2 = lazy_import("geoalchemy2")
+    shapely = lazy_import("shapely")
+
+# New databases are cloned from this one. See PostgreSQL.db_template_ensure()
+TEMPLATE_DB = "template_postgis_helpers"
+
+# Postgres silently cuts longer names off (NAMEDATALEN - 1)
+MAX_IDENTIFIER_LENGTH = 63
+
+# Geometry types that make_geotable_from_query() can save
+VALID_GEOM_TYPES = [
+    "POINT",
+    "MULTIPOINT",
+    "POLYGON",
+    "MULTIPOLYGON",
+    "LINESTRING",
+    "MULTILINESTRING",
+]
+
+
+def _fit_identifier(base: str, suffix: str = "") -> str:
+    """
+    Join ``base`` and ``suffix`` into a name Postgres won't truncate.
+
+    Names that are too long keep their ``suffix``, but ``base`` is cut
+    short and followed by a hash of it, so two long names that start
+    the same way still come out different.
+
+    :param base: start of the name, e.g. a table or database name
+    :type base: str
+    :param suffix: end of the name, which is always kept, defaults to ""
+    :type suffix: str, optional
+    :return: name of at most ``MAX_IDENTIFIER_LENGTH`` characters
+    :rtype: str
+    """
+
+    name = f"{base}{suffix}"
+    if len(name) <= MAX_IDENTIFIER_LENGTH:
+        return name
+
+    digest = hashlib.md5(base.encode()).hexdigest()[:8]
+    keep = MAX_IDENTIFIER_LENGTH - len(suffix) - len(digest) - 1
+
+    if keep < 1:
+        raise ValueError(f"'{suffix}' is too long to fit in a Postgres identifier")
+
+    return f"{base[:keep]}_{digest}{suffix}"
+
 
 class PostgreSQL:
     """
@@ -60,6 +135,8 @@ class PostgreSQL:
         verbosity: str = "full",
         data_inbox: Path = DEFAULT_DATA_INBOX,
         data_outbox: Path = DEFAULT_DATA_OUTBOX,
+        lazy: bool = False,
+        create_if_missing: bool = True,
     ):
         """
         Initialize a database object with placeholder values.
@@ -86,6 +163,13 @@ class PostgreSQL:
                           defaults to ``"full"``. Other options include
                           ``"minimal"`` and ``"errors"``
         :type verbosity: str, optional
+        :param lazy: don't touch the cluster or the filesystem until
+                     this database is first used, defaults to False
+        :type lazy: bool, optional
+        :param create_if_missing: create the database if it doesn't
+                                  exist yet. If False, the existence
+                                  check is skipped entirely, defaults to True
+        :type create_if_missing: bool, optional
 
         TODO: add data box, print style, schema params
         """
@@ -100,10 +184,7 @@ class PostgreSQL:
         self.SUPER_USER = super_un
         self.SUPER_PASSWORD = super_pw
         self.ACTIVE_SCHEMA = active_schema
-
-        for folder in [data_inbox, data_outbox]:
-            if not folder.exists():
-                folder.mkdir(parents=True)
+        self.CREATE_IF_MISSING = create_if_missing
 
         self.DATA_INBOX = data_inbox
         self.DATA_OUTBOX = data_outbox
@@ -116,8 +197,38 @@ class PostgreSQL:
             msg = f"verbosity must be one of: {verbosity_options}"
             raise ValueError(msg)
 
-        if not self.exists():
-            self.db_create()
+        self._is_ready = False
+
+        if not lazy:
+            self.ensure_ready()
+
+    def ensure_ready(self) -> None:
+        """
+        Do the one-time setup for this database: make the data
+        folders and, if ``create_if_missing``, create the database
+        when it doesn't exist yet.
+
+        This runs from the constructor, or for ``lazy`` objects
+        the first time a connection to the database is made.
+        """
+
+        if self._is_ready:
+            return
+
+        # Flip the flag first: db_create() connects to this database too
+        self._is_ready = True
+
+        try:
+            for folder in [self.DATA_INBOX, self.DATA_OUTBOX]:
+                if not folder.exists():
+                    folder.mkdir(parents=True)
+
+            if self.CREATE_IF_MISSING and not self.exists():
+                self.db_create()
+
+        except Exception:
+            self._is_ready = False
+            raise
 
         msg = f":person_surfing::water_wave: {self.DATABASE} @ {self.HOST} :water_wave::water_wave:"
         self._print(3, msg)
@@ -331,6 +442,44 @@ class PostgreSQL:
 
         return result[0][0]
 
+    def query_as_generator(
+        self, query: str, batch_size: int = 10000, super_uri: bool = False
+    ):
+        """
+        Query the database and yield the result one row at a time.
+
+        Rows are fetched from a server-side cursor in batches of
+        ``batch_size``, so only one batch is ever held in memory.
+
+        :param query: any valid SQL query string
+        :type query: str
+        :param batch_size: number of rows to fetch per round-trip,
+                           defaults to 10000
+        :type batch_size: int, optional
+        :param super_uri: flag that will execute against the
+                          super db/user, defaults to False
+        :type super_uri: bool, optional
+        :return: generator that yields each row as a tuple
+        :rtype: generator
+        """
+        self._print(1, "... streaming query ...")
+        code_w_highlight = RichSyntax(query, "sql", theme="monokai", line_numbers=True)
+        self._print(1, code_w_highlight)
+
+        connection = psycopg2.connect(self.uri(super_uri=super_uri))
+
+        # A named cursor lives on the server and is read in chunks
+        cursor = connection.cursor(name="pgis_query_as_generator")
+        cursor.itersize = batch_size
+
+        try:
+            cursor.execute(query)
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+            connection.close()
+
     # EXECUTE queries to make them persistent
     # ---------------------------------------
 
@@ -366,16 +515,103 @@ class PostgreSQL:
         connection.commit()
         connection.close()
 
+    def execute_in_parallel(self, queries: list, workers: int = 4) -> list:
+        """
+        Execute a list of independent queries at the same time,
+        each one in its own transaction.
+
+        Connections come from a ``ThreadedConnectionPool`` that is
+        shared by all of the worker threads.
+
+        :param queries: list of valid SQL query strings
+        :type queries: list
+        :param workers: number of queries to run at once, defaults to 4
+        :type workers: int, optional
+        :raises RuntimeError: if any of the queries fail
+        :return: runtime of each query in seconds, in the same order
+        :rtype: list
+        """
+
+        from psycopg2.pool import ThreadedConnectionPool
+
+        self._print(1, f"... executing {len(queries)} queries with {workers} workers ...")
+
+        pool = ThreadedConnectionPool(1, workers, self.uri())
+
+        def execute_one(query):
+            start_time = time.perf_counter()
+
+            connection = pool.getconn()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                pool.putconn(connection)
+
+            return time.perf_counter() - start_time
+
+        runtimes = [None] * len(queries)
+        failures = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(execute_one, query): idx for idx, query in enumerate(queries)
+                }
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    if future.exception():
+                        failures[idx] = future.exception()
+                    else:
+                        runtimes[idx] = future.result()
+        finally:
+            pool.closeall()
+
+        if failures:
+            for idx, error in failures.items():
+                self._print(3, f"Query {idx} failed: {error}")
+            raise RuntimeError(f"{len(failures)} of {len(queries)} queries failed")
+
+        return runtimes
+
+    def _execute_without_transaction(self, query: str) -> None:
+        """
+        Execute a query against this database (not the super db)
+        outside of a transaction block. This is needed for commands like
+        ``CREATE INDEX CONCURRENTLY`` and ``VACUUM``.
+
+        :param query: any valid SQL query string
+        :type query: str
+        """
+
+        self._print(1, "... executing outside of a transaction ...")
+
+        connection = psycopg2.connect(self.uri())
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+        finally:
+            connection.close()
+
     # DATABASE-level helper functions
     # -------------------------------
 
-    def uri(self, super_uri: bool = False) -> str:
+    def uri(self, super_uri: bool = False, database: str = None) -> str:
         """
         Create a connection string URI for this database.
 
         :param super_uri: Flag that will provide access to cluster
                           root if True, defaults to False
         :type super_uri: bool, optional
+        :param database: connect to a different database on the
+                         same cluster, defaults to None
+        :type database: str, optional
         :return: Connection string URI for PostgreSQL
         :rtype: str
         """
@@ -384,13 +620,16 @@ class PostgreSQL:
         if super_uri:
             user = self.SUPER_USER
             pw = self.SUPER_PASSWORD
-            database = self.SUPER_DB
+            database = database or self.SUPER_DB
 
         # Otherwise, use the normal connection info
         else:
+            if not database:
+                self.ensure_ready()
+
             user = self.USER
             pw = self.PASSWORD
-            database = self.DATABASE
+            database = database or self.DATABASE
 
         connection_string = f"postgresql://{user}:{pw}@{self.HOST}:{self.PORT}/{database}"
 
@@ -415,9 +654,17 @@ class PostgreSQL:
         """
         return self.query_as_single_item(sql_db_exists, super_uri=True)
 
-    def db_create(self) -> None:
+    def db_create(self, use_template: bool = True) -> None:
         """
         Create this database if it doesn't exist yet
+
+        By default the new database is cloned from the
+        ``template_postgis_helpers`` database, which already has PostGIS
+        and the helper functions installed. If the template can't be
+        used, the database is built up from scratch instead.
+
+        :param use_template: clone the template database, defaults to True
+        :type use_template: bool, optional
         """
 
         if self.exists():
@@ -425,6 +672,17 @@ class PostgreSQL:
         else:
             self._print(3, f"Creating database: {self.DATABASE} on {self.HOST}")
 
+            if use_template:
+                try:
+                    self.db_template_ensure()
+
+                    sql_make_db = f"CREATE DATABASE {self.DATABASE} TEMPLATE {TEMPLATE_DB};"
+                    self.execute(sql_make_db, autocommit=True)
+                    return
+
+                except psycopg2.Error as e:
+                    self._print(1, f"Could not use {TEMPLATE_DB}, building from scratch: {e}")
+
             sql_make_db = f"CREATE DATABASE {self.DATABASE};"
 
             self.execute(sql_make_db, autocommit=True)
@@ -442,6 +700,71 @@ class PostgreSQL:
             self._print(1, "Installing custom hexagon grid function")
             self.execute(sql_hex_grid_function_definition)
 
+    def _template_stamp(self) -> str:
+        """
+        Get the stamp that an up-to-date template database carries:
+        a hash of the helper function definitions and PostGIS version.
+        """
+
+        sql_postgis_version = """
+            SELECT default_version FROM pg_available_extensions WHERE name = 'postgis';
+        """
+        postgis_version = self.query_as_list(sql_postgis_version, super_uri=True)
+
+        version_source = sql_hex_grid_function_definition + str(postgis_version)
+        version = hashlib.md5(version_source.encode()).hexdigest()[:12]
+
+        return f"postgis_helpers {version}"
+
+    def db_template_ensure(self) -> None:
+        """
+        Make sure the ``template_postgis_helpers`` database exists and
+        is up to date, rebuilding it if needed.
+
+        The template is stamped (with ``COMMENT ON DATABASE``) with a
+        hash of the helper function definitions and the cluster's
+        PostGIS version. The stamp goes on last, so a template from an
+        interrupted build, or from an older version of this package,
+        gets rebuilt.
+
+        The template is built by the super user, so ``hex_grid()``
+        (and PostGIS) in every database cloned from it are owned by
+        the super user rather than by ``USER``.
+        """
+
+        stamp = self._template_stamp()
+
+        sql_template_stamp = f"""
+            SELECT shobj_description(oid, 'pg_database')
+            FROM pg_database
+            WHERE datname = '{TEMPLATE_DB}';
+        """
+        current_stamp = self.query_as_list(sql_template_stamp, super_uri=True)
+
+        if current_stamp and current_stamp[0][0] == stamp:
+            return
+
+        self._print(2, f"Building {TEMPLATE_DB} on {self.HOST}")
+
+        # CREATE/DROP DATABASE can't share a transaction with anything else
+        if current_stamp:
+            self.execute(f"ALTER DATABASE {TEMPLATE_DB} IS_TEMPLATE false;", autocommit=True)
+            self.execute(f"DROP DATABASE {TEMPLATE_DB};", autocommit=True)
+
+        self.execute(f"CREATE DATABASE {TEMPLATE_DB};", autocommit=True)
+
+        connection = psycopg2.connect(self.uri(super_uri=True, database=TEMPLATE_DB))
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
+                cursor.execute(sql_hex_grid_function_definition)
+            connection.commit()
+        finally:
+            connection.close()
+
+        self.execute(f"COMMENT ON DATABASE {TEMPLATE_DB} IS '{stamp}';", autocommit=True)
+        self.execute(f"ALTER DATABASE {TEMPLATE_DB} IS_TEMPLATE true;", autocommit=True)
+
     def db_delete(self) -> None:
         """Delete this database (if it exists)"""
 
@@ -452,22 +775,150 @@ class PostgreSQL:
             sql_drop_db = f"DROP DATABASE {self.DATABASE};"
             self.execute(sql_drop_db, autocommit=True)
 
+    def _run_command(
+        self, command: list, stdout=None, write_to=None, read_from=None
+    ) -> str:
+        """
+        Run a command-line utility like ``pg_dump`` or ``pg_restore``.
+
+        ``stderr`` is captured and, if the command fails, printed out
+        and raised with a ``subprocess.CalledProcessError``. Only the
+        program name goes into the error, since the rest of the command
+        usually holds a connection URI with a password in it.
+
+        The command's output can be streamed into any object with a
+        ``write()`` method, and its input can be streamed from any
+        object with a ``read()`` method, one chunk at a time.
+
+        :param command: the program and its arguments
+        :type command: list
+        :param stdout: where ``stdout`` goes when it isn't streamed,
+                       defaults to None (inherit)
+        :param write_to: file-like object to stream ``stdout`` into
+        :param read_from: file-like object to stream ``stdin`` from
+        :return: whatever the command wrote to ``stderr``
+        :rtype: str
+        """
+
+        chunk_size = 1 << 20
+
+        # stderr goes to a file so a chatty command can't fill the pipe and stall
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE if read_from else None,
+                stdout=subprocess.PIPE if write_to else stdout,
+                stderr=stderr_file,
+            )
+
+            if write_to:
+                for chunk in iter(lambda: process.stdout.read(chunk_size), b""):
+                    write_to.write(chunk)
+
+            if read_from:
+                try:
+                    for chunk in iter(lambda: read_from.read(chunk_size), b""):
+                        process.stdin.write(chunk)
+                    process.stdin.close()
+                except BrokenPipeError:
+                    # The command died early; its exit code says why
+                    pass
+
+            returncode = process.wait()
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace")
+
+        if returncode != 0:
+            self._print(3, f"{command[0]} failed with exit code {returncode}")
+            self._print(3, stderr)
+            raise subprocess.CalledProcessError(returncode, command[0], stderr=stderr)
+
+        return stderr
+
     @timer
-    def db_export_pgdump_file(self, output_folder: Path = None) -> Path:
+    def db_export_pgdump_file(
+        self,
+        output_folder: Path = None,
+        dump_format: str = "plain",
+        jobs: int = 1,
+        compression_level: int = None,
+        compress: str = None,
+        tables: list = None,
+        schemas: list = None,
+        exclude_tables: list = None,
+        return_stats: bool = False,
+    ) -> Path:
         """
-        Save this database to a ``.sql`` file.
+        Save this database with ``pg_dump``.
         Requires ``pg_dump`` to be accessible via the command line.
 
+        The ``dump_format`` can be:
+            - ``"plain"``: a ``.sql`` file (the default)
+            - ``"custom"``: a compressed ``.dump`` archive
+            - ``"directory"``: a folder with one file per table, which
+              can be dumped and restored with ``jobs`` parallel workers
+
+        With ``compress="zstd"`` or ``compress="gzip"`` the output of
+        ``pg_dump`` is compressed as it streams to disk (``zstd`` uses
+        every core), and a SHA-256 of the compressed file is written to
+        a ``.sha256`` sidecar next to it.
+
+        Use ``tables``, ``schemas`` and ``exclude_tables`` to only dump
+        part of the database. Table names can be schema-qualified, and
+        ``pg_dump`` patterns like ``"crash_*"`` work too.
 
-        :param output_folder: Folder path to write .sql file to
+        :param output_folder: Folder path to write the dump to
         :type output_folder: pathlib.Path
-        :return: Filepath to SQL file that was created
-        :rtype: str
+        :param dump_format: ``"plain"``, ``"custom"`` or ``"directory"``,
+                            defaults to ``"plain"``
+        :type dump_format: str, optional
+        :param jobs: number of tables to dump at once. Only works with
+                     ``dump_format="directory"``, defaults to 1
+        :type jobs: int, optional
+        :param compression_level: passed to ``pg_dump -Z``, or to the
+                                  ``compress`` codec when one is used.
+                                  Defaults to the tool's own default
+        :type compression_level: int, optional
+        :param compress: ``"zstd"`` or ``"gzip"`` to stream the dump through
+                         a compressor, defaults to None
+        :type compress: str, optional
+        :param tables: only dump these tables, defaults to None
+        :type tables: list, optional
+        :param schemas: only dump these schemas, defaults to None
+        :type schemas: list, optional
+        :param exclude_tables: skip these tables, defaults to None
+        :type exclude_tables: list, optional
+        :param return_stats: also return a dictionary with the
+                             size and runtime of the dump, defaults to False
+        :type return_stats: bool, optional
+        :return: Filepath to the dump that was created, plus the stats
+                 dictionary if ``return_stats=True``
+        :rtype: Path
         """
 
+        format_options = {
+            "plain": ("p", ".sql"),
+            "custom": ("c", ".dump"),
+            "directory": ("d", ""),
+        }
+
+        if dump_format not in format_options:
+            raise ValueError(f"dump_format must be one of: {list(format_options)}")
+
+        if jobs > 1 and dump_format != "directory":
+            raise ValueError('jobs > 1 requires dump_format="directory"')
+
+        if compress and dump_format == "directory":
+            raise ValueError('compress can not be used with dump_format="directory"')
+
         if not output_folder:
             output_folder = self.DATA_OUTBOX
 
+        output_folder = Path(output_folder)
+        if not output_folder.exists():
+            output_folder.mkdir(parents=True)
+
         # Get a string for today's date and time,
         # like '2020_06_10' and '14_13_38'
         rightnow = str(now())
@@ -475,44 +926,504 @@ class PostgreSQL:
         timestamp = rightnow.split(" ")[1].replace(":", "_").split(".")[0]
 
         # Use pg_dump to save the database to disk
-        sql_name = f"{self.DATABASE}_d_{today}_t_{timestamp}.sql"
-        sql_file = output_folder / sql_name
+        format_flag, extension = format_options[dump_format]
+        dump_name = f"{self.DATABASE}_d_{today}_t_{timestamp}{extension}"
+        if compress:
+            dump_name += COMPRESSION_EXTENSIONS[compress]
+        dump_path = output_folder / dump_name
+
+        self._print(2, f"Exporting {self.DATABASE} to {dump_path}")
+
+        command = ["pg_dump", f"--dbname={self.uri()}", f"-F{format_flag}"]
+
+        if jobs > 1:
+            command += ["-j", str(jobs)]
+
+        for flag, values in [("-t", tables), ("-n", schemas), ("-T", exclude_tables)]:
+            for value in values or []:
+                command += [flag, value]
+
+        start_time = time.perf_counter()
+        checksum = None
+
+        if compress:
+            # Don't compress twice: the custom format compresses by default
+            if dump_format == "custom":
+                command += ["-Z", "0"]
 
-        self._print(2, f"Exporting {self.DATABASE} to {sql_file}")
+            # A failed dump is deleted, rather than saved with a sidecar that matches it
+            writer = CompressedWriter(dump_path, compress, level=compression_level)
+            try:
+                self._run_command(command, write_to=writer)
+            except BaseException:
+                writer.discard()
+                raise
 
-        system_call = f'pg_dump {self.uri()} > "{sql_file}" '
-        os.system(system_call)
+            checksum = writer.close()
 
-        return sql_file
+        else:
+            if compression_level is not None:
+                command += ["-Z", str(compression_level)]
+
+            self._run_command(command + ["-f", str(dump_path)])
+
+        if dump_path.is_dir():
+            dump_size = sum(f.stat().st_size for f in dump_path.iterdir())
+        else:
+            dump_size = dump_path.stat().st_size
+
+        stats = {
+            "path": dump_path,
+            "format": dump_format,
+            "jobs": jobs,
+            "compression_level": compression_level,
+            "compress": compress,
+            "bytes": dump_size,
+            "sha256": checksum,
+            "seconds": time.perf_counter() - start_time,
+        }
+
+        self._print(1, f"Dump is {dump_size / 1e6:.1f} MB")
+
+        if return_stats:
+            return dump_path, stats
+
+        return dump_path
 
     @timer
-    def db_load_pgdump_file(self, sql_dump_filepath: Path, overwrite: bool = True) -> None:
+    def db_load_pgdump_file(
+        self,
+        sql_dump_filepath: Path,
+        overwrite: bool = True,
+        jobs: int = 1,
+        tables: list = None,
+        schemas: list = None,
+        exclude_tables: list = None,
+        shadow: bool = False,
+    ) -> None:
         """
-        Populate the database by loading from a SQL file that
+        Populate the database by loading from a file or folder that
         was previously created by ``pg_dump``.
 
-        :param sql_dump_filepath: filepath to the ``.sql`` dump file
+        Plain ``.sql`` files are loaded with ``psql`` in a single
+        transaction, which stops at the first error. Archives made
+        with ``dump_format="custom"`` or ``dump_format="directory"`` are loaded
+        with ``pg_restore``, using ``jobs`` parallel workers.
+
+        ``.gz`` and ``.zst`` files are decompressed as they stream into
+        ``psql`` / ``pg_restore``, with no temporary file. If there is a
+        ``.sha256`` sidecar, the checksum is verified before the existing
+        database is dropped, and again as the file streams in. Archives
+        read this way are restored with a single worker.
+
+        Passing ``tables``, ``schemas`` or ``exclude_tables`` restores
+        only those tables and leaves the rest of the database online.
+        See ``db_load_tables_from_pgdump_file()``.
+
+        ``shadow=True`` keeps the database online during a full
+        restore. See ``db_load_pgdump_file_via_shadow()``.
+
+        :param sql_dump_filepath: filepath to the dump file or folder
         :type sql_dump_filepath: Union[Path, str]
         :param overwrite: flag that controls whether or not this
                           function will replace the existing database
         :type overwrite: bool
+        :param jobs: number of tables to restore at once. Only used
+                     for ``pg_restore`` archives, defaults to 1
+        :type jobs: int, optional
+        :param tables: only restore these tables, defaults to None
+        :type tables: list, optional
+        :param schemas: only restore tables in these schemas, defaults to None
+        :type schemas: list, optional
+        :param exclude_tables: don't restore these tables, defaults to None
+        :type exclude_tables: list, optional
+        :param shadow: restore into a copy and swap it in when done,
+                       defaults to False
+        :type shadow: bool, optional
         """
 
-        if self.exists():
-            if overwrite:
-                self.db_delete()
-                self.db_create()
+        sql_dump_filepath = Path(sql_dump_filepath)
+
+        if shadow:
+            self.db_load_pgdump_file_via_shadow(sql_dump_filepath, jobs=jobs)
+            return
+
+        if tables or schemas or exclude_tables:
+            self.db_load_tables_from_pgdump_file(
+                sql_dump_filepath,
+                tables=tables,
+                schemas=schemas,
+                exclude_tables=exclude_tables,
+                jobs=jobs,
+            )
+            return
+
+        if not overwrite and self.exists():
+            self._print(
+                3,
+                f"Database named {self.DATABASE} already exists and overwrite=False!",
+            )
+            return
+
+        reader = None
+
+        if sql_dump_filepath.is_dir():
+            is_archive = True
+        elif is_compressed(sql_dump_filepath):
+            # Check the file before anything is dropped
+            verify_checksum(sql_dump_filepath)
+
+            reader = DecompressedReader(sql_dump_filepath)
+            is_archive = reader.peek(5) == b"PGDMP"
+        else:
+            # Custom-format archives start with these magic bytes
+            with open(sql_dump_filepath, "rb") as open_file:
+                is_archive = open_file.read(5) == b"PGDMP"
+
+        self.db_delete()
+
+        # A plain dump recreates PostGIS and hex_grid() as the user running
+        # psql, so it gets a database where that user owns both already
+        self.db_create(use_template=is_archive)
+
+        self._print(2, f"Loading {self.DATABASE} from {sql_dump_filepath}")
+
+        if is_archive:
+            # db_create() already installed PostGIS and hex_grid(),
+            # so clean those out before the archive recreates them
+            command = [
+                "pg_restore",
+                f"--dbname={self.uri()}",
+                "--clean",
+                "--if-exists",
+                "--no-owner",
+            ]
+            # pg_restore can only run in parallel on a seekable file
+            if not reader:
+                command += ["-j", str(jobs), str(sql_dump_filepath)]
+        else:
+            # The dump creates hex_grid() without OR REPLACE
+            self.execute("DROP FUNCTION IF EXISTS hex_grid;")
+
+            # Stop at the first failed statement, and roll the whole load
+            # back, so a broken dump fails instead of half-loading
+            command = [
+                "psql",
+                "-X",
+                "-q",
+                "-v",
+                "ON_ERROR_STOP=1",
+                "--single-transaction",
+                f"--dbname={self.uri()}",
+            ]
+            if not reader:
+                command += ["-f", str(sql_dump_filepath)]
+
+        if reader:
+            try:
+                self._run_command(command, stdout=subprocess.DEVNULL, read_from=reader)
+            except BaseException:
+                # Keep the command's error, rather than a checksum error from close()
+                reader.discard()
+                raise
+
+            reader.close()
+        else:
+            self._run_command(command, stdout=subprocess.DEVNULL)
+
+    @timer
+    def db_load_pgdump_file_via_shadow(
+        self, sql_dump_filepath: Path, jobs: int = 1, force: bool = False
+    ) -> str:
+        """
+        Restore a dump without taking this database offline.
+
+        The dump is loaded into a shadow database on the same cluster.
+        Its row counts are then checked against the live database: every
+        live table must exist in the shadow, and no table that has rows
+        now may come back empty. If that passes, connections are closed
+        and the two databases swap names in one transaction.
+
+        The old database is kept under a timestamped name, so rolling
+        back is just another rename. Long database names are shortened
+        (with a hash) so the name returned is the one that exists.
+
+        If the load or the check fails, the live database is left
+        alone and the shadow is kept for a look.
+
+        :param sql_dump_filepath: filepath to the dump file or folder
+        :type sql_dump_filepath: Union[Path, str]
+        :param jobs: passed on to ``db_load_pgdump_file()``, defaults to 1
+        :type jobs: int, optional
+        :param force: swap even if the row count check fails,
+                      defaults to False
+        :type force: bool, optional
+        :return: name the old database was kept under, or None if
+                 there was no database to replace
+        :rtype: str
+        """
+
+        shadow_db = PostgreSQL(
+            _fit_identifier(self.DATABASE, "_pgis_shadow"),
+            verbosity=self.VERBOSITY,
+            **self.connection_details(),
+        )
+
+        shadow_db.db_load_pgdump_file(sql_dump_filepath, overwrite=True, jobs=jobs)
+
+        if not self.exists():
+            self._db_rename({shadow_db.DATABASE: self.DATABASE})
+            return None
+
+        live_counts = self.table_row_counts_as_dict()
+        shadow_counts = shadow_db.table_row_counts_as_dict()
+
+        problems = []
+        for table_name, live_count in live_counts.items():
+            if table_name not in shadow_counts:
+                problems.append(f"{table_name} is missing")
+            elif live_count > 0 and shadow_counts[table_name] == 0:
+                problems.append(f"{table_name} has 0 rows, down from {live_count}")
             else:
-                self._print(
-                    3,
-                    f"Database named {self.DATABASE} already exists and overwrite=False!",
-                )
+                msg = f"{table_name}: {live_count} -> {shadow_counts[table_name]} rows"
+                self._print(1, msg)
+
+        if problems and not force:
+            for problem in problems:
+                self._print(3, problem)
+            raise RuntimeError(
+                f"{shadow_db.DATABASE} failed validation and was not swapped in"
+            )
+
+        # Like 'mydb_pgis_old_20200610_141338', shortened to fit if needed
+        old_name = _fit_identifier(self.DATABASE, f"_pgis_old_{now():%Y%m%d_%H%M%S}")
+
+        self._db_rename({self.DATABASE: old_name, shadow_db.DATABASE: self.DATABASE})
+
+        self._print(2, f"Swapped in the restored {self.DATABASE}, old copy kept as {old_name}")
+
+        return old_name
+
+    def _db_rename(self, renames: dict, attempts: int = 10) -> None:
+        """
+        Rename one or more databases in a single transaction.
+
+        Databases can't be renamed while anyone is connected to them,
+        so their connections are terminated first. Terminated backends
+        take a moment to exit, so this is retried a few times.
+
+        :param renames: ``{old_name: new_name}``, applied in order
+        :type renames: dict
+        """
+
+        db_names = ", ".join([f"'{name}'" for name in renames])
+
+        sql_rename = f"""
+            SELECT pg_terminate_backend(pid)
+            FROM pg_stat_activity
+            WHERE datname IN ({db_names}) AND pid <> pg_backend_pid();
+        """
+        for old_name, new_name in renames.items():
+            sql_rename += f"ALTER DATABASE {old_name} RENAME TO {new_name};"
+
+        for attempt in range(attempts):
+            try:
+                self.execute(sql_rename, autocommit=True)
                 return
+            except psycopg2.OperationalError as e:
+                # 55006 = object_in_use, i.e. a backend hasn't exited yet
+                if e.pgcode != "55006" or attempt == attempts - 1:
+                    raise
+                time.sleep(0.5)
 
-        self._print(2, f"Loading {self.DATABASE} from {sql_dump_filepath}")
+    def table_row_counts_as_dict(self) -> dict:
+        """
+        Count the rows in every table in the database.
+        Return value is formatted as: ``{schema.table_name: row_count}``
+
+        These are exact counts, so this reads every table in full.
+
+        :return: Dictionary with table names as keys
+                 and row counts as values
+        :rtype: dict
+        """
+
+        sql_base_tables = """
+            SELECT table_schema, table_name
+            FROM information_schema.tables
+            WHERE table_type = 'BASE TABLE'
+                AND table_schema NOT IN ('pg_catalog', 'information_schema');
+        """
+
+        table_names = [f"{t[0]}.{t[1]}" for t in self.query_as_list(sql_base_tables)]
+
+        if not table_names:
+            return {}
+
+        sql_counts = " UNION ALL ".join(
+            [f"SELECT '{name}', COUNT(*) FROM {name}" for name in table_names]
+        )
 
-        system_command = f'psql "{self.uri()}" <  "{sql_dump_filepath}"'
-        os.system(system_command)
+        return dict(self.query_as_list(sql_counts))
+
+    @timer
+    def db_load_tables_from_pgdump_file(
+        self,
+        sql_dump_filepath: Path,
+        tables: list = None,
+        schemas: list = None,
+        exclude_tables: list = None,
+        jobs: int = 1,
+    ) -> list:
+        """
+        Restore some tables from a dump without touching the
+        rest of the database.
+
+        The dump is loaded into a scratch database on the same cluster.
+        Each selected table is copied from there into a staging schema
+        named ``pgis_staging_<schema>``. Once all of them are in, they
+        are swapped into place in a single transaction, so readers see
+        either the old tables or the new ones.
+
+        Nothing outside the restored tables is dropped. If a view or a
+        foreign key elsewhere in the database depends on one of them, a
+        ``ValueError`` listing the dependents is raised before anything
+        is copied.
+
+        :param sql_dump_filepath: filepath to the dump file or folder
+        :type sql_dump_filepath: Union[Path, str]
+        :param tables: names of tables to restore. Names can be
+                       schema-qualified. Defaults to every table
+        :type tables: list, optional
+        :param schemas: only restore tables in these schemas,
+                        defaults to None
+        :type schemas: list, optional
+        :param exclude_tables: tables to leave alone, defaults to None
+        :type exclude_tables: list, optional
+        :param jobs: passed on to ``db_load_pgdump_file()``, defaults to 1
+        :type jobs: int, optional
+        :return: list of ``schema.table`` names that were restored
+        :rtype: list
+        """
+
+        def matches(schema, table_name, names):
+            return table_name in names or f"{schema}.{table_name}" in names
+
+        scratch_db = PostgreSQL(
+            _fit_identifier(self.DATABASE, "_pgis_restore"),
+            verbosity=self.VERBOSITY,
+            **self.connection_details(),
+        )
+
+        try:
+            scratch_db.db_load_pgdump_file(sql_dump_filepath, overwrite=True, jobs=jobs)
+
+            sql_base_tables = """
+                SELECT table_schema, table_name
+                FROM information_schema.tables
+                WHERE table_type = 'BASE TABLE'
+                    AND table_schema NOT IN ('pg_catalog', 'information_schema')
+                    AND table_name != 'spatial_ref_sys';
+            """
+
+            selected = []
+
+            for schema, table_name in scratch_db.query_as_list(sql_base_tables):
+                if schemas and schema not in schemas:
+                    continue
+                if tables and not matches(schema, table_name, tables):
+                    continue
+                if exclude_tables and matches(schema, table_name, exclude_tables):
+                    continue
+
+                selected.append((schema, table_name))
+
+            dependents = self._restore_dependents(selected)
+            if dependents:
+                raise ValueError(
+                    f"Can't restore {self.DATABASE} tables, these depend on them: {dependents}"
+                )
+
+            self._print(2, f"Restoring {len(selected)} tables into {self.DATABASE}")
+
+            # Stage every table first, so the swap itself is quick
+            for schema, table_name in selected:
+                # "copy" keeps postgres_fdw objects for the scratch DB out of this one
+                scratch_db.transfer_data_to_another_db(
+                    table_name,
+                    self,
+                    schema=schema,
+                    target_schema=f"pgis_staging_{schema}",
+                    mode="copy",
+                    foreign_keys=False,
+                )
+
+            # Keys between the restored tables, added back after the swap
+            sql_foreign_keys = scratch_db._foreign_key_ddl(selected)
+
+        finally:
+            scratch_db.db_delete()
+
+        # One DROP for every table, so foreign keys between the old tables
+        # don't need CASCADE. Anything else depending on them makes the
+        # DROP (and the whole swap) fail, instead of being dropped too.
+        # The restored tables' own keys are added once they're in place
+        sql_swap = ""
+        if selected:
+            qualified = ", ".join(f"{schema}.{table_name}" for schema, table_name in selected)
+            sql_swap += f"DROP TABLE IF EXISTS {qualified};"
+
+        for schema, table_name in selected:
+            sql_swap += f"""
+                CREATE SCHEMA IF NOT EXISTS {schema};
+                ALTER TABLE pgis_staging_{schema}.{table_name} SET SCHEMA {schema};
+            """
+
+        for schema in set(schema for schema, _ in selected):
+            sql_swap += f"DROP SCHEMA IF EXISTS pgis_staging_{schema} CASCADE;"
+
+        sql_swap += sql_foreign_keys
+
+        if sql_swap:
+            self.execute(sql_swap)
+
+        return [f"{schema}.{table_name}" for schema, table_name in selected]
+
+    def _restore_dependents(self, tables: list) -> list:
+        """
+        Find the views and foreign keys that depend on any of these
+        ``(schema, table_name)`` tables, other than the tables themselves.
+
+        :return: sorted list of the dependent relations
+        :rtype: list
+        """
+
+        if not tables:
+            return []
+
+        names = ", ".join(f"'{schema}.{table_name}'" for schema, table_name in tables)
+
+        sql_dependents = f"""
+            WITH restored AS (
+                SELECT to_regclass(name) AS oid
+                FROM unnest(ARRAY[{names}]) AS name
+                WHERE to_regclass(name) IS NOT NULL
+            )
+            SELECT r.ev_class::regclass::text
+            FROM pg_depend d
+            JOIN pg_rewrite r ON r.oid = d.objid
+            WHERE d.classid = 'pg_rewrite'::regclass
+                AND d.refobjid IN (SELECT oid FROM restored)
+                AND r.ev_class NOT IN (SELECT oid FROM restored)
+            UNION
+            SELECT conrelid::regclass::text
+            FROM pg_constraint
+            WHERE contype = 'f'
+                AND confrelid IN (SELECT oid FROM restored)
+                AND conrelid NOT IN (SELECT oid FROM restored);
+        """
+
+        return sorted(row[0] for row in self.query_as_list(sql_dependents))
 
     # LISTS of things inside this database (or the cluster at large)
     # --------------------------------------------------------------
@@ -566,6 +1477,60 @@ class PostgreSQL:
 
         return {t[0]: t[1] for t in spatial_tables}
 
+    def all_materialized_views_as_dict(self, schema: str = None) -> dict:
+        """
+        Get every materialized view in a schema, along with the other
+        materialized views in that schema it reads from (including
+        through regular views). Return value is formatted as:
+        ``{view_name: [views it depends on]}``
+
+        :return: Dictionary with view names as keys
+                 and lists of view names as values
+        :rtype: dict
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        # Each view's query is stored as a rewrite rule, which
+        # depends on every relation that the query reads from
+        sql_matview_dependencies = f"""
+            WITH RECURSIVE reads AS (
+                SELECT DISTINCT r.ev_class AS reader, d.refobjid AS source
+                FROM pg_depend d
+                JOIN pg_rewrite r ON r.oid = d.objid
+                WHERE d.classid = 'pg_rewrite'::regclass
+                  AND d.refclassid = 'pg_class'::regclass
+                  AND d.refobjid <> r.ev_class
+            ),
+            upstream AS (
+                SELECT reads.reader AS matview, reads.source
+                FROM reads
+                JOIN pg_class c ON c.oid = reads.reader AND c.relkind = 'm'
+                UNION
+                SELECT upstream.matview, reads.source
+                FROM upstream
+                JOIN pg_class c ON c.oid = upstream.source AND c.relkind = 'v'
+                JOIN reads ON reads.reader = upstream.source
+            )
+            SELECT m.relname::text,
+                   COALESCE(
+                       array_agg(DISTINCT s.relname::text)
+                           FILTER (WHERE s.relkind = 'm' AND s.relnamespace = m.relnamespace),
+                       '{{}}'
+                   )
+            FROM pg_class m
+            JOIN pg_namespace n ON n.oid = m.relnamespace
+            LEFT JOIN upstream u ON u.matview = m.oid
+            LEFT JOIN pg_class s ON s.oid = u.source
+            WHERE m.relkind = 'm' AND n.nspname = '{schema}'
+            GROUP BY m.relname;
+        """
+
+        views = self.query_as_list(sql_matview_dependencies)
+
+        return {v[0]: list(v[1]) for v in views}
+
     def all_databases_on_cluster_as_list(self) -> list:
         """
         Get a list of all databases on this SQL cluster.
@@ -585,20 +1550,70 @@ class PostgreSQL:
 
         return [d[0] for d in database_list]
 
-    # TABLE-level helper functions
-    # ----------------------------
-
-    def table_columns_as_list(self, table_name: str, schema: str = None) -> list:
+    def all_database_sizes_as_dict(self) -> dict:
         """
-        Get a list of all columns in a table.
+        Get the size on disk of every database on this SQL cluster,
+        largest first. Return value is formatted as: ``{db_name: bytes}``
 
-        :param table_name: Name of the table
-        :type table_name: str
-        :return: List of all columns in a table
-        :rtype: list
+        :return: Dictionary with database names as keys
+                 and sizes in bytes as values
+        :rtype: dict
         """
 
-        if not schema:
+        sql_database_sizes = f"""
+            SELECT datname, pg_database_size(datname)
+            FROM pg_database
+            WHERE datistemplate = false
+                AND datname != '{self.SUPER_DB}'
+                AND LEFT(datname, 1) != '_'
+            ORDER BY 2 DESC;
+        """
+
+        database_sizes = self.query_as_list(sql_database_sizes, super_uri=True)
+
+        return {d[0]: d[1] for d in database_sizes}
+
+    def all_database_fingerprints_as_dict(self) -> dict:
+        """
+        Get a change fingerprint for every database on this SQL cluster.
+        Return value is formatted as: ``{db_name: fingerprint}``
+
+        The fingerprint is built from the insert, update and delete
+        counters in ``pg_stat_database``, plus the time those counters
+        were last reset. Any write to a database (including DDL, which
+        writes to the system catalogs) moves the fingerprint.
+
+        :return: Dictionary with database names as keys
+                 and fingerprint strings as values
+        :rtype: dict
+        """
+
+        sql_fingerprints = f"""
+            SELECT datname,
+                   concat_ws(':', tup_inserted, tup_updated, tup_deleted, stats_reset)
+            FROM pg_stat_database
+            WHERE datname IS NOT NULL
+                AND datname != '{self.SUPER_DB}';
+        """
+
+        fingerprints = self.query_as_list(sql_fingerprints, super_uri=True)
+
+        return {f[0]: f[1] for f in fingerprints}
+
+    # TABLE-level helper functions
+    # ----------------------------
+
+    def table_columns_as_list(self, table_name: str, schema: str = None) -> list:
+        """
+        Get a list of all columns in a table.
+
+        :param table_name: Name of the table
+        :type table_name: str
+        :return: List of all columns in a table
+        :rtype: list
+        """
+
+        if not schema:
             schema = self.ACTIVE_SCHEMA
 
         sql_all_cols_in_table = f"""
@@ -670,24 +1685,379 @@ class PostgreSQL:
         """
         self.execute(sql_unique_id_column)
 
-    def table_add_spatial_index(self, table_name: str, schema: str = None) -> None:
+    def table_add_spatial_index(
+        self,
+        table_name: str,
+        schema: str = None,
+        method: str = "gist",
+        geom_col: str = "geom",
+        concurrently: bool = False,
+        cluster: str = None,
+        index_name: str = None,
+        if_not_exists: bool = False,
+    ) -> dict:
         """
-        Add a spatial index to the 'geom' column in the table.
+        Add a ``method`` spatial index to the ``geom_col`` column in the table.
+
+        ``"gist"`` is the all-rounder. ``"spgist"`` is often quicker to
+        build, and ``"brin"`` is tiny and works well on huge tables whose
+        rows were loaded in spatial order (or were clustered).
 
         :param table_name: Name of the table to make the index on
         :type table_name: str
+        :param method: ``"gist"``, ``"spgist"`` or ``"brin"``, defaults to ``"gist"``
+        :type method: str, optional
+        :param geom_col: name of the geometry column, defaults to "geom"
+        :type geom_col: str, optional
+        :param concurrently: build without blocking writes to the table,
+                             defaults to False
+        :type concurrently: bool, optional
+        :param cluster: rewrite the table in spatial order afterwards.
+                        ``"index"`` uses the new index (not for BRIN) and
+                        ``"geohash"`` sorts by each feature's geohash,
+                        defaults to None
+        :type cluster: str, optional
+        :param index_name: name of the new index, defaults to
+                           ``<table>_<geom_col>_<method>_idx`` (shortened
+                           with a hash when that's over 63 characters)
+        :type index_name: str, optional
+        :param if_not_exists: skip quietly if an index with this name
+                              already exists, defaults to False
+        :type if_not_exists: bool, optional
+        :return: ``{"index", "method", "bytes", "seconds", "cluster_seconds"}``
+        :rtype: dict
         """
 
         if not schema:
             schema = self.ACTIVE_SCHEMA
 
-        self._print(1, f"Creating a spatial index on {schema}.{table_name}")
+        method_options = ["gist", "spgist", "brin"]
+        if method not in method_options:
+            raise ValueError(f"method must be one of: {method_options}")
+
+        cluster_options = [None, "index", "geohash"]
+        if cluster not in cluster_options:
+            raise ValueError(f"cluster must be one of: {cluster_options}")
+
+        if cluster == "index" and method == "brin":
+            raise ValueError("BRIN indexes can't be clustered on. Use cluster='geohash'")
+
+        self._print(1, f"Creating a {method} spatial index on {schema}.{table_name}")
+
+        if not index_name:
+            index_name = _fit_identifier(table_name, f"_{geom_col}_{method}_idx")
+        elif len(index_name) > MAX_IDENTIFIER_LENGTH:
+            # Postgres would truncate it, maybe onto another table's index
+            raise ValueError(
+                f"index_name must be at most {MAX_IDENTIFIER_LENGTH} characters: {index_name}"
+            )
 
         sql_make_spatial_index = f"""
-            CREATE INDEX ON {schema}.{table_name}
-            USING GIST (geom);
+            CREATE INDEX {"CONCURRENTLY" if concurrently else ""}
+            {"IF NOT EXISTS" if if_not_exists else ""} {index_name}
+            ON {schema}.{table_name}
+            USING {method.upper()} ({geom_col});
+        """
+
+        start_time = time.perf_counter()
+
+        if concurrently:
+            self._execute_without_transaction(sql_make_spatial_index)
+        else:
+            self.execute(sql_make_spatial_index)
+
+        stats = {
+            "index": index_name,
+            "method": method,
+            "seconds": time.perf_counter() - start_time,
+            "cluster_seconds": None,
+        }
+
+        if cluster:
+            start_time = time.perf_counter()
+
+            if cluster == "index":
+                sql_cluster = f"""
+                    CLUSTER {schema}.{table_name} USING {index_name};
+                    ANALYZE {schema}.{table_name};
+                """
+            else:
+                # CLUSTER needs an index, so make a temporary one on the geohash
+                geohash_index = _fit_identifier(table_name, f"_{geom_col}_geohash_idx")
+                sql_cluster = f"""
+                    CREATE INDEX {geohash_index} ON {schema}.{table_name}
+                    (ST_GeoHash(ST_Transform(ST_Centroid({geom_col}), 4326)));
+                    CLUSTER {schema}.{table_name} USING {geohash_index};
+                    DROP INDEX {schema}.{geohash_index};
+                    ANALYZE {schema}.{table_name};
+                """
+
+            self.execute(sql_cluster)
+
+            stats["cluster_seconds"] = time.perf_counter() - start_time
+
+        stats["bytes"] = self.query_as_single_item(
+            f"SELECT pg_relation_size('{schema}.{index_name}'::regclass);"
+        )
+
+        return stats
+
+    def table_compare_spatial_indexes(
+        self,
+        table_name: str,
+        schema: str = None,
+        methods: tuple = ("gist", "spgist", "brin"),
+        geom_col: str = "geom",
+    ) -> dict:
+        """
+        Build each kind of spatial index on a table, one at a time,
+        and report how big it is and how long it took. Each index is
+        dropped again after it's measured, so it's safe to try on a
+        table that already has its real index.
+
+        :param table_name: Name of the table to test
+        :type table_name: str
+        :param methods: index methods to try,
+                        defaults to ``("gist", "spgist", "brin")``
+        :type methods: tuple, optional
+        :param geom_col: name of the geometry column, defaults to "geom"
+        :type geom_col: str, optional
+        :return: ``{method: {"bytes": ..., "seconds": ...}}``
+        :rtype: dict
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        results = {}
+
+        for method in methods:
+            stats = self.table_add_spatial_index(
+                table_name,
+                schema=schema,
+                method=method,
+                geom_col=geom_col,
+                index_name=f"pgis_compare_{method}_idx",
+            )
+            self.execute(f"DROP INDEX {schema}.{stats['index']};")
+
+            results[method] = {"bytes": stats["bytes"], "seconds": stats["seconds"]}
+
+            msg = f"{method}: {stats['bytes'] / 1e6:,.1f} MB in {stats['seconds']:.2f} seconds"
+            self._print(2, msg)
+
+        return results
+
+    def table_has_spatial_index(
+        self, table_name: str, schema: str = None, geom_col: str = "geom"
+    ) -> bool:
+        """
+        Is there a GIST index on the table's geometry column?
+
+        :param table_name: Name of the table
+        :type table_name: str
+        :param geom_col: name of the geometry column, defaults to "geom"
+        :type geom_col: str, optional
+        :return: True if the column has a GIST index
+        :rtype: bool
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        sql_has_index = f"""
+            SELECT EXISTS(
+                SELECT 1
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = c.relam
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = '{schema}.{table_name}'::regclass
+                  AND am.amname = 'gist'
+                  AND a.attname = '{geom_col}'
+            );
+        """
+
+        return self.query_as_single_item(sql_has_index)
+
+    def table_row_estimate(self, table_name: str, schema: str = None) -> int:
+        """
+        Get the planner's estimate of how many rows are in a table.
+        This is instant, unlike ``COUNT(*)``, but is only as fresh
+        as the table's last ``ANALYZE``.
+
+        :param table_name: Name of the table
+        :type table_name: str
+        :return: estimated number of rows, 0 if never analyzed
+        :rtype: int
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        sql_estimate = f"""
+            SELECT GREATEST(reltuples, 0)::bigint
+            FROM pg_class
+            WHERE oid = '{schema}.{table_name}'::regclass;
+        """
+
+        return self.query_as_single_item(sql_estimate)
+
+    def table_add_h3_column(
+        self,
+        table_name: str,
+        resolution: int,
+        schema: str = None,
+        column_name: str = None,
+        uid_col: str = "uid",
+        batch_size: int = 100000,
+    ) -> str:
+        """
+        Add an indexed column with the H3 cell that each feature
+        falls in. Points use their own location, and anything else
+        uses its centroid.
+
+        Features are read in batches of WKB, assigned to cells with
+        ``grid_helpers.coordinates_to_h3()``, and copied into a join
+        table that fills the new column in a single ``UPDATE``.
+        Aggregating to hexagons is then a ``GROUP BY`` on this column.
+
+        :param table_name: Name of the spatial table
+        :type table_name: str
+        :param resolution: H3 resolution, from 0 (coarse) to 15 (fine)
+        :type resolution: int
+        :param column_name: name of the new column, defaults to ``h3_<resolution>``
+        :type column_name: str, optional
+        :param uid_col: unique ID column of the table, defaults to "uid"
+        :type uid_col: str, optional
+        :param batch_size: features per batch, defaults to 100000
+        :type batch_size: int, optional
+        :return: name of the new column
+        :rtype: str
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not column_name:
+            column_name = f"h3_{resolution}"
+
+        self._print(2, f"Adding H3 cells at resolution {resolution} to {schema}.{table_name}")
+
+        self.table_add_or_nullify_column(table_name, column_name, "BIGINT", schema=schema)
+
+        sql_points = f"""
+            SELECT {uid_col}, ST_AsBinary(ST_Transform(ST_Centroid(geom), 4326))
+            FROM {schema}.{table_name}
+            WHERE geom IS NOT NULL AND NOT ST_IsEmpty(geom);
+        """
+
+        index_name = _fit_identifier(table_name, f"_{column_name}_idx")
+
+        read_connection = psycopg2.connect(self.uri())
+        write_connection = psycopg2.connect(self.uri())
+
+        try:
+            with write_connection.cursor() as write_cursor:
+                write_cursor.execute(
+                    f"""
+                    CREATE TEMP TABLE pgis_h3_cells ON COMMIT DROP AS
+                    SELECT {uid_col} AS uid, NULL::bigint AS cell
+                    FROM {schema}.{table_name} LIMIT 0;
+                """
+                )
+
+                with read_connection.cursor("pgis_table_add_h3_column") as read_cursor:
+                    read_cursor.itersize = batch_size
+                    read_cursor.execute(sql_points)
+
+                    while True:
+                        rows = read_cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+
+                        uids, wkbs = zip(*rows)
+                        points = shapely.from_wkb([bytes(wkb) for wkb in wkbs])
+                        cells = coordinates_to_h3(
+                            shapely.get_y(points), shapely.get_x(points), resolution
+                        )
+
+                        data = "".join(f"{uid}\t{cell}\n" for uid, cell in zip(uids, cells))
+                        write_cursor.copy_expert(
+                            "COPY pgis_h3_cells (uid, cell) FROM STDIN", io.StringIO(data)
+                        )
+
+                write_cursor.execute(
+                    f"""
+                    UPDATE {schema}.{table_name} t
+                    SET {column_name} = c.cell
+                    FROM pgis_h3_cells c
+                    WHERE t.{uid_col} = c.uid;
+
+                    CREATE INDEX IF NOT EXISTS {index_name}
+                    ON {schema}.{table_name} ({column_name});
+                """
+                )
+
+            write_connection.commit()
+
+        finally:
+            read_connection.close()
+            write_connection.close()
+
+        return column_name
+
+    def table_add_geohash_column(
+        self,
+        table_name: str,
+        precision: int,
+        schema: str = None,
+        column_name: str = None,
+    ) -> str:
         """
-        self.execute(sql_make_spatial_index)
+        Add an indexed column with the geohash of each feature's
+        centroid, truncated to ``precision`` characters.
+
+        Unlike H3, PostGIS can compute geohashes itself with
+        ``ST_GeoHash()``, so no data leaves the database.
+
+        :param table_name: Name of the spatial table
+        :type table_name: str
+        :param precision: number of geohash characters, from 1 to 12
+        :type precision: int
+        :param column_name: name of the new column,
+                            defaults to ``geohash_<precision>``
+        :type column_name: str, optional
+        :return: name of the new column
+        :rtype: str
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not 1 <= precision <= 12:
+            raise ValueError("precision must be between 1 and 12")
+
+        if not column_name:
+            column_name = f"geohash_{precision}"
+
+        self._print(2, f"Adding geohashes of length {precision} to {schema}.{table_name}")
+
+        self.table_add_or_nullify_column(table_name, column_name, "TEXT", schema=schema)
+
+        index_name = _fit_identifier(table_name, f"_{column_name}_idx")
+
+        sql_geohash = f"""
+            UPDATE {schema}.{table_name}
+            SET {column_name} = ST_GeoHash(ST_Transform(ST_Centroid(geom), 4326), {precision})
+            WHERE geom IS NOT NULL;
+
+            CREATE INDEX IF NOT EXISTS {index_name}
+            ON {schema}.{table_name} ({column_name});
+        """
+        self.execute(sql_geohash)
+
+        return column_name
 
     def table_reproject_spatial_data(
         self,
@@ -696,6 +2066,9 @@ class PostgreSQL:
         new_epsg: Union[int, str],
         geom_type: str,
         schema: str = None,
+        online: bool = False,
+        batch_size: int = 100000,
+        uid_col: str = "uid",
     ) -> None:
         """
         Transform spatial data from one EPSG into another EPSG.
@@ -713,6 +2086,14 @@ class PostgreSQL:
         :param geom_type: PostGIS-valid name of the
                           geometry you're transforming
         :type geom_type: str
+        :param online: reproject in batches without locking the table,
+                       see ``_table_reproject_online()``, defaults to False
+        :type online: bool, optional
+        :param batch_size: rows per batch when ``online``, defaults to 100000
+        :type batch_size: int, optional
+        :param uid_col: integer key to batch on when ``online``,
+                        defaults to "uid"
+        :type uid_col: str, optional
         """
 
         if not schema:
@@ -721,6 +2102,12 @@ class PostgreSQL:
         msg = f"Reprojecting {schema}.{table_name} from {old_epsg} to {new_epsg}"
         self._print(1, msg)
 
+        if online:
+            self._table_reproject_online(
+                table_name, old_epsg, new_epsg, geom_type, schema, batch_size, uid_col
+            )
+            return
+
         sql_transform_geom = f"""
             ALTER TABLE {schema}.{table_name}
             ALTER COLUMN geom TYPE geometry({geom_type}, {new_epsg})
@@ -728,6 +2115,190 @@ class PostgreSQL:
         """
         self.execute(sql_transform_geom)
 
+    def _table_reproject_online(
+        self,
+        table_name: str,
+        old_epsg: Union[int, str],
+        new_epsg: Union[int, str],
+        geom_type: str,
+        schema: str,
+        batch_size: int,
+        uid_col: str,
+        vacuum_every: int = 10,
+    ) -> None:
+        """
+        Reproject a big table while it stays in use.
+
+        1. Add a ``geom_reprojected`` column, and a trigger that keeps
+           it in sync with any rows written in the meantime.
+        2. Fill it in ``uid_col`` ranges of ``batch_size``, committing
+           after each one. The last finished key is saved in the column's
+           comment, so running this again picks up where it stopped.
+           Every ``vacuum_every`` batches the table is vacuumed, so later
+           batches reuse the space of the row versions left behind.
+        3. Swap it in for ``geom`` in one short transaction, and build
+           the new GIST index ``CONCURRENTLY``.
+
+        If ``geom`` is already in ``new_epsg`` and there's no
+        ``geom_reprojected`` column, an earlier run got past the swap.
+        Only the index is (re)built then, so no row is transformed twice.
+        """
+
+        table = f"{schema}.{table_name}"
+        new_col = "geom_reprojected"
+        trigger_function = f"{schema}.pgis_reproject_{table_name}"
+        index_name = _fit_identifier(table_name, "_geom_reprojected_idx")
+        transform = f"ST_Transform(ST_SetSRID({{}}.geom, {old_epsg}), {new_epsg})"
+        progress_label = f"pgis_reproject {old_epsg} to {new_epsg} done through"
+
+        sql_state = f"""
+            SELECT
+                Find_SRID('{schema}', '{table_name}', 'geom'),
+                EXISTS(
+                    SELECT 1 FROM pg_attribute
+                    WHERE attrelid = '{table}'::regclass
+                        AND attname = '{new_col}'
+                        AND NOT attisdropped
+                );
+        """
+        current_srid, swap_pending = self.query_as_list(sql_state)[0]
+
+        already_swapped = (
+            not swap_pending
+            and str(old_epsg) != str(new_epsg)
+            and str(current_srid) == str(new_epsg)
+        )
+
+        if already_swapped:
+            self._print(2, f"{table} is already in EPSG:{new_epsg}, only checking its index")
+        else:
+            self._reproject_online_fill_and_swap(
+                table,
+                new_col,
+                trigger_function,
+                transform,
+                progress_label,
+                geom_type,
+                new_epsg,
+                batch_size,
+                uid_col,
+                vacuum_every,
+            )
+
+        # An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index behind
+        index_is_valid = self.query_as_list(
+            f"""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}' AND c.relname = '{index_name}';
+        """
+        )
+
+        if index_is_valid and index_is_valid[0][0]:
+            return
+
+        if index_is_valid:
+            self._print(2, f"Rebuilding invalid index {index_name}")
+            self._execute_without_transaction(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{index_name};"
+            )
+
+        self._execute_without_transaction(
+            f"CREATE INDEX CONCURRENTLY {index_name} ON {table} USING GIST (geom);"
+        )
+
+    def _reproject_online_fill_and_swap(
+        self,
+        table: str,
+        new_col: str,
+        trigger_function: str,
+        transform: str,
+        progress_label: str,
+        geom_type: str,
+        new_epsg: Union[int, str],
+        batch_size: int,
+        uid_col: str,
+        vacuum_every: int,
+    ) -> None:
+        """ Steps 1 and 2 of ``_table_reproject_online()``, plus the swap """
+
+        sql_prepare = f"""
+            ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS {new_col} geometry({geom_type}, {new_epsg});
+
+            CREATE OR REPLACE FUNCTION {trigger_function}() RETURNS trigger AS $$
+            BEGIN
+                NEW.{new_col} := {transform.format("NEW")};
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS pgis_reproject ON {table};
+            CREATE TRIGGER pgis_reproject
+            BEFORE INSERT OR UPDATE OF geom ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {trigger_function}();
+        """
+        self.execute(sql_prepare)
+
+        progress = self.query_as_single_item(
+            f"SELECT col_description('{table}'::regclass, attnum) FROM pg_attribute "
+            f"WHERE attrelid = '{table}'::regclass AND attname = '{new_col}';"
+        )
+
+        low, high = self.query_as_list(f"SELECT MIN({uid_col}), MAX({uid_col}) FROM {table};")[0]
+
+        if progress and progress.startswith(progress_label):
+            done_through = int(progress.split()[-1])
+            self._print(2, f"Resuming after {uid_col} = {done_through:,}")
+        else:
+            done_through = (low or 0) - 1
+
+        connection = psycopg2.connect(self.uri())
+
+        try:
+            with connection.cursor() as cursor:
+                batches = 0
+
+                while high is not None and done_through < high:
+                    batch_end = done_through + batch_size
+
+                    cursor.execute(
+                        f"""
+                        UPDATE {table} t
+                        SET {new_col} = {transform.format("t")}
+                        WHERE {uid_col} > {done_through} AND {uid_col} <= {batch_end};
+
+                        COMMENT ON COLUMN {table}.{new_col}
+                        IS '{progress_label} {batch_end}';
+                    """
+                    )
+                    connection.commit()
+
+                    done_through = batch_end
+                    self._print(1, f"Reprojected {uid_col} up to {min(done_through, high):,}")
+
+                    # Each UPDATE leaves the old version of every row behind
+                    batches += 1
+                    if vacuum_every and batches % vacuum_every == 0:
+                        self._execute_without_transaction(f"VACUUM {table};")
+
+                # Swap the columns. Only this step needs an exclusive lock
+                cursor.execute(
+                    f"""
+                    DROP TRIGGER pgis_reproject ON {table};
+                    DROP FUNCTION {trigger_function}();
+                    ALTER TABLE {table} DROP COLUMN geom;
+                    ALTER TABLE {table} RENAME COLUMN {new_col} TO geom;
+                    COMMENT ON COLUMN {table}.geom IS NULL;
+                """
+                )
+                connection.commit()
+
+        finally:
+            connection.close()
+
     def table_delete(self, table_name: str, schema: str = None) -> None:
         """
         Delete the table, cascade.
@@ -822,10 +2393,17 @@ class PostgreSQL:
         if_exists: str = "replace",
         schema: str = None,
         uid_col: str = "uid",
+        partition_by: str = None,
+        partition_method: str = "range",
+        partition_interval: str = "month",
     ):
         """
         Import an in-memory ``geopandas.GeoDataFrame`` to the SQL database.
 
+        With ``partition_by``, the data is loaded into a table partitioned
+        on that column, and any partitions it needs are created on the
+        way in. See ``_load_partitioned()``.
+
         :param gdf: geodataframe with data you want to save
         :type gdf: gpd.GeoDataFrame
         :param table_name: name of the table that will get created
@@ -839,6 +2417,14 @@ class PostgreSQL:
         :param if_exists: pandas argument to handle overwriting data,
                           defaults to "replace"
         :type if_exists: str, optional
+        :param partition_by: column to partition the table on, defaults to None
+        :type partition_by: str, optional
+        :param partition_method: ``"range"`` (for date columns) or ``"list"``,
+                                 defaults to ``"range"``
+        :type partition_method: str, optional
+        :param partition_interval: span of each range partition: ``"year"``,
+                                   ``"month"`` or ``"day"``, defaults to ``"month"``
+        :type partition_interval: str, optional
         """
         if not schema:
             schema = self.ACTIVE_SCHEMA
@@ -885,9 +2471,14 @@ class PostgreSQL:
 
         # Build a 'geom' column using geoalchemy2
         # and drop the source 'geometry' column
-        gdf["geom"] = gdf["geometry"].apply(lambda x: WKTElement(x.wkt, srid=epsg_code))
+        gdf["geom"] = gdf["geometry"].apply(lambda x: geoalchemy2.WKTElement(x.wkt, srid=epsg_code))
         gdf.drop("geometry", 1, inplace=True)
 
+        # Partitioned tables are loaded through a staging table
+        if partition_by:
+            target_table, table_name = table_name, f"{table_name}_pgis_staging"
+            target_if_exists, if_exists = if_exists, "replace"
+
         # Write geodataframe to SQL database
         engine = sqlalchemy.create_engine(self.uri())
         gdf.to_sql(
@@ -897,12 +2488,27 @@ class PostgreSQL:
             index=True,
             index_label="gid",
             schema=schema,
-            dtype={"geom": Geometry(geom_typ, srid=epsg_code)},
+            dtype={"geom": geoalchemy2.Geometry(geom_typ, srid=epsg_code)},
         )
         engine.dispose()
 
+        if partition_by:
+            self._load_partitioned(
+                table_name,
+                target_table,
+                partition_by,
+                schema=schema,
+                method=partition_method,
+                interval=partition_interval,
+                if_exists=target_if_exists,
+                uid_col=uid_col,
+            )
+            return
+
         self.table_add_uid_column(table_name, schema=schema, uid_col=uid_col)
-        self.table_add_spatial_index(table_name, schema=schema)
+
+        # Appending to a table that already has its index
+        self.table_add_spatial_index(table_name, schema=schema, if_not_exists=True)
 
     @timer
     def import_csv(
@@ -993,9 +2599,33 @@ class PostgreSQL:
         epsg: int,
         schema: str = None,
         uid_col: str = "uid",
+        partition_by: str = None,
+        partition_method: str = "range",
+        partition_interval: str = "month",
     ) -> None:
         """
-        TODO: docstring
+        Save the result of a query as a new spatial table, with a
+        ``uid_col`` and a spatial index.
+
+        With ``partition_by``, the new table is partitioned on that
+        column instead. See ``_load_partitioned()``.
+
+        :param query: ``SELECT`` query with a ``geom`` column
+        :type query: str
+        :param new_table_name: name of the new table
+        :type new_table_name: str
+        :param geom_type: geometry type, e.g. ``"MULTIPOLYGON"``
+        :type geom_type: str
+        :param epsg: EPSG of the query's geometry
+        :type epsg: int
+        :param partition_by: column to partition the table on, defaults to None
+        :type partition_by: str, optional
+        :param partition_method: ``"range"`` (for date columns) or ``"list"``,
+                                 defaults to ``"range"``
+        :type partition_method: str, optional
+        :param partition_interval: span of each range partition: ``"year"``,
+                                   ``"month"`` or ``"day"``, defaults to ``"month"``
+        :type partition_interval: str, optional
         """
 
         if not schema:
@@ -1003,24 +2633,42 @@ class PostgreSQL:
 
         self._print(2, f"Making new geotable in DB : {new_table_name}")
 
-        valid_geom_types = [
-            "POINT",
-            "MULTIPOINT",
-            "POLYGON",
-            "MULTIPOLYGON",
-            "LINESTRING",
-            "MULTILINESTRING",
-        ]
-
-        if geom_type.upper() not in valid_geom_types:
+        if geom_type.upper() not in VALID_GEOM_TYPES:
             for msg in [
                 f"Geometry type of {geom_type} is not valid.",
-                f"Please use one of the following: {valid_geom_types}",
+                f"Please use one of the following: {VALID_GEOM_TYPES}",
                 "Aborting",
             ]:
                 self._print(3, msg)
             return
 
+        if partition_by:
+            staging_table = f"{new_table_name}_pgis_staging"
+
+            sql_make_staging_table = f"""
+                DROP TABLE IF EXISTS {schema}.{staging_table};
+                CREATE TABLE {schema}.{staging_table} AS
+                {query}
+            """
+            self.execute(sql_make_staging_table)
+
+            # Sets the geometry column's type and SRID, which the parent copies
+            self.table_reproject_spatial_data(
+                staging_table, epsg, epsg, geom_type=geom_type.upper(), schema=schema
+            )
+
+            self._load_partitioned(
+                staging_table,
+                new_table_name,
+                partition_by,
+                schema=schema,
+                method=partition_method,
+                interval=partition_interval,
+                if_exists="replace",
+                uid_col=uid_col,
+            )
+            return
+
         sql_make_table_from_query = f"""
             DROP TABLE IF EXISTS {schema}.{new_table_name};
             CREATE TABLE {schema}.{new_table_name} AS
@@ -1035,75 +2683,1306 @@ class PostgreSQL:
             new_table_name, epsg, epsg, geom_type=geom_type.upper(), schema=schema
         )
 
-    def make_hexagon_overlay(
+    def _load_partitioned(
         self,
-        new_table_name: str,
-        table_to_cover: str,
-        desired_epsg: int,
-        hexagon_size: float,
+        staging_table: str,
+        table_name: str,
+        partition_by: str,
         schema: str = None,
-    ) -> None:
+        method: str = "range",
+        interval: str = "month",
+        if_exists: str = "replace",
+        uid_col: str = "uid",
+    ) -> list:
         """
-        Create a new spatial hexagon grid covering another
-        spatial table. EPSG must be specified for the hexagons,
-        as well as the size in square KM.
+        Move everything from a staging table into a partitioned table,
+        creating the parent table and any missing partitions first.
+        The staging table is dropped at the end.
 
-        :param new_table_name: Name of the new table to create
-        :type new_table_name: str
-        :param table_to_cover: Name of the existing table you want to cover
-        :type table_to_cover: str
-        :param desired_epsg: integer for EPSG you want the hexagons to be in
-        :type desired_epsg: int
-        :param hexagon_size: Size of the hexagons, 1 = 1 square KM
-        :type hexagon_size: float
+        ``"range"`` partitions hold one ``interval`` of a date column
+        each, like ``crashes_2020_01``. ``"list"`` partitions hold one
+        value each, like ``crashes_bucks_1f3870``. The hash of the value
+        on the end keeps values like ``"Region 1"`` and ``"region-1"``
+        apart. Rows with a ``NULL`` key go into a ``_default`` partition.
+
+        The spatial index is made on the parent table, so every
+        partition (including ones made by later loads) gets its own.
+
+        :param if_exists: ``"replace"``, ``"append"`` or ``"fail"``
+                          if the partitioned table already exists,
+                          defaults to "replace"
+        :type if_exists: str, optional
+        :return: names of the partitions that were created
+        :rtype: list
         """
 
         if not schema:
             schema = self.ACTIVE_SCHEMA
 
-        self._print(2, f"Creating hexagon table named: {schema}.{new_table_name}")
+        method_options = ["range", "list"]
+        if method not in method_options:
+            raise ValueError(f"partition_method must be one of: {method_options}")
 
-        sql_create_hex_grid = f"""
+        interval_formats = {"year": "YYYY", "month": "YYYY_MM", "day": "YYYY_MM_DD"}
+        if method == "range" and interval not in interval_formats:
+            raise ValueError(f"partition_interval must be one of: {list(interval_formats)}")
 
-            DROP TABLE IF EXISTS {schema}.{new_table_name};
+        if_exists_options = ["replace", "append", "fail"]
+        if if_exists not in if_exists_options:
+            raise ValueError(f"if_exists must be one of: {if_exists_options}")
 
-            CREATE TABLE {schema}.{new_table_name} (
-                gid SERIAL NOT NULL PRIMARY KEY,
-                geom GEOMETRY('POLYGON', {desired_epsg}, 2) NOT NULL
-            )
-            WITH (OIDS=FALSE);
+        table = f"{schema}.{table_name}"
+        staging = f"{schema}.{staging_table}"
 
-            INSERT INTO {schema}.{new_table_name} (geom)
-            SELECT
-                hex_grid(
-                    {hexagon_size},
-                    (select st_xmin(st_transform(st_collect(geom), 4326))
-                     from {schema}.{table_to_cover}),
-                    (select st_ymin(st_transform(st_collect(geom), 4326))
-                     from {schema}.{table_to_cover}),
-                    (select st_xmax(st_transform(st_collect(geom), 4326))
-                     from {schema}.{table_to_cover}),
-                    (select st_ymax(st_transform(st_collect(geom), 4326))
-                     from {schema}.{table_to_cover}),
-                    4326,
-                    {desired_epsg},
-                    {desired_epsg}
-            );
-        """
+        exists = table_name in self.all_tables_as_list(schema=schema)
 
-        self.execute(sql_create_hex_grid)
+        if exists and if_exists == "fail":
+            raise ValueError(f"{table} already exists and if_exists='fail'")
 
-        self.table_add_spatial_index(new_table_name, schema=schema)
+        self._print(2, f"Loading {staging} into {table}, partitioned by {partition_by}")
 
-        # TODO: reproject?
+        self.execute(f"ALTER TABLE {staging} DROP COLUMN IF EXISTS {uid_col};")
 
-    # EXPORT data to file / disk
-    # --------------------------
+        if not exists or if_exists == "replace":
+            sql_make_parent = f"""
+                DROP TABLE IF EXISTS {table} CASCADE;
 
-    @timer
-    def export_shapefile(
-        self,
-        table_name: str,
+                CREATE TABLE {table} (
+                    LIKE {staging} INCLUDING DEFAULTS,
+                    {uid_col} bigserial
+                )
+                PARTITION BY {method.upper()} ({partition_by});
+
+                CREATE INDEX ON {table} USING GIST (geom);
+                CREATE INDEX ON {table} ({uid_col});
+            """
+            self.execute(sql_make_parent)
+
+        # Work out which partitions this load needs
+        if method == "range":
+            sql_partitions = f"""
+                SELECT DISTINCT
+                    '{table_name}_' || to_char(date_trunc('{interval}', {partition_by}),
+                                                '{interval_formats[interval]}'),
+                    format('FOR VALUES FROM (%L) TO (%L)',
+                           date_trunc('{interval}', {partition_by}),
+                           date_trunc('{interval}', {partition_by}) + interval '1 {interval}')
+                FROM {staging}
+                WHERE {partition_by} IS NOT NULL;
+            """
+        else:
+            sql_partitions = f"""
+                SELECT DISTINCT
+                    regexp_replace(lower({partition_by}::text), '\\W+', '_', 'g'),
+                    left(md5({partition_by}::text), 6),
+                    format('FOR VALUES IN (%L)', {partition_by})
+                FROM {staging}
+                WHERE {partition_by} IS NOT NULL;
+            """
+        partitions = self.query_as_list(sql_partitions)
+
+        if method == "list":
+            partitions = [
+                (_fit_identifier(f"{table_name}_{value}", f"_{digest}"), bound)
+                for value, digest, bound in partitions
+            ]
+
+        has_nulls = self.query_as_single_item(
+            f"SELECT EXISTS(SELECT 1 FROM {staging} WHERE {partition_by} IS NULL);"
+        )
+        if has_nulls:
+            partitions.append((f"{table_name}_default", "DEFAULT"))
+
+        existing = set(self.all_tables_as_list(schema=schema))
+        new_partitions = [(name, bound) for name, bound in partitions if name not in existing]
+
+        columns = ", ".join(self.table_columns_as_list(staging_table, schema=schema))
+
+        sql_load = "".join(
+            f"CREATE TABLE {schema}.{name} PARTITION OF {table} {bound};\n"
+            for name, bound in new_partitions
+        )
+        sql_load += f"""
+            INSERT INTO {table} ({columns})
+            SELECT {columns} FROM {staging};
+
+            DROP TABLE {staging};
+            ANALYZE {table};
+        """
+        self.execute(sql_load)
+
+        self._print(2, f"Created {len(new_partitions)} new partitions of {table}")
+
+        return [name for name, _ in new_partitions]
+
+    def table_detach_partitions(
+        self,
+        table_name: str,
+        older_than: str = None,
+        partition_names: list = None,
+        drop: bool = True,
+        schema: str = None,
+    ) -> list:
+        """
+        Remove partitions from a partitioned table. Detaching a
+        partition only touches the catalog, so this is instant no
+        matter how many rows the partitions hold.
+
+        :param table_name: Name of the partitioned (parent) table
+        :type table_name: str
+        :param older_than: remove range partitions that end on or before
+                           this date, e.g. ``"2019-01-01"``, defaults to None
+        :type older_than: str, optional
+        :param partition_names: remove these partitions, defaults to None
+        :type partition_names: list, optional
+        :param drop: drop the detached partitions. If False, they are
+                     kept as regular tables, defaults to True
+        :type drop: bool, optional
+        :return: names of the partitions that were removed
+        :rtype: list
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not older_than and not partition_names:
+            raise ValueError("Provide older_than and/or partition_names")
+
+        sql_partitions = f"""
+            SELECT c.relname,
+                   substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \\(''([^'']+)''\\)')
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = '{schema}.{table_name}'::regclass;
+        """
+        partitions = self.query_as_list(sql_partitions)
+
+        to_remove = list(partition_names or [])
+
+        if older_than:
+            sql_older = " UNION ALL ".join(
+                f"SELECT '{name}' WHERE '{upper_bound}'::timestamp <= '{older_than}'::timestamp"
+                for name, upper_bound in partitions
+                if upper_bound
+            )
+            if sql_older:
+                to_remove += [row[0] for row in self.query_as_list(sql_older)]
+
+        if not to_remove:
+            return []
+
+        sql_detach = "".join(
+            f"ALTER TABLE {schema}.{table_name} DETACH PARTITION {schema}.{name};\n"
+            + (f"DROP TABLE {schema}.{name};\n" if drop else "")
+            for name in to_remove
+        )
+        self.execute(sql_detach)
+
+        action = "Dropped" if drop else "Detached"
+        self._print(2, f"{action} {len(to_remove)} partitions of {schema}.{table_name}")
+
+        return to_remove
+
+    def quadtree_tiles(
+        self,
+        table_name: str,
+        max_rows_per_tile: int = 50000,
+        schema: str = None,
+        max_depth: int = 12,
+    ) -> list:
+        """
+        Split a spatial table's extent into rectangles holding roughly
+        ``max_rows_per_tile`` features each. Tiles covering dense areas
+        are split into quarters until they are small enough.
+
+        Counts use ``&&``, so they come from the GIST index. Tiles
+        with no features are left out, so the tiles can have gaps.
+        ``run_partitioned()`` gives anything in a gap to the nearest tile.
+
+        :param table_name: Name of the spatial table
+        :type table_name: str
+        :param max_rows_per_tile: split tiles with more features than this,
+                                  defaults to 50000
+        :type max_rows_per_tile: int, optional
+        :param max_depth: most times a tile can be split, defaults to 12
+        :type max_depth: int, optional
+        :return: list of ``(xmin, ymin, xmax, ymax, epsg)`` tuples
+        :rtype: list
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        sql_extent = f"""
+            SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e),
+                   Find_SRID('{schema}', '{table_name}', 'geom')
+            FROM (SELECT ST_Extent(geom) AS e FROM {schema}.{table_name}) AS extent;
+        """
+        xmin, ymin, xmax, ymax, epsg = self.query_as_list(sql_extent)[0]
+
+        if xmin is None:
+            return []
+
+        tiles = []
+        to_check = [(xmin, ymin, xmax, ymax, 0)]
+
+        while to_check:
+            # Count all of the candidate tiles in one round trip
+            sql_counts = " UNION ALL ".join(
+                f"""
+                SELECT {idx}, COUNT(*) FROM {schema}.{table_name}
+                WHERE geom && ST_MakeEnvelope({x1!r}, {y1!r}, {x2!r}, {y2!r}, {epsg})
+                """
+                for idx, (x1, y1, x2, y2, _) in enumerate(to_check)
+            )
+            counts = dict(self.query_as_list(sql_counts))
+
+            next_round = []
+            for idx, (x1, y1, x2, y2, depth) in enumerate(to_check):
+                if counts[idx] <= max_rows_per_tile or depth >= max_depth:
+                    if counts[idx]:
+                        tiles.append((x1, y1, x2, y2, epsg))
+                    continue
+
+                xmid, ymid = (x1 + x2) / 2, (y1 + y2) / 2
+                next_round += [
+                    (x1, y1, xmid, ymid, depth + 1),
+                    (xmid, y1, x2, ymid, depth + 1),
+                    (x1, ymid, xmid, y2, depth + 1),
+                    (xmid, ymid, x2, y2, depth + 1),
+                ]
+
+            to_check = next_round
+
+        self._print(1, f"Split {schema}.{table_name} into {len(tiles)} tiles")
+
+        return tiles
+
+    @timer
+    def run_partitioned(
+        self,
+        query_template: str,
+        partition_table_or_grid: Union[str, list],
+        output_table: str,
+        workers: int = 4,
+        schema: str = None,
+        geom_col: str = "geom",
+        key_columns: list = None,
+    ) -> dict:
+        """
+        Run a heavy spatial query one tile at a time, with ``workers``
+        tiles running at once, and collect the results in one table.
+
+        ``query_template`` is a per-feature ``SELECT`` that uses ``{tile}``
+        wherever it needs the current tile's geometry, e.g.:
+
+            ``SELECT uid, ST_Buffer(geom, 100) AS geom
+            FROM parcels WHERE geom && {tile}``
+
+        Every row must stand on its own, because rows from different
+        tiles are never merged. An aggregate without ``GROUP BY`` (like
+        ``SELECT ST_Union(geom) ...``) returns one row per tile and is
+        refused with a ``ValueError``. Grouped aggregates must not group
+        features that can fall in different tiles.
+
+        Features that cross tile edges come back from more than one
+        tile, so only one copy of each row is kept:
+
+        - With ``key_columns``, the first row for each key is kept. Use
+          this whenever an output row can reach outside the tiles that
+          its input feature touches, as buffers do.
+        - Otherwise, each row is kept only by the tile nearest to its
+          ``ST_PointOnSurface()``, with ties going to the first tile.
+          Every point in space has exactly one such tile, including
+          points on shared edges, in gaps between the tiles and past
+          the outer edges.
+
+        The tiles can come from a table of polygons (like a hexagon
+        grid from ``make_hexagon_overlay()``), or from a list of
+        ``(xmin, ymin, xmax, ymax, epsg)`` rectangles (like the ones from
+        ``quadtree_tiles()``).
+
+        :param query_template: ``SELECT`` query with a ``{tile}`` placeholder
+        :type query_template: str
+        :param partition_table_or_grid: name of a polygon table, or a
+                                        list of rectangles
+        :type partition_table_or_grid: Union[str, list]
+        :param output_table: name of the new table to create
+        :type output_table: str
+        :param workers: number of tiles to run at once, defaults to 4
+        :type workers: int, optional
+        :param geom_col: geometry column of the query's output,
+                         defaults to "geom"
+        :type geom_col: str, optional
+        :param key_columns: columns that identify an output row,
+                            defaults to None (keep rows by location)
+        :type key_columns: list, optional
+        :return: runtime in seconds of each tile, keyed by tile number
+        :rtype: dict
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if "{tile}" not in query_template:
+            raise ValueError("query_template must include a {tile} placeholder")
+
+        query_template = query_template.strip().rstrip(";")
+
+        output = f"{schema}.{output_table}"
+        tile_table = f"{schema}.{_fit_identifier(output_table, '_pgis_tiles')}"
+
+        # Number the tiles in a table the workers can all see
+        if isinstance(partition_table_or_grid, str):
+            sql_tiles = f"""
+                DROP TABLE IF EXISTS {tile_table};
+                CREATE UNLOGGED TABLE {tile_table} AS
+                SELECT (row_number() OVER (ORDER BY ctid))::int - 1 AS tile_id, geom
+                FROM {schema}.{partition_table_or_grid};
+            """
+        elif partition_table_or_grid:
+            envelopes = ",\n".join(
+                f"({idx}, ST_MakeEnvelope({xmin!r}, {ymin!r}, {xmax!r}, {ymax!r}, {epsg}))"
+                for idx, (xmin, ymin, xmax, ymax, epsg) in enumerate(partition_table_or_grid)
+            )
+            sql_tiles = f"""
+                DROP TABLE IF EXISTS {tile_table};
+                CREATE UNLOGGED TABLE {tile_table} AS
+                SELECT * FROM (VALUES {envelopes}) AS t (tile_id, geom);
+            """
+        else:
+            raise ValueError("There are no tiles to run the query on")
+
+        sql_tiles += f"CREATE INDEX ON {tile_table} USING GIST (geom);"
+        self.execute(sql_tiles)
+
+        try:
+            tiles = self.query_as_list(
+                f"SELECT tile_id, ST_AsEWKT(geom) FROM {tile_table} ORDER BY tile_id;"
+            )
+
+            if not tiles:
+                raise ValueError("There are no tiles to run the query on")
+
+            first_query = query_template.replace("{tile}", f"'{tiles[0][1]}'::geometry")
+            self._check_per_feature_query(first_query)
+
+            self._print(2, f"Running query over {len(tiles)} tiles into {output}")
+
+            sql_create_output = f"""
+                DROP TABLE IF EXISTS {output};
+                CREATE UNLOGGED TABLE {output} AS
+                {first_query}
+                WITH NO DATA;
+            """
+            if key_columns:
+                keys = ", ".join(key_columns)
+                sql_create_output += f"CREATE UNIQUE INDEX ON {output} ({keys});"
+            self.execute(sql_create_output)
+
+            queries = []
+            for tile_id, ewkt in tiles:
+                query = query_template.replace("{tile}", f"'{ewkt}'::geometry")
+
+                if key_columns:
+                    sql_insert = f"""
+                        INSERT INTO {output}
+                        SELECT q.* FROM ({query}) AS q
+                        ON CONFLICT DO NOTHING;
+                    """
+                else:
+                    sql_insert = f"""
+                        INSERT INTO {output}
+                        SELECT q.* FROM ({query}) AS q
+                        WHERE (
+                            SELECT t.tile_id FROM {tile_table} t
+                            ORDER BY t.geom <-> ST_PointOnSurface(q.{geom_col}), t.tile_id
+                            LIMIT 1
+                        ) = {tile_id};
+                    """
+                queries.append(sql_insert)
+
+            runtimes = self.execute_in_parallel(queries, workers=workers)
+
+        finally:
+            self.execute(f"DROP TABLE IF EXISTS {tile_table};")
+
+        sql_finish_output = f"""
+            ALTER TABLE {output} SET LOGGED;
+
+            CREATE INDEX ON {output} USING GIST ({geom_col});
+        """
+        self.execute(sql_finish_output)
+
+        slowest = max(runtimes)
+        self._print(2, f"Slowest tile took {slowest:.2f} seconds")
+
+        return dict(enumerate(runtimes))
+
+    def _check_per_feature_query(self, query: str) -> None:
+        """
+        Raise a ``ValueError`` if a query is a plain aggregate, which
+        returns a single row no matter how many features it reads.
+        """
+
+        explained = self.query_as_single_item(f"EXPLAIN (FORMAT JSON) {query}")
+        if isinstance(explained, str):
+            explained = json.loads(explained)
+
+        plan = explained[0]["Plan"]
+
+        # Look past nodes that just pass the aggregate's row along
+        passthrough_nodes = ["Result", "Subquery Scan", "Limit"]
+        while plan["Node Type"] in passthrough_nodes and len(plan.get("Plans", [])) == 1:
+            plan = plan["Plans"][0]
+
+        if plan["Node Type"] == "Aggregate" and plan.get("Strategy") == "Plain":
+            raise ValueError(
+                "query_template must return one row per feature. Aggregates "
+                "without GROUP BY (like ST_Union) would only keep some tiles' results"
+            )
+
+    def make_hexagon_overlay(
+        self,
+        new_table_name: str,
+        table_to_cover: str,
+        desired_epsg: int,
+        hexagon_size: float,
+        schema: str = None,
+        extent: str = "exact",
+        clip_to_coverage: bool = False,
+        workers: int = 1,
+        engine: str = "sql",
+    ) -> None:
+        """
+        Create a new spatial hexagon grid covering another
+        spatial table. EPSG must be specified for the hexagons,
+        as well as the size in square KM.
+
+        With ``engine="sql"`` the hexagons are made inside the database
+        by the ``hex_grid()`` function. With ``engine="numpy"`` they are
+        made here with ``numpy`` and ``shapely`` and loaded with ``COPY``,
+        which is much faster for fine grids and keeps the cell size exact
+        instead of rounding it to whole units.
+
+        :param new_table_name: Name of the new table to create
+        :type new_table_name: str
+        :param table_to_cover: Name of the existing table you want to cover
+        :type table_to_cover: str
+        :param desired_epsg: integer for EPSG you want the hexagons to be in
+        :type desired_epsg: int
+        :param hexagon_size: Size of the hexagons, 1 = 1 square KM
+        :type hexagon_size: float
+        :param extent: ``"exact"`` scans the table once with ``ST_Extent``,
+                       ``"estimated"`` reads ``ST_EstimatedExtent`` from the
+                       planner statistics instead, defaults to ``"exact"``
+        :type extent: str, optional
+        :param clip_to_coverage: only keep hexagons that intersect a feature
+                                 in ``table_to_cover``, defaults to False
+        :type clip_to_coverage: bool, optional
+        :param workers: build the grid in this many vertical strips at
+                        once, defaults to 1. Only used by the ``"sql"`` engine
+        :type workers: int, optional
+        :param engine: ``"sql"`` or ``"numpy"``, defaults to ``"sql"``
+        :type engine: str, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        engine_options = ["sql", "numpy"]
+        if engine not in engine_options:
+            raise ValueError(f"engine must be one of: {engine_options}")
+
+        self._print(2, f"Creating hexagon table named: {schema}.{new_table_name}")
+
+        xmin, ymin, xmax, ymax = self._prepare_grid_table(
+            new_table_name, table_to_cover, desired_epsg, schema, extent
+        )
+
+        sql_clip = self._coverage_filter(table_to_cover, schema) if clip_to_coverage else ""
+
+        if engine == "numpy":
+            self._load_grid_via_copy(
+                new_table_name,
+                schema,
+                grid_as_ewkb(xmin, ymin, xmax, ymax, hexagon_size, desired_epsg, "hexagon"),
+                sql_clip,
+            )
+            self.table_add_spatial_index(new_table_name, schema=schema)
+            return
+
+        # Each strip starts on a multiple of the grid's column spacing,
+        # so the strips line up exactly and no hexagon is made twice
+        aream2 = hexagon_size * 1000000.0
+        qtrwidth = math.floor(math.sqrt(aream2 / (math.sqrt(3.0) * (3.0 / 2.0))) / 2.0)
+        column_width = qtrwidth * 6
+        num_columns = (xmax - xmin) // column_width + 1
+        columns_per_strip = -(-num_columns // max(workers, 1))
+
+        queries = []
+        for strip_xmin in range(xmin, xmax + 1, columns_per_strip * column_width):
+            strip_xmax = min(strip_xmin + columns_per_strip * column_width - 1, xmax)
+
+            queries.append(
+                f"""
+                INSERT INTO {schema}.{new_table_name} (geom)
+                SELECT h.geom
+                FROM hex_grid(
+                    {hexagon_size},
+                    {strip_xmin}, {ymin}, {strip_xmax}, {ymax},
+                    {desired_epsg}, {desired_epsg}, {desired_epsg}
+                ) AS h(geom)
+                {sql_clip};
+            """
+            )
+
+        if len(queries) == 1:
+            self.execute(queries[0])
+        else:
+            self.execute_in_parallel(queries, workers=workers)
+
+        self.table_add_spatial_index(new_table_name, schema=schema)
+
+    def make_square_overlay(
+        self,
+        new_table_name: str,
+        table_to_cover: str,
+        desired_epsg: int,
+        cell_size: float,
+        schema: str = None,
+        extent: str = "exact",
+        clip_to_coverage: bool = False,
+    ) -> None:
+        """
+        Create a new spatial grid of squares covering another
+        spatial table. The grid is made with ``numpy`` and loaded
+        with ``COPY``, just like ``make_hexagon_overlay(engine="numpy")``.
+
+        :param new_table_name: Name of the new table to create
+        :type new_table_name: str
+        :param table_to_cover: Name of the existing table you want to cover
+        :type table_to_cover: str
+        :param desired_epsg: integer for EPSG you want the squares to be in
+        :type desired_epsg: int
+        :param cell_size: Size of the squares, 1 = 1 square KM
+        :type cell_size: float
+        :param extent: ``"exact"`` or ``"estimated"``, defaults to ``"exact"``
+        :type extent: str, optional
+        :param clip_to_coverage: only keep squares that intersect a feature
+                                 in ``table_to_cover``, defaults to False
+        :type clip_to_coverage: bool, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        self._print(2, f"Creating square grid table named: {schema}.{new_table_name}")
+
+        xmin, ymin, xmax, ymax = self._prepare_grid_table(
+            new_table_name, table_to_cover, desired_epsg, schema, extent
+        )
+
+        sql_clip = self._coverage_filter(table_to_cover, schema) if clip_to_coverage else ""
+
+        self._load_grid_via_copy(
+            new_table_name,
+            schema,
+            grid_as_ewkb(xmin, ymin, xmax, ymax, cell_size, desired_epsg, "square"),
+            sql_clip,
+        )
+
+        self.table_add_spatial_index(new_table_name, schema=schema)
+
+    def _prepare_grid_table(
+        self,
+        new_table_name: str,
+        table_to_cover: str,
+        desired_epsg: int,
+        schema: str,
+        extent: str,
+    ) -> tuple:
+        """
+        Make an empty polygon table for a grid, and get the extent
+        that the grid needs to cover.
+
+        :return: ``(xmin, ymin, xmax, ymax)`` in ``desired_epsg``
+        :rtype: tuple
+        """
+
+        extent_options = ["exact", "estimated"]
+        if extent not in extent_options:
+            raise ValueError(f"extent must be one of: {extent_options}")
+
+        xmin, ymin, xmax, ymax = self._hexagon_extent(table_to_cover, schema, desired_epsg, extent)
+
+        if xmin is None:
+            raise ValueError(f"{schema}.{table_to_cover} has no geometries to cover")
+
+        sql_create_grid_table = f"""
+            DROP TABLE IF EXISTS {schema}.{new_table_name};
+
+            CREATE TABLE {schema}.{new_table_name} (
+                gid SERIAL NOT NULL PRIMARY KEY,
+                geom GEOMETRY('POLYGON', {desired_epsg}, 2) NOT NULL
+            )
+            WITH (OIDS=FALSE);
+        """
+        self.execute(sql_create_grid_table)
+
+        return xmin, ymin, xmax, ymax
+
+    def _coverage_filter(self, table_to_cover: str, schema: str) -> str:
+        """
+        Build a ``WHERE`` clause that keeps grid cells (aliased ``h``)
+        touching at least one feature in ``table_to_cover``.
+        The ``&&`` lets the covered table's GIST index do the work.
+        """
+
+        cover_srid = self.query_as_single_item(
+            f"SELECT Find_SRID('{schema}', '{table_to_cover}', 'geom');"
+        )
+
+        return f"""
+            WHERE EXISTS (
+                SELECT 1 FROM {schema}.{table_to_cover} c
+                WHERE c.geom && ST_Transform(h.geom, {cover_srid})
+                  AND ST_Intersects(c.geom, ST_Transform(h.geom, {cover_srid}))
+            )
+        """
+
+    def _load_grid_via_copy(
+        self, table_name: str, schema: str, ewkb_chunks, sql_clip: str = ""
+    ) -> None:
+        """
+        ``COPY`` chunks of hex EWKB (from ``grid_helpers.grid_as_ewkb()``)
+        into a grid table, in a single transaction. When there's a
+        ``sql_clip`` filter, the cells go through a temp table first.
+        """
+
+        connection = psycopg2.connect(self.uri())
+
+        try:
+            with connection.cursor() as cursor:
+                if sql_clip:
+                    cursor.execute(
+                        "CREATE TEMP TABLE pgis_grid_staging (geom geometry) ON COMMIT DROP;"
+                    )
+                    copy_target = "pgis_grid_staging"
+                else:
+                    copy_target = f"{schema}.{table_name}"
+
+                for chunk in ewkb_chunks:
+                    cursor.copy_expert(f"COPY {copy_target} (geom) FROM STDIN", io.BytesIO(chunk))
+
+                if sql_clip:
+                    cursor.execute(
+                        f"""
+                        INSERT INTO {schema}.{table_name} (geom)
+                        SELECT h.geom FROM pgis_grid_staging h
+                        {sql_clip};
+                    """
+                    )
+
+            connection.commit()
+
+        finally:
+            connection.close()
+
+    def _hexagon_extent(
+        self, table_name: str, schema: str, epsg: int, extent: str = "exact"
+    ) -> tuple:
+        """
+        Get the bounding box of a spatial table in another projection,
+        as whole numbers that fully contain it.
+
+        :return: ``(xmin, ymin, xmax, ymax)``
+        :rtype: tuple
+        """
+
+        sql_source_srid = f"Find_SRID('{schema}', '{table_name}', 'geom')"
+
+        sql_box = None
+
+        if extent == "estimated":
+            sql_estimated = f"""
+                SELECT ST_EstimatedExtent('{schema}', '{table_name}', 'geom') IS NOT NULL;
+            """
+            # Depending on the PostGIS version, missing stats are NULL or an error
+            try:
+                has_stats = self.query_as_single_item(sql_estimated)
+            except psycopg2.Error:
+                has_stats = False
+
+            if has_stats:
+                sql_box = f"""
+                    ST_Transform(
+                        ST_SetSRID(
+                            ST_EstimatedExtent('{schema}', '{table_name}', 'geom')::geometry,
+                            {sql_source_srid}
+                        ),
+                        {epsg}
+                    )
+                """
+            else:
+                self._print(2, f"No statistics for {schema}.{table_name}, scanning it instead")
+
+        if not sql_box:
+            sql_box = f"""
+                (SELECT ST_Extent(ST_Transform(geom, {epsg}))::geometry
+                 FROM {schema}.{table_name})
+            """
+
+        sql_extent = f"""
+            SELECT
+                floor(ST_XMin(box))::bigint, floor(ST_YMin(box))::bigint,
+                ceil(ST_XMax(box))::bigint, ceil(ST_YMax(box))::bigint
+            FROM (SELECT {sql_box} AS box) AS b;
+        """
+
+        return tuple(self.query_as_list(sql_extent)[0])
+
+    # MATERIALIZED views that are refreshed in place
+    # ----------------------------------------------
+
+    def make_materialized_geoview(
+        self,
+        query: str,
+        view_name: str,
+        geom_type: str,
+        epsg: int,
+        unique_key: str = "uid",
+        schema: str = None,
+    ) -> None:
+        """
+        Save a query as a materialized view, with a unique index on
+        ``unique_key`` and a spatial index on ``geom``.
+
+        Unlike ``make_geotable_from_query()``, the result can be brought
+        up to date with ``refresh()``, which readers never notice. The
+        view is stamped (with ``COMMENT ON``) with a hash of its
+        definition, so calling this again with the same query just
+        refreshes it. A changed query is built under a temporary name
+        and swapped in within one transaction.
+
+        :param query: ``SELECT`` query with a ``geom`` column
+        :type query: str
+        :param view_name: name of the materialized view
+        :type view_name: str
+        :param geom_type: geometry type, e.g. ``"MULTIPOLYGON"``
+        :type geom_type: str
+        :param epsg: EPSG of the query's geometry
+        :type epsg: int
+        :param unique_key: column (or list of columns) that is unique
+                           in every row of the query, defaults to "uid"
+        :type unique_key: str or list, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if geom_type.upper() not in VALID_GEOM_TYPES:
+            raise ValueError(f"geom_type must be one of: {VALID_GEOM_TYPES}")
+
+        # Postgres would truncate it, and the stamp lookup would miss it
+        if len(view_name) > MAX_IDENTIFIER_LENGTH:
+            raise ValueError(
+                f"view_name must be at most {MAX_IDENTIFIER_LENGTH} characters: {view_name}"
+            )
+
+        if isinstance(unique_key, str):
+            unique_key = [unique_key]
+
+        # Only the column names are needed, so no rows are fetched
+        connection = psycopg2.connect(self.uri())
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0")
+                columns = [col[0] for col in cursor.description]
+        finally:
+            connection.close()
+
+        missing = [col for col in ["geom"] + unique_key if col not in columns]
+        if missing:
+            raise ValueError(f"The query has no column named: {missing}")
+
+        # Cast the geometry so the view shows up properly in geometry_columns
+        select_list = ", ".join(
+            f"geom::geometry({geom_type.upper()}, {epsg}) AS geom" if col == "geom" else f'"{col}"'
+            for col in columns
+        )
+        key_list = ", ".join(unique_key)
+
+        def index_names(name):
+            return _fit_identifier(name, "_key_idx"), _fit_identifier(name, "_geom_idx")
+
+        def sql_create(name):
+            key_index, geom_index = index_names(name)
+            return f"""
+                CREATE MATERIALIZED VIEW {schema}.{name} AS
+                SELECT {select_list} FROM ({query}) AS q;
+
+                CREATE UNIQUE INDEX {key_index} ON {schema}.{name} ({key_list});
+                CREATE INDEX {geom_index} ON {schema}.{name} USING GIST (geom);
+            """
+
+        definition = hashlib.md5(sql_create(view_name).encode()).hexdigest()[:12]
+        stamp = f"postgis_helpers {definition}"
+
+        sql_current_stamp = f"""
+            SELECT obj_description(c.oid, 'pg_class')
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}' AND c.relname = '{view_name}' AND c.relkind = 'm';
+        """
+        current_stamp = self.query_as_list(sql_current_stamp)
+
+        if current_stamp and current_stamp[0][0] == stamp:
+            self._print(2, f"{schema}.{view_name} is unchanged, refreshing it")
+            self.refresh(view_name, schema=schema)
+            return
+
+        sql_stamp = f"COMMENT ON MATERIALIZED VIEW {schema}.{view_name} IS '{stamp}';"
+
+        if not current_stamp:
+            self._print(2, f"Making new materialized view in DB : {view_name}")
+            self.execute(sql_create(view_name) + sql_stamp)
+            return
+
+        # Dropping the old view would also drop anything built on top of it
+        dependents = [
+            name
+            for name, sources in self.all_materialized_views_as_dict(schema=schema).items()
+            if view_name in sources
+        ]
+        if dependents:
+            raise ValueError(
+                f"Can't redefine {schema}.{view_name}, these views depend on it: {dependents}"
+            )
+
+        self._print(2, f"Redefining materialized view in DB : {view_name}")
+
+        new_name = _fit_identifier(view_name, "_pgis_new")
+        key_index, geom_index = index_names(view_name)
+        new_key_index, new_geom_index = index_names(new_name)
+
+        self.execute(
+            f"DROP MATERIALIZED VIEW IF EXISTS {schema}.{new_name};" + sql_create(new_name)
+        )
+
+        sql_swap = f"""
+            DROP MATERIALIZED VIEW {schema}.{view_name};
+            ALTER MATERIALIZED VIEW {schema}.{new_name} RENAME TO {view_name};
+            ALTER INDEX {schema}.{new_key_index} RENAME TO {key_index};
+            ALTER INDEX {schema}.{new_geom_index} RENAME TO {geom_index};
+            {sql_stamp}
+        """
+        self.execute(sql_swap)
+
+    def _refresh_query(self, view_name: str, schema: str, concurrently: bool) -> str:
+        """
+        Get the ``REFRESH`` statement for a materialized view.
+
+        ``CONCURRENTLY`` needs a unique index without a ``WHERE``
+        clause, and a view that has been populated before. Views
+        without both are refreshed the regular way.
+        """
+
+        sql_refresh_info = f"""
+            SELECT m.ispopulated AND EXISTS(
+                SELECT 1 FROM pg_index i
+                WHERE i.indrelid = '{schema}.{view_name}'::regclass
+                  AND i.indisunique
+                  AND i.indpred IS NULL
+            )
+            FROM pg_matviews m
+            WHERE m.schemaname = '{schema}' AND m.matviewname = '{view_name}';
+        """
+        result = self.query_as_list(sql_refresh_info)
+
+        if not result:
+            raise ValueError(f"{schema}.{view_name} is not a materialized view")
+
+        if concurrently and not result[0][0]:
+            self._print(2, f"{schema}.{view_name} can't be refreshed concurrently")
+            concurrently = False
+
+        keyword = " CONCURRENTLY" if concurrently else ""
+
+        return f"REFRESH MATERIALIZED VIEW{keyword} {schema}.{view_name};"
+
+    @timer
+    def refresh(self, view_name: str, concurrently: bool = True, schema: str = None) -> None:
+        """
+        Re-run the query behind a materialized view.
+
+        With ``concurrently``, the view stays readable the whole
+        time and only the rows that changed are written.
+
+        :param view_name: Name of the materialized view
+        :type view_name: str
+        :param concurrently: refresh without locking out readers,
+                             defaults to True
+        :type concurrently: bool, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        self._print(2, f"Refreshing materialized view: {schema}.{view_name}")
+
+        self.execute(self._refresh_query(view_name, schema, concurrently))
+
+    @timer
+    def refresh_all(
+        self, concurrently: bool = True, workers: int = 4, schema: str = None
+    ) -> dict:
+        """
+        Refresh every materialized view in a schema, after
+        the views that they are built from.
+
+        Views are refreshed in layers: first the ones that only read
+        from tables, then the ones that read from those, and so on.
+        The views within each layer don't depend on each other, so
+        they are refreshed at the same time.
+
+        :param concurrently: refresh without locking out readers,
+                             defaults to True
+        :type concurrently: bool, optional
+        :param workers: number of views to refresh at once, defaults to 4
+        :type workers: int, optional
+        :return: refresh time of each view in seconds: ``{view_name: seconds}``
+        :rtype: dict
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        remaining = self.all_materialized_views_as_dict(schema=schema)
+
+        runtimes = {}
+
+        while remaining:
+            layer = sorted(
+                name
+                for name, sources in remaining.items()
+                if not any(source in remaining for source in sources)
+            )
+
+            self._print(2, f"Refreshing {len(layer)} materialized views: {layer}")
+
+            queries = [self._refresh_query(name, schema, concurrently) for name in layer]
+            layer_runtimes = self.execute_in_parallel(queries, workers=min(workers, len(layer)))
+
+            runtimes.update(zip(layer, layer_runtimes))
+
+            for name in layer:
+                del remaining[name]
+
+        return runtimes
+
+    # ANALYZE spatial relationships between tables
+    # --------------------------------------------
+
+    def _geometry_column_info(self, table_name: str, schema: str) -> tuple:
+        """
+        Get ``(geometry_type, srid)`` from ``geometry_columns``.
+
+        An untyped ``geometry`` column shows up there as ``GEOMETRY``
+        with SRID 0, so the type (the MULTI variant, if there's a mix)
+        and SRID are read off the features themselves instead.
+        """
+
+        sql_geom_info = f"""
+            SELECT type, srid FROM geometry_columns
+            WHERE f_table_schema = '{schema}'
+              AND f_table_name = '{table_name}'
+              AND f_geometry_column = 'geom';
+        """
+        result = self.query_as_list(sql_geom_info)
+
+        if not result:
+            raise ValueError(f"{schema}.{table_name} has no 'geom' column")
+
+        geom_type, srid = result[0]
+
+        if geom_type.upper() != "GEOMETRY" and srid:
+            return geom_type, srid
+
+        sql_feature_info = f"""
+            SELECT array_agg(DISTINCT upper(GeometryType(geom))),
+                   array_agg(DISTINCT ST_SRID(geom))
+            FROM {schema}.{table_name}
+            WHERE geom IS NOT NULL;
+        """
+        feature_types, feature_srids = self.query_as_list(sql_feature_info)[0]
+
+        if not feature_types:
+            raise ValueError(
+                f"{schema}.{table_name} has an untyped 'geom' column and no features to read from"
+            )
+
+        if geom_type.upper() == "GEOMETRY":
+            if len(set(t.replace("MULTI", "") for t in feature_types)) > 1:
+                raise ValueError(f"{schema}.{table_name} mixes geometry types: {feature_types}")
+            geom_type = max(feature_types, key=len)
+
+        if not srid:
+            if len(feature_srids) > 1:
+                raise ValueError(f"{schema}.{table_name} mixes SRIDs: {feature_srids}")
+            srid = feature_srids[0]
+
+        return geom_type, srid
+
+    @timer
+    def spatial_join(
+        self,
+        left_table: str,
+        right_table: str,
+        new_table: str,
+        predicate: str = "intersects",
+        distance: float = None,
+        schema: str = None,
+        uid_col: str = "uid",
+    ) -> None:
+        """
+        Join the attributes of ``right_table`` onto the features of
+        ``left_table`` wherever their geometries match the ``predicate``,
+        and save the result as a new spatial table. It all happens
+        inside the database, like a server-side ``geopandas.sjoin()``.
+
+        The smaller table (by the planner's row estimate) drives the
+        join, and the larger one is probed through its GIST index with a
+        ``LATERAL`` subquery. Both tables get a GIST index if they
+        don't have one yet.
+
+        The new table has all of ``left_table``'s columns, with its
+        ``uid_col`` renamed to ``left_<uid_col>``, plus every non-geometry
+        column of ``right_table`` prefixed with ``<right_table>_``.
+
+        :param left_table: table whose features are kept
+        :type left_table: str
+        :param right_table: table whose attributes are joined on
+        :type right_table: str
+        :param new_table: name of the new table to create
+        :type new_table: str
+        :param predicate: ``"intersects"``, ``"within"`` (left within right)
+                          or ``"dwithin"``, defaults to ``"intersects"``
+        :type predicate: str, optional
+        :param distance: search distance in map units, only for ``"dwithin"``
+        :type distance: float, optional
+        :param uid_col: unique ID column of both tables, defaults to "uid"
+        :type uid_col: str, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        predicate_options = ["intersects", "within", "dwithin"]
+        if predicate not in predicate_options:
+            raise ValueError(f"predicate must be one of: {predicate_options}")
+
+        if (predicate == "dwithin") != (distance is not None):
+            raise ValueError("distance is required for 'dwithin', and only for 'dwithin'")
+
+        geom_type, epsg = self._geometry_column_info(left_table, schema)
+        _, right_epsg = self._geometry_column_info(right_table, schema)
+
+        # make_geotable_from_query() would only print a warning and return
+        if geom_type.upper() not in VALID_GEOM_TYPES:
+            raise ValueError(
+                f"{left_table} is {geom_type}, which can't be saved. "
+                f"It must be one of: {VALID_GEOM_TYPES}"
+            )
+
+        # Transforming either side would keep the GIST index from being used
+        if epsg != right_epsg:
+            raise ValueError(
+                f"{left_table} is in EPSG:{epsg} but {right_table} is in EPSG:{right_epsg}. "
+                "Reproject one of them first."
+            )
+
+        for table_name in [left_table, right_table]:
+            if not self.table_has_spatial_index(table_name, schema=schema):
+                self.table_add_spatial_index(table_name, schema=schema)
+
+        # Drive the join from the smaller table, probing into the larger one
+        left_drives = self.table_row_estimate(
+            left_table, schema=schema
+        ) <= self.table_row_estimate(right_table, schema=schema)
+
+        if left_drives:
+            outer, inner = f"{schema}.{left_table} l", f"{schema}.{right_table} r"
+            left_ref, right_ref, inner_ref = "l", "joined", "r"
+        else:
+            outer, inner = f"{schema}.{right_table} r", f"{schema}.{left_table} l"
+            left_ref, right_ref, inner_ref = "joined", "r", "l"
+
+        sql_predicates = {
+            "intersects": "l.geom && r.geom AND ST_Intersects(l.geom, r.geom)",
+            "within": "l.geom && r.geom AND ST_Within(l.geom, r.geom)",
+            "dwithin": f"ST_DWithin(l.geom, r.geom, {distance})",
+        }
+
+        def left_column(col):
+            if col == uid_col:
+                return f"{left_ref}.{col} AS left_{col}"
+            # An untyped column can mix single and MULTI features
+            if col == "geom" and geom_type.upper().startswith("MULTI"):
+                return f"ST_Multi({left_ref}.geom) AS geom"
+            return f"{left_ref}.{col}"
+
+        left_columns = [
+            left_column(col) for col in self.table_columns_as_list(left_table, schema=schema)
+        ]
+        right_columns = [
+            f"{right_ref}.{col} AS {right_table}_{col}"
+            for col in self.table_columns_as_list(right_table, schema=schema)
+            if col != "geom"
+        ]
+
+        self._print(
+            2, f"Joining {right_table} onto {left_table} where {predicate}, into {new_table}"
+        )
+
+        sql_spatial_join = f"""
+            SELECT {", ".join(left_columns + right_columns)}
+            FROM {outer}
+            JOIN LATERAL (
+                SELECT {inner_ref}.*
+                FROM {inner}
+                WHERE {sql_predicates[predicate]}
+            ) AS joined ON TRUE
+        """
+
+        self.make_geotable_from_query(
+            sql_spatial_join, new_table, geom_type, epsg, schema=schema, uid_col=uid_col
+        )
+
+    @timer
+    def nearest(
+        self,
+        src_table: str,
+        target_table: str,
+        new_table: str,
+        k: int = 1,
+        max_distance: float = None,
+        schema: str = None,
+        src_uid: str = "uid",
+        target_uid: str = "uid",
+        workers: int = 4,
+        batches: int = None,
+    ) -> None:
+        """
+        Find the ``k`` closest features in ``target_table`` for every
+        feature in ``src_table``, and save them to a new (non-spatial)
+        table with columns ``src_id``, ``target_id``, ``distance``
+        and ``rank``.
+
+        Each lookup is a ``LATERAL ... ORDER BY geom <-> src.geom LIMIT k``
+        KNN query, which walks the target's GIST index instead of
+        measuring every pair. The source table is split into key ranges
+        that run on ``workers`` connections at once.
+
+        When both tables are the same, features aren't matched
+        with themselves.
+
+        :param src_table: table to find neighbors for
+        :type src_table: str
+        :param target_table: table to search for neighbors in
+        :type target_table: str
+        :param new_table: name of the new table to create
+        :type new_table: str
+        :param k: number of neighbors per feature, defaults to 1
+        :type k: int, optional
+        :param max_distance: ignore targets farther than this, in map units,
+                             defaults to None
+        :type max_distance: float, optional
+        :param src_uid: unique ID column of ``src_table``, defaults to "uid"
+        :type src_uid: str, optional
+        :param target_uid: unique ID column of ``target_table``, defaults to "uid"
+        :type target_uid: str, optional
+        :param workers: number of batches to run at once, defaults to 4
+        :type workers: int, optional
+        :param batches: number of key ranges to split ``src_table`` into,
+                        defaults to ``4 * workers``
+        :type batches: int, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not batches:
+            batches = 4 * workers
+
+        _, src_epsg = self._geometry_column_info(src_table, schema)
+        _, target_epsg = self._geometry_column_info(target_table, schema)
+
+        if src_epsg != target_epsg:
+            raise ValueError(
+                f"{src_table} is in EPSG:{src_epsg} but {target_table} is in "
+                f"EPSG:{target_epsg}. Reproject one of them first."
+            )
+
+        if not self.table_has_spatial_index(target_table, schema=schema):
+            self.table_add_spatial_index(target_table, schema=schema)
+
+        sql_filters = []
+        if max_distance is not None:
+            sql_filters.append(f"ST_DWithin(t.geom, s.geom, {max_distance})")
+        if src_table == target_table:
+            sql_filters.append(f"t.{target_uid} <> s.{src_uid}")
+
+        sql_where = "WHERE " + " AND ".join(sql_filters) if sql_filters else ""
+
+        self._print(2, f"Finding the {k} nearest {target_table} for each {src_table}")
+
+        sql_create_table = f"""
+            DROP TABLE IF EXISTS {schema}.{new_table};
+            CREATE TABLE {schema}.{new_table} AS
+            SELECT s.{src_uid} AS src_id, t.{target_uid} AS target_id,
+                   0::float AS distance, 0::bigint AS rank
+            FROM {schema}.{src_table} s, {schema}.{target_table} t
+            WITH NO DATA;
+        """
+        self.execute(sql_create_table)
+
+        queries = [
+            f"""
+            INSERT INTO {schema}.{new_table}
+            SELECT s.{src_uid}, knn.target_id, knn.distance, knn.rank
+            FROM (SELECT * FROM {schema}.{src_table} WHERE {condition}) AS s
+            CROSS JOIN LATERAL (
+                SELECT
+                    nearby.{target_uid} AS target_id,
+                    ST_Distance(nearby.geom, s.geom) AS distance,
+                    row_number() OVER (ORDER BY nearby.knn_distance) AS rank
+                FROM (
+                    SELECT t.{target_uid}, t.geom, t.geom <-> s.geom AS knn_distance
+                    FROM {schema}.{target_table} t
+                    {sql_where}
+                    ORDER BY t.geom <-> s.geom
+                    LIMIT {k}
+                ) AS nearby
+            ) AS knn;
+            """
+            for condition in self._transfer_ranges(src_table, schema, batches)
+        ]
+
+        self.execute_in_parallel(queries, workers=workers)
+
+        sql_index = f"""
+            CREATE INDEX ON {schema}.{new_table} (src_id);
+        """
+        self.execute(sql_index)
+
+    # EXPORT data to file / disk
+    # --------------------------
+
+    @timer
+    def export_shapefile(
+        self,
+        table_name: str,
         output_folder: Path,
         where_clause: str = None,
         schema: str = None,
@@ -1157,6 +4036,113 @@ class PostgreSQL:
         for table in self.all_spatial_tables_as_dict():
             self.export_shapefile(table, output_folder)
 
+    @timer
+    def export_geojson(
+        self,
+        query_or_table: str,
+        output_path: Path = None,
+        newline_delimited: bool = True,
+        maxdecimaldigits: int = 9,
+        epsg: int = 4326,
+        geom_col: str = "geom",
+        schema: str = None,
+        batch_size: int = 10000,
+    ) -> Path:
+        """
+        Save a spatial table or query to GeoJSON without going
+        through a geodataframe.
+
+        Each feature is built by PostGIS with ``ST_AsGeoJSON()``
+        and streamed from a server-side cursor straight to disk,
+        so memory use stays flat regardless of the layer's size.
+
+        With ``newline_delimited=True`` the output has one feature
+        per line (GeoJSONSeq / NDJSON), which ``tippecanoe`` can read
+        in parallel. Otherwise a regular ``FeatureCollection`` is written.
+
+        :param query_or_table: name of a table, or any valid SQL query
+        :type query_or_table: str
+        :param output_path: file to write to, defaults to a file
+                            named after the table in the DATA_OUTBOX
+        :type output_path: Path, optional
+        :param newline_delimited: write one feature per line,
+                                  defaults to True
+        :type newline_delimited: bool, optional
+        :param maxdecimaldigits: coordinate precision, defaults to 9
+        :type maxdecimaldigits: int, optional
+        :param epsg: EPSG to transform the geometry into. Use ``None``
+                     to keep the source projection, defaults to 4326
+        :type epsg: int, optional
+        :param geom_col: name of the geometry column, defaults to "geom"
+        :type geom_col: str, optional
+        :param batch_size: rows fetched per round-trip, defaults to 10000
+        :type batch_size: int, optional
+        :return: path to the GeoJSON file
+        :rtype: Path
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        # A bare table name has no whitespace, anything else is a query
+        if len(query_or_table.split()) == 1:
+            name = query_or_table.split(".")[-1]
+            if "." not in query_or_table:
+                query_or_table = f"{schema}.{query_or_table}"
+            query = f"SELECT * FROM {query_or_table}"
+        else:
+            name = "query"
+            query = query_or_table.strip().rstrip(";")
+
+        if not output_path:
+            extension = "geojsonl" if newline_delimited else "geojson"
+            output_path = self.DATA_OUTBOX / f"{name}.{extension}"
+
+        output_path = Path(output_path)
+
+        self._print(2, f"Exporting {name} to {output_path}")
+
+        if epsg:
+            # Reprojecting means the geometry can't be read straight off the row
+            sql_features = f"""
+                SELECT json_build_object(
+                    'type', 'Feature',
+                    'geometry', ST_AsGeoJSON(
+                        ST_Transform(t.{geom_col}, {epsg}), {maxdecimaldigits}
+                    )::json,
+                    'properties', to_jsonb(t) - '{geom_col}'
+                )::text
+                FROM ({query}) t
+            """
+        else:
+            sql_features = f"""
+                SELECT ST_AsGeoJSON(t.*, '{geom_col}', {maxdecimaldigits})
+                FROM ({query}) t
+            """
+
+        feature_count = 0
+
+        with open(output_path, "w") as open_file:
+            if not newline_delimited:
+                open_file.write('{"type": "FeatureCollection", "features": [\n')
+
+            for row in self.query_as_generator(sql_features, batch_size=batch_size):
+                if newline_delimited:
+                    open_file.write(row[0] + "\n")
+                else:
+                    if feature_count:
+                        open_file.write(",\n")
+                    open_file.write(row[0])
+
+                feature_count += 1
+
+            if not newline_delimited:
+                open_file.write("\n]}\n")
+
+        self._print(1, f"Wrote {feature_count} features to {output_path}")
+
+        return output_path
+
     # IMPORT/EXPORT data with shp2pgsql / pgsql2shp
     # ---------------------------------------------
     def pgsql2shp(
@@ -1262,32 +4248,947 @@ class PostgreSQL:
     # TRANSFER data to another database
     # ---------------------------------
 
+    def _table_ddl(
+        self,
+        table_name: str,
+        schema: str = None,
+        target_table: str = None,
+        target_schema: str = None,
+        unlogged: bool = False,
+    ) -> tuple:
+        """
+        Read a table's definition from the catalog and turn it into
+        SQL that recreates it somewhere else.
+
+        Two strings are returned. The first drops and recreates the
+        bare table (typed columns, including ``geometry(TYPE, SRID)``).
+        The second adds the constraints, indexes and serial sequences,
+        and is meant to run after the data has been loaded.
+
+        Other ``nextval()`` defaults get a sequence of the same name
+        and schema on the target, set to where the source one is.
+        Foreign keys aren't included, because the tables they point at
+        may not be there yet. See ``_foreign_key_ddl()``.
+
+        :param table_name: Name of the source table
+        :type table_name: str
+        :param target_table: Name for the new table, defaults to ``table_name``
+        :type target_table: str, optional
+        :param target_schema: Schema for the new table, defaults to ``schema``
+        :type target_schema: str, optional
+        :param unlogged: create the table as ``UNLOGGED`` and switch it
+                         to ``LOGGED`` in the post-load SQL, defaults to False
+        :type unlogged: bool, optional
+        :raises ValueError: if an index definition can't be pointed at the new table
+        :return: tuple with the create SQL and the post-load SQL
+        :rtype: tuple
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not target_table:
+            target_table = table_name
+
+        if not target_schema:
+            target_schema = schema
+
+        target = f"{target_schema}.{target_table}"
+
+        sql_columns = f"""
+            SELECT a.attname,
+                   format_type(a.atttypid, a.atttypmod),
+                   a.attnotnull,
+                   pg_get_expr(d.adbin, d.adrelid),
+                   (
+                       SELECT format('%I.%I', sn.nspname, sc.relname)
+                       FROM pg_depend dep
+                       JOIN pg_class sc ON sc.oid = dep.refobjid
+                       JOIN pg_namespace sn ON sn.oid = sc.relnamespace
+                       WHERE dep.classid = 'pg_attrdef'::regclass
+                           AND dep.objid = d.oid
+                           AND sc.relkind = 'S'
+                       LIMIT 1
+                   )
+            FROM pg_attribute a
+            LEFT JOIN pg_attrdef d
+                ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+            WHERE a.attrelid = '{schema}.{table_name}'::regclass
+                AND a.attnum > 0
+                AND NOT a.attisdropped
+            ORDER BY a.attnum;
+        """
+
+        sql_constraints = f"""
+            SELECT pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = '{schema}.{table_name}'::regclass
+                AND contype IN ('p', 'u', 'c');
+        """
+
+        # Indexes that back a constraint are recreated by the constraint
+        sql_indexes = f"""
+            SELECT pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            WHERE i.indrelid = '{schema}.{table_name}'::regclass
+                AND NOT EXISTS (
+                    SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid
+                );
+        """
+
+        serial_types = {
+            "smallint": "smallserial",
+            "integer": "serial",
+            "bigint": "bigserial",
+        }
+
+        column_definitions = []
+        serial_columns = []
+        sequences = []
+
+        for col_name, col_type, not_null, default, sequence in self.query_as_list(sql_columns):
+
+            # Sequences belong to the source DB, so serials get a fresh one
+            if default and default.startswith("nextval(") and col_type in serial_types:
+                col_def = f"{col_name} {serial_types[col_type]}"
+                serial_columns.append(col_name)
+            else:
+                # Any other sequence is made again under the same name
+                if sequence:
+                    default = re.sub(
+                        r"nextval\('[^']+'::regclass\)",
+                        lambda _: f"nextval('{sequence}'::regclass)",
+                        default,
+                    )
+                    if sequence not in sequences:
+                        sequences.append(sequence)
+
+                col_def = f"{col_name} {col_type}"
+                if default:
+                    col_def += f" DEFAULT {default}"
+                if not_null:
+                    col_def += " NOT NULL"
+
+            column_definitions.append(col_def)
+
+        sql_sequences = ""
+        sequence_values = []
+
+        for sequence in sequences:
+            seq_schema, seq_name = sequence.split(".", 1)
+            start_value, increment, last_value = self.query_as_list(
+                f"""
+                SELECT start_value, increment_by, last_value
+                FROM pg_sequences
+                WHERE format('%I.%I', schemaname, sequencename) = '{sequence}';
+            """
+            )[0]
+
+            sql_sequences += f"""
+            CREATE SCHEMA IF NOT EXISTS {seq_schema};
+            CREATE SEQUENCE IF NOT EXISTS {sequence}
+                INCREMENT BY {increment} START WITH {start_value};
+            """
+
+            # NULL until nextval() has been called on the source
+            if last_value is not None:
+                sequence_values.append(f"SELECT setval('{sequence}', {last_value});")
+
+        columns = ",\n                ".join(column_definitions)
+
+        table_kind = "UNLOGGED TABLE" if unlogged else "TABLE"
+
+        sql_create = f"""
+            CREATE SCHEMA IF NOT EXISTS {target_schema};
+            DROP TABLE IF EXISTS {target} CASCADE;
+            {sql_sequences}
+            CREATE {table_kind} {target} (
+                {columns}
+            );
+        """
+
+        post_load = []
+
+        if unlogged:
+            post_load.append(f"ALTER TABLE {target} SET LOGGED;")
+
+        for (constraint,) in self.query_as_list(sql_constraints):
+            post_load.append(f"ALTER TABLE {target} ADD {constraint};")
+
+        # Drop the index name and point it at the new table:
+        # CREATE INDEX my_idx ON public.my_table USING gist (geom)
+        index_pattern = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?\S+ (USING .*)$")
+
+        for (index_def,) in self.query_as_list(sql_indexes):
+            match = index_pattern.match(index_def)
+            if not match:
+                raise ValueError(f"Can't recreate index on {schema}.{table_name}: {index_def}")
+
+            unique, _, using = match.groups()
+            post_load.append(f"CREATE {unique or ''}INDEX ON {target} {using};")
+
+        for col_name in serial_columns:
+            post_load.append(
+                f"""SELECT setval(
+                    pg_get_serial_sequence('{target}', '{col_name}'),
+                    COALESCE(MAX({col_name}), 0) + 1,
+                    false
+                ) FROM {target};"""
+            )
+
+        post_load += sequence_values
+
+        sql_post_load = "\n".join(post_load)
+
+        return sql_create, sql_post_load
+
+    def _foreign_key_ddl(self, tables: list, target_schema: str = None) -> str:
+        """
+        Make SQL that adds the foreign keys between a set of copied
+        tables, to run once all of them are loaded.
+
+        Foreign keys that point at a table outside the set can't be
+        made on the target, so they're left out with a warning.
+
+        :param tables: ``(schema, table_name)`` tuples being copied
+        :type tables: list
+        :param target_schema: schema all of the copies are made in,
+                              defaults to each table's own schema
+        :type target_schema: str, optional
+        :return: ``ALTER TABLE ... ADD CONSTRAINT`` statements
+        :rtype: str
+        """
+
+        if not tables:
+            return ""
+
+        names = ", ".join(f"('{schema}', '{table_name}')" for schema, table_name in tables)
+
+        sql_foreign_keys = f"""
+            SELECT n.nspname, c.relname, con.conname,
+                   rn.nspname, rc.relname,
+                   pg_get_constraintdef(con.oid)
+            FROM pg_constraint con
+            JOIN pg_class c ON c.oid = con.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_class rc ON rc.oid = con.confrelid
+            JOIN pg_namespace rn ON rn.oid = rc.relnamespace
+            WHERE con.contype = 'f'
+                AND (n.nspname, c.relname) IN (VALUES {names})
+            ORDER BY n.nspname, c.relname, con.conname;
+        """
+
+        statements = []
+
+        for schema, table_name, name, ref_schema, ref_table, definition in self.query_as_list(
+            sql_foreign_keys
+        ):
+            if (ref_schema, ref_table) not in tables:
+                self._print(
+                    3,
+                    f"Not copying foreign key {name} on {schema}.{table_name}: "
+                    f"{ref_schema}.{ref_table} isn't being copied with it",
+                )
+                continue
+
+            # Point the key at the copy of the table it references
+            definition = re.sub(
+                r"REFERENCES \S+?\(",
+                lambda _: f"REFERENCES {target_schema or ref_schema}.{ref_table}(",
+                definition,
+                count=1,
+            )
+            statements.append(
+                f"ALTER TABLE {target_schema or schema}.{table_name} "
+                f"ADD CONSTRAINT {name} {definition};"
+            )
+
+        return "\n".join(statements)
+
+    @timer
     def transfer_data_to_another_db(
-        self, table_name: str, other_postgresql_db, schema: str = None
+        self,
+        table_name: str,
+        other_postgresql_db,
+        schema: str = None,
+        target_schema: str = None,
+        max_chunks: int = 64,
+        mode: str = "auto",
+        foreign_keys: bool = True,
     ) -> None:
         """
         Copy data from one SQL database to another.
 
+        When both databases live on the same SQL cluster, the copy
+        can run entirely on the server: ``postgres_fdw`` is set up on
+        the target and the rows are moved with
+        ``INSERT INTO ... SELECT * FROM foreign_table``.
+
+        Otherwise the table's definition (typed geometry column, SRID,
+        constraints and indexes) is recreated on the target. The rows
+        are then piped from ``COPY ... TO STDOUT (FORMAT binary)`` on
+        this database into ``COPY ... FROM STDIN (FORMAT binary)`` on
+        the other, through a buffer of ``max_chunks`` chunks.
+        Nothing is materialized in Python, and the whole load runs in
+        one transaction on the target.
+
         :param table_name: Name of the table to copy
         :type table_name: str
         :param other_postgresql_db: ``PostgreSQL()`` object for target database
         :type other_postgresql_db: PostgreSQL
+        :param target_schema: schema to create the table in on the target,
+                              defaults to the target's ``ACTIVE_SCHEMA``
+        :type target_schema: str, optional
+        :param max_chunks: size of the buffer between the two databases,
+                           defaults to 64
+        :type max_chunks: int, optional
+        :param mode: ``"copy"`` always pipes the data through this client,
+                     ``"fdw"`` always runs the copy on the server, and
+                     ``"auto"`` uses ``"fdw"`` when both databases share a
+                     cluster and falls back to ``"copy"`` if that fails.
+                     Defaults to ``"auto"``
+        :type mode: str, optional
+        :param foreign_keys: add the table's foreign keys that point at
+                             itself, and warn about the others. Turn this
+                             off when the caller adds them for a whole
+                             set of tables. Defaults to True
+        :type foreign_keys: bool, optional
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not target_schema:
+            target_schema = other_postgresql_db.ACTIVE_SCHEMA
+
+        mode_options = ["auto", "copy", "fdw"]
+
+        if mode not in mode_options:
+            raise ValueError(f"mode must be one of: {mode_options}")
+
+        same_table = (
+            self.same_cluster_as(other_postgresql_db)
+            and self.DATABASE == other_postgresql_db.DATABASE
+            and schema == target_schema
+        )
+        if same_table:
+            raise ValueError("Source and target are the same table")
+
+        sql_foreign_keys = ""
+        if foreign_keys:
+            sql_foreign_keys = self._foreign_key_ddl([(schema, table_name)], target_schema)
+
+        msg = f"Transferring {schema}.{table_name} to {other_postgresql_db.DATABASE}"
+        self._print(2, msg + f" @ {other_postgresql_db.HOST}")
+
+        if mode == "fdw" or (mode == "auto" and self.same_cluster_as(other_postgresql_db)):
+            try:
+                self._transfer_via_fdw(
+                    table_name, other_postgresql_db, schema=schema, target_schema=target_schema
+                )
+                if sql_foreign_keys:
+                    other_postgresql_db.execute(sql_foreign_keys)
+                return
+
+            except psycopg2.Error as e:
+                if mode == "fdw":
+                    raise
+                self._print(2, f"Server-side transfer failed, copying via client: {e}")
+
+        sql_create, sql_post_load = self._table_ddl(
+            table_name, schema=schema, target_schema=target_schema
+        )
+
+        copy_out_sql = f"COPY {schema}.{table_name} TO STDOUT (FORMAT binary)"
+        copy_in_sql = f"COPY {target_schema}.{table_name} FROM STDIN (FORMAT binary)"
+
+        source_connection = psycopg2.connect(self.uri())
+        target_connection = psycopg2.connect(other_postgresql_db.uri())
+
+        try:
+            with target_connection.cursor() as cursor:
+                cursor.execute(sql_create)
+
+            bytes_copied = copy_between_connections(
+                source_connection,
+                copy_out_sql,
+                target_connection,
+                copy_in_sql,
+                max_chunks=max_chunks,
+            )
+
+            with target_connection.cursor() as cursor:
+                if sql_post_load or sql_foreign_keys:
+                    cursor.execute(sql_post_load + sql_foreign_keys)
+
+            target_connection.commit()
+
+        finally:
+            source_connection.close()
+            target_connection.close()
+
+        self._print(1, f"Copied {bytes_copied / 1e6:.1f} MB")
+
+    def same_cluster_as(self, other_postgresql_db) -> bool:
+        """
+        Does the other database live on the same SQL cluster as this one?
+
+        :param other_postgresql_db: ``PostgreSQL()`` object to compare against
+        :type other_postgresql_db: PostgreSQL
+        :return: True if the host and port match
+        :rtype: bool
+        """
+
+        local_hosts = ["localhost", "127.0.0.1", "::1"]
+
+        def normalize(host):
+            return "localhost" if host in local_hosts else host.lower()
+
+        same_host = normalize(self.HOST) == normalize(other_postgresql_db.HOST)
+        same_port = str(self.PORT) == str(other_postgresql_db.PORT)
+
+        return same_host and same_port
+
+    def _transfer_via_fdw(
+        self,
+        table_name: str,
+        other_postgresql_db,
+        schema: str,
+        target_schema: str,
+        fetch_size: int = 50000,
+    ) -> None:
+        """
+        Copy a table to another database on the same cluster without
+        the data ever leaving the server.
+
+        A ``postgres_fdw`` server pointing back at this database is
+        created on the target, under a name unique to this call. The
+        table is imported as a foreign table into a scratch schema and
+        copied with ``INSERT INTO ... SELECT``.
+
+        Everything on the target happens in one transaction, and the
+        server, its user mapping (which holds this database's password)
+        and the scratch schema are dropped before it commits. So nothing
+        is left behind on the target, other calls never see them, and a
+        failure rolls all of it back.
+        """
+
+        # Unique per call, so parallel transfers don't collide
+        fdw_name = f"pgis_fdw_{uuid.uuid4().hex[:12]}"
+
+        sql_create, sql_post_load = self._table_ddl(
+            table_name, schema=schema, target_schema=target_schema
+        )
+
+        sql_setup_fdw = f"""
+            CREATE EXTENSION IF NOT EXISTS postgres_fdw;
+
+            CREATE SERVER {fdw_name}
+            FOREIGN DATA WRAPPER postgres_fdw
+            OPTIONS (
+                host '{self.HOST}',
+                port '{self.PORT}',
+                dbname '{self.DATABASE}',
+                fetch_size '{fetch_size}'
+            );
+
+            CREATE USER MAPPING FOR CURRENT_USER
+            SERVER {fdw_name}
+            OPTIONS (user '{self.USER}', password '{self.PASSWORD}');
+
+            CREATE SCHEMA {fdw_name};
+
+            IMPORT FOREIGN SCHEMA {schema} LIMIT TO ({table_name})
+            FROM SERVER {fdw_name} INTO {fdw_name};
+        """
+
+        sql_insert = f"""
+            INSERT INTO {target_schema}.{table_name}
+            SELECT * FROM {fdw_name}.{table_name};
+        """
+
+        # CASCADE takes the foreign table and the user mapping with them
+        sql_teardown_fdw = f"""
+            DROP SCHEMA {fdw_name} CASCADE;
+            DROP SERVER {fdw_name} CASCADE;
+        """
+
+        self._print(1, f"Copying {table_name} on the server via postgres_fdw")
+
+        target_connection = psycopg2.connect(other_postgresql_db.uri())
+
+        try:
+            with target_connection.cursor() as cursor:
+                cursor.execute(sql_setup_fdw)
+                cursor.execute(sql_create)
+                cursor.execute(sql_insert)
+                cursor.execute(sql_teardown_fdw)
+                if sql_post_load:
+                    cursor.execute(sql_post_load)
+
+            target_connection.commit()
+
+        finally:
+            target_connection.close()
+
+    @timer
+    def replicate_incremental(
+        self,
+        table_name: str,
+        other_postgresql_db,
+        watermark_column: str,
+        key_columns: list = None,
+        schema: str = None,
+        target_schema: str = None,
+        max_chunks: int = 64,
+    ) -> int:
+        """
+        Copy only the rows that are new since the last run.
+
+        The highest ``watermark_column`` value copied so far is kept on
+        the target in a ``pgis_replication_watermarks`` table. Each run
+        copies the rows above it with a binary ``COPY`` pipe, then moves
+        the watermark forward in the same transaction as the data.
+
+        With ``key_columns`` the delta is upserted: rows on the target
+        with a matching key are replaced. Without it the delta is
+        appended, which suits append-only tables.
+
+        The first run creates the target table and copies everything.
+        If the target table already exists (say, from an earlier
+        ``transfer_data_to_another_db()``) but has never been replicated
+        to, appends start after the highest watermark already on the
+        target, so its rows aren't copied twice. Upserts copy everything.
+        Rows that show up later with a watermark at or below one already
+        copied will not be picked up.
+
+        :param table_name: Name of the table to replicate
+        :type table_name: str
+        :param other_postgresql_db: ``PostgreSQL()`` object for target database
+        :type other_postgresql_db: PostgreSQL
+        :param watermark_column: ever-increasing column, like a
+                                 timestamp or serial id
+        :type watermark_column: str
+        :param key_columns: columns that identify a row for upserts,
+                            defaults to None (append only)
+        :type key_columns: list, optional
+        :param target_schema: schema of the table on the target,
+                              defaults to the target's ``ACTIVE_SCHEMA``
+        :type target_schema: str, optional
+        :return: number of rows copied
+        :rtype: int
         """
 
         if not schema:
             schema = self.ACTIVE_SCHEMA
 
-        query = f"SELECT * FROM {schema}.{table_name}"
+        if not target_schema:
+            target_schema = other_postgresql_db.ACTIVE_SCHEMA
+
+        source = f"{schema}.{table_name}"
+        target = f"{target_schema}.{table_name}"
+        watermarks = f"{target_schema}.pgis_replication_watermarks"
+
+        # Make the target table and the watermark table on the first run
+        target_exists = other_postgresql_db.query_as_single_item(
+            f"SELECT to_regclass('{target}') IS NOT NULL;"
+        )
+
+        if not target_exists:
+            sql_create, sql_post_load = self._table_ddl(
+                table_name, schema=schema, target_schema=target_schema
+            )
+            sql_foreign_keys = self._foreign_key_ddl([(schema, table_name)], target_schema)
+            other_postgresql_db.execute(sql_create + sql_post_load + sql_foreign_keys)
+
+        sql_make_watermarks = f"""
+            CREATE TABLE IF NOT EXISTS {watermarks} (
+                source_host TEXT,
+                source_db TEXT,
+                source_table TEXT,
+                watermark_column TEXT,
+                watermark TEXT,
+                rows_copied BIGINT,
+                updated_at TIMESTAMPTZ DEFAULT now(),
+                PRIMARY KEY (source_host, source_db, source_table)
+            );
+        """
+        other_postgresql_db.execute(sql_make_watermarks)
+
+        source_id = f"""
+            source_host = '{self.HOST}'
+            AND source_db = '{self.DATABASE}'
+            AND source_table = '{source}'
+        """
+
+        old_watermark = other_postgresql_db.query_as_list(
+            f"SELECT watermark FROM {watermarks} WHERE {source_id};"
+        )
+        old_watermark = old_watermark[0][0] if old_watermark else None
+
+        # Appending everything to a table that already has rows would
+        # duplicate them, so pick up from what the target already holds
+        if old_watermark is None and target_exists and not key_columns:
+            old_watermark = other_postgresql_db.query_as_single_item(
+                f"SELECT MAX({watermark_column})::text FROM {target};"
+            )
+            if old_watermark is not None:
+                self._print(2, f"Seeding the watermark from {target}: {old_watermark}")
+
+        # Pin the upper bound now so rows arriving mid-copy wait for the next run
+        if old_watermark is None:
+            where_clause = "TRUE"
+        else:
+            old_literal = psycopg2.extensions.adapt(old_watermark).getquoted().decode()
+            where_clause = f"{watermark_column} > {old_literal}"
+
+        new_watermark = self.query_as_single_item(
+            f"SELECT MAX({watermark_column})::text FROM {source} WHERE {where_clause};"
+        )
+
+        if new_watermark is None:
+            self._print(2, f"{source} has no rows past the watermark: {old_watermark}")
+            return 0
+
+        new_literal = psycopg2.extensions.adapt(new_watermark).getquoted().decode()
+        where_clause += f" AND {watermark_column} <= {new_literal}"
+
+        self._print(2, f"Replicating {source} up to {watermark_column} = {new_watermark}")
+
+        copy_out_sql = f"""
+            COPY (SELECT * FROM {source} WHERE {where_clause})
+            TO STDOUT (FORMAT binary)
+        """
+
+        # The delta lands in a temp table first, so the INSERT into the
+        # target reports exactly how many rows were copied
+        load_into = "pgis_replication_delta"
+        sql_prepare = f"""
+            CREATE TEMP TABLE {load_into} (LIKE {target}) ON COMMIT DROP;
+        """
+
+        sql_merge = ""
+        if key_columns:
+            key_match = " AND ".join([f"t.{k} = d.{k}" for k in key_columns])
+            sql_merge = f"DELETE FROM {target} t USING {load_into} d WHERE {key_match};"
+
+        sql_insert = f"INSERT INTO {target} SELECT * FROM {load_into};"
+
+        def sql_update_watermark(rows_copied):
+            return f"""
+                INSERT INTO {watermarks}
+                    (source_host, source_db, source_table, watermark_column, watermark, rows_copied)
+                VALUES
+                    ('{self.HOST}', '{self.DATABASE}', '{source}',
+                     '{watermark_column}', {new_literal}, {rows_copied})
+                ON CONFLICT (source_host, source_db, source_table) DO UPDATE
+                SET watermark = EXCLUDED.watermark,
+                    watermark_column = EXCLUDED.watermark_column,
+                    rows_copied = EXCLUDED.rows_copied,
+                    updated_at = now();
+            """
+
+        source_connection = psycopg2.connect(self.uri())
+        target_connection = psycopg2.connect(other_postgresql_db.uri())
+
+        try:
+            with target_connection.cursor() as cursor:
+                cursor.execute(sql_prepare)
+
+            copy_between_connections(
+                source_connection,
+                copy_out_sql,
+                target_connection,
+                f"COPY {load_into} FROM STDIN (FORMAT binary)",
+                max_chunks=max_chunks,
+            )
+
+            with target_connection.cursor() as cursor:
+                if sql_merge:
+                    cursor.execute(sql_merge)
+                cursor.execute(sql_insert)
+                row_count = cursor.rowcount
+                cursor.execute(sql_update_watermark(row_count))
+
+            target_connection.commit()
+
+        finally:
+            source_connection.close()
+            target_connection.close()
+
+        return row_count
 
-        # If the data is spatial use a geodataframe
-        if table_name in self.all_spatial_tables_as_dict():
-            gdf = self.query_as_geo_df(query)
-            other_postgresql_db.import_geodataframe(gdf, table_name)
+    def _transfer_ranges(self, table_name: str, schema: str, parts: int) -> list:
+        """
+        Split a table into ``parts`` WHERE clauses that can be
+        copied independently.
+
+        A single-column integer primary key is split into key ranges.
+        Any other table is split into ``ctid`` page ranges.
+
+        :return: list of SQL ``WHERE`` conditions
+        :rtype: list
+        """
+
+        sql_primary_key = f"""
+            SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+            FROM pg_index i
+            JOIN pg_attribute a
+                ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+            WHERE i.indrelid = '{schema}.{table_name}'::regclass
+                AND i.indisprimary;
+        """
+        primary_key = self.query_as_list(sql_primary_key)
+
+        if len(primary_key) == 1 and primary_key[0][1] in ["smallint", "integer", "bigint"]:
+            key = primary_key[0][0]
+            low, high = self.query_as_list(
+                f"SELECT MIN({key}), MAX({key}) FROM {schema}.{table_name};"
+            )[0]
+
+            if low is None:
+                return ["TRUE"]
+
+            step = max((high - low + 1) // parts, 1)
+            bounds = list(range(low, high + 1, step))[:parts] + [high + 1]
+
+            conditions = [
+                f"{key} >= {lo} AND {key} < {hi}" for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
 
-        # Otherwise use a normal dataframe
         else:
-            df = self.query_as_df(query)
-            other_postgresql_db.import_dataframe(df, table_name)
+            pages = self.query_as_single_item(
+                f"""SELECT pg_relation_size('{schema}.{table_name}'::regclass)
+                        / current_setting('block_size')::int;"""
+            )
+
+            step = max(pages // parts + 1, 1)
+            bounds = list(range(0, pages + 1, step))[:parts]
+
+            conditions = [
+                f"ctid >= '({lo},0)'::tid AND ctid < '({hi},0)'::tid"
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+            # Leave the last range open so no page is ever missed
+            conditions.append(f"ctid >= '({bounds[-1]},0)'::tid")
+
+        return conditions
+
+    def _transfer_slice(
+        self,
+        table_name: str,
+        other_postgresql_db,
+        schema: str,
+        target_schema: str,
+        where_clause: str,
+        max_chunks: int = 64,
+    ) -> int:
+        """
+        Copy the rows matching ``where_clause`` into an existing
+        table on the target, with a binary ``COPY`` pipe.
+
+        :return: number of bytes copied
+        :rtype: int
+        """
+
+        copy_out_sql = f"""
+            COPY (SELECT * FROM {schema}.{table_name} WHERE {where_clause})
+            TO STDOUT (FORMAT binary)
+        """
+        copy_in_sql = f"COPY {target_schema}.{table_name} FROM STDIN (FORMAT binary)"
+
+        source_connection = psycopg2.connect(self.uri())
+        target_connection = psycopg2.connect(other_postgresql_db.uri())
+
+        try:
+            bytes_copied = copy_between_connections(
+                source_connection,
+                copy_out_sql,
+                target_connection,
+                copy_in_sql,
+                max_chunks=max_chunks,
+            )
+            target_connection.commit()
+
+        finally:
+            source_connection.close()
+            target_connection.close()
+
+        return bytes_copied
+
+    @timer
+    def transfer_tables(
+        self,
+        other_postgresql_db,
+        tables: list = None,
+        schema: str = None,
+        target_schema: str = None,
+        workers: int = 4,
+        split_above_rows: int = 5000000,
+        max_chunks: int = 64,
+    ) -> dict:
+        """
+        Copy many tables to another SQL database at the same time.
+
+        Pass a list of ``tables``, or leave it empty to copy every
+        table in ``schema``. Up to ``workers`` copies run at once.
+
+        Tables estimated to hold more than ``split_above_rows`` rows
+        are split into key or ``ctid`` ranges that are copied in
+        parallel into an ``UNLOGGED`` table on the target. Once every
+        range has landed the table is switched to ``LOGGED`` and its
+        constraints and indexes are built.
+
+        Each range is copied in its own transaction, so a split table
+        is not read from a single snapshot. Rows written to the source
+        during the transfer may or may not make it across.
+
+        :param other_postgresql_db: ``PostgreSQL()`` object for target database
+        :type other_postgresql_db: PostgreSQL
+        :param tables: names of the tables to copy, defaults to every
+                       table in ``schema``
+        :type tables: list, optional
+        :param schema: source schema, defaults to ``ACTIVE_SCHEMA``
+        :type schema: str, optional
+        :param target_schema: schema to create the tables in on the target,
+                              defaults to the target's ``ACTIVE_SCHEMA``
+        :type target_schema: str, optional
+        :param workers: number of copies to run at once, defaults to 4
+        :type workers: int, optional
+        :param split_above_rows: row estimate above which a table is
+                                 split into ranges, defaults to 5000000
+        :type split_above_rows: int, optional
+        :return: dictionary with the runtime in seconds for each table,
+                 from when its first copy started to when its last
+                 step finished
+        :rtype: dict
+        """
+
+        if not schema:
+            schema = self.ACTIVE_SCHEMA
+
+        if not target_schema:
+            target_schema = other_postgresql_db.ACTIVE_SCHEMA
+
+        if not tables:
+            sql_base_tables = f"""
+                SELECT table_name
+                FROM information_schema.tables
+                WHERE table_schema = '{schema}'
+                    AND table_type = 'BASE TABLE';
+            """
+            tables = [t[0] for t in self.query_as_list(sql_base_tables)]
+
+        self._print(2, f"Transferring {len(tables)} tables with {workers} workers")
+
+        sql_row_estimates = f"""
+            SELECT c.relname, GREATEST(c.reltuples, 0)::bigint
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}';
+        """
+        row_estimates = dict(self.query_as_list(sql_row_estimates))
+
+        start_times = {}
+        end_times = {}
+        runtimes = {}
+        failures = {}
+
+        # Big tables get an empty UNLOGGED shell on the target up front
+        post_load = {}
+        slices = []
+
+        for table_name in tables:
+            if row_estimates.get(table_name, 0) > split_above_rows:
+                start_times[table_name] = time.perf_counter()
+
+                sql_create, sql_post_load = self._table_ddl(
+                    table_name, schema=schema, target_schema=target_schema, unlogged=True
+                )
+                other_postgresql_db.execute(sql_create)
+                post_load[table_name] = sql_post_load
+
+                for where_clause in self._transfer_ranges(table_name, schema, workers):
+                    slices.append((table_name, where_clause))
+
+                self._print(1, f"Split {table_name} into ranges")
+
+            else:
+                slices.append((table_name, None))
+
+        def timed(func, *args, **kwargs):
+            start_time = time.perf_counter()
+            func(*args, **kwargs)
+            return start_time, time.perf_counter()
+
+        def record(table_name, start_time, end_time):
+            start_times[table_name] = min(start_times.get(table_name, start_time), start_time)
+            end_times[table_name] = max(end_times.get(table_name, end_time), end_time)
+
+        def copy_one(table_name, where_clause):
+            if where_clause:
+                self._transfer_slice(
+                    table_name,
+                    other_postgresql_db,
+                    schema,
+                    target_schema,
+                    where_clause,
+                    max_chunks=max_chunks,
+                )
+            else:
+                self.transfer_data_to_another_db(
+                    table_name,
+                    other_postgresql_db,
+                    schema=schema,
+                    target_schema=target_schema,
+                    max_chunks=max_chunks,
+                    foreign_keys=False,
+                )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(timed, copy_one, table_name, where_clause): table_name
+                for table_name, where_clause in slices
+            }
+            for future in as_completed(futures):
+                table_name = futures[future]
+                if future.exception():
+                    failures[table_name] = future.exception()
+                else:
+                    record(table_name, *future.result())
+
+            # Finish off the split tables once all of their ranges are in
+            futures = {
+                executor.submit(timed, other_postgresql_db.execute, sql_post_load): table_name
+                for table_name, sql_post_load in post_load.items()
+                if table_name not in failures
+            }
+            for future in as_completed(futures):
+                table_name = futures[future]
+                if future.exception():
+                    failures[table_name] = future.exception()
+                else:
+                    record(table_name, *future.result())
+
+        for table_name in tables:
+            if table_name not in failures:
+                runtimes[table_name] = end_times[table_name] - start_times[table_name]
+
+        self._print(2, f"Transferred {len(runtimes)} of {len(tables)} tables")
+
+        if failures:
+            for table_name, error in failures.items():
+                self._print(3, f"Failed to transfer {table_name}: {error}")
+            raise RuntimeError(f"Failed to transfer: {list(failures)}")
+
+        # Every table is in, so keys between them can be added in any order
+        sql_foreign_keys = self._foreign_key_ddl(
+            [(schema, table_name) for table_name in tables], target_schema
+        )
+        if sql_foreign_keys:
+            other_postgresql_db.execute(sql_foreign_keys)
+
+        return runtimes
 
 
 def connect_via_uri(
@@ -1296,6 +5197,7 @@ def connect_via_uri(
     super_db: str = "postgres",
     super_user: str = None,
     super_pw: str = None,
+    lazy: bool = False,
 ):
     """
     Create a ``PostgreSQL`` object from a URI. Note that
@@ -1309,6 +5211,9 @@ def connect_via_uri(
     :param super_db: name of the SQL cluster master DB,
                         defaults to "postgres"
     :type super_db: str, optional
+    :param lazy: defer the existence check until first use,
+                 defaults to False
+    :type lazy: bool, optional
     :return: ``PostgreSQL()`` object
     :rtype: PostgreSQL
     """
@@ -1349,4 +5254,4 @@ def connect_via_uri(
         "super_pw": super_pw,
     }
 
-    return PostgreSQL(db_name, **values)
+    return PostgreSQL(db_name, lazy=lazy, **values)
@@ -0,0 +1,84 @@
+"""
+Summary of ``backup_helpers.py``
+--------------------------------
+
+Keep track of what has already been backed up.
+
+A ``backup_manifest.json`` file in the backup folder records,
+for each database, the change fingerprint it had when it was
+last dumped and where that dump was written. A database whose
+fingerprint has not moved since then does not need a new dump.
+"""
+import json
+from pathlib import Path
+from typing import Union
+
+MANIFEST_FILENAME = "backup_manifest.json"
+
+
+def read_backup_manifest(folder: Union[Path, str]) -> dict:
+    """
+    Load the manifest from a backup folder.
+
+    :param folder: folder that holds the backups
+    :type folder: Union[Path, str]
+    :return: ``{db_name: {"fingerprint": ..., "path": ..., ...}}``,
+             or an empty dictionary if there is no manifest yet
+    :rtype: dict
+    """
+
+    manifest_path = Path(folder) / MANIFEST_FILENAME
+
+    if not manifest_path.exists():
+        return {}
+
+    with open(manifest_path) as open_file:
+        return json.load(open_file)
+
+
+def write_backup_manifest(folder: Union[Path, str], manifest: dict) -> Path:
+    """
+    Save the manifest into a backup folder.
+
+    The file is written next to the real one and then moved into
+    place, so an interrupted run can't leave a half-written manifest.
+
+    :param folder: folder that holds the backups
+    :type folder: Union[Path, str]
+    :param manifest: manifest dictionary to save
+    :type manifest: dict
+    :return: path to the manifest file
+    :rtype: Path
+    """
+
+    manifest_path = Path(folder) / MANIFEST_FILENAME
+    temp_path = manifest_path.with_suffix(".tmp")
+
+    with open(temp_path, "w") as open_file:
+        json.dump(manifest, open_file, indent=2, default=str)
+
+    temp_path.replace(manifest_path)
+
+    return manifest_path
+
+
+def backup_is_current(manifest: dict, db_name: str, fingerprint: str) -> bool:
+    """
+    Is the last recorded dump of this database still up to date?
+
+    :param manifest: manifest dictionary
+    :type manifest: dict
+    :param db_name: name of the database
+    :type db_name: str
+    :param fingerprint: the database's current change fingerprint
+    :type fingerprint: str
+    :return: True if the fingerprint matches and the dump is still on disk
+    :rtype: bool
+    """
+
+    entry = manifest.get(db_name)
+
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+
+    return Path(entry["path"]).exists()
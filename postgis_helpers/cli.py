@@ -1,5 +1,6 @@
 import click
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from postgis_helpers.PgSQL import PostgreSQL
 from postgis_helpers.config_helpers import (
@@ -7,6 +8,11 @@ from postgis_helpers.config_helpers import (
     make_config_file,
     DB_CONFIG_FILEPATH,
 )
+from postgis_helpers.backup_helpers import (
+    read_backup_manifest,
+    write_backup_manifest,
+    backup_is_current,
+)
 from postgis_helpers.console import _console, RichProgress
 
 
@@ -60,7 +66,16 @@ def init(filepath, overwrite):
 @click.option(
     "--folder", "-f", help="Folder where the output SQL files will be stored."
 )
-def db_backup_all(host, folder):
+@click.option(
+    "--jobs", "-j", help="Number of databases to back up at once.", default=1
+)
+@click.option(
+    "--skip-unchanged",
+    "-s",
+    help="Skip databases that have not changed since their last backup.",
+    is_flag=True,
+)
+def db_backup_all(host, folder, jobs, skip_unchanged):
     """Back all databases up on a given HOST
     using PostgreSQL().db_export_pgdump_file()
 
@@ -68,14 +83,23 @@ def db_backup_all(host, folder):
     file.
 
     HOST defaults to localhost
+
+    Use --jobs to run several dumps at once. The largest
+    databases are started first.
+
+    A backup_manifest.json file in the output folder records
+    each database's change fingerprint at its last dump. Use
+    --skip-unchanged to only dump databases that have changed.
     """
 
     _console.print(f":direct_hit: Backing up databases on: {host}")
 
-    # Connect to the cluster's master database
+    # Connect to the cluster's master database. Every database below
+    # comes from the cluster's own list, so none of them need the
+    # existence check that a regular PostgreSQL() does up front
     this_cluster = configurations()[host]
     super_db_name = this_cluster["super_db"]
-    super_db = PostgreSQL(super_db_name, **this_cluster)
+    super_db = PostgreSQL(super_db_name, lazy=True, create_if_missing=False, **this_cluster)
 
     # Make a folder in the outbox with this host's name
     if folder:
@@ -85,20 +109,101 @@ def db_backup_all(host, folder):
     if not output_folder.exists():
         output_folder.mkdir(parents=True)
 
-    # Loop through all dbs on cluster, exporting all except the super db
-    all_dbs = super_db.all_databases_on_cluster_as_list()
+    # Dump the biggest databases first so they don't finish last
+    db_sizes = super_db.all_database_sizes_as_dict()
+
+    # Fingerprints are read before dumping, so a write that lands
+    # mid-dump will trigger another dump on the next run
+    manifest = read_backup_manifest(output_folder)
+    fingerprints = super_db.all_database_fingerprints_as_dict()
+
+    skipped = []
+    if skip_unchanged:
+        skipped = [
+            dbname
+            for dbname in db_sizes
+            if backup_is_current(manifest, dbname, fingerprints.get(dbname))
+        ]
+        db_sizes = {k: v for k, v in db_sizes.items() if k not in skipped}
+
+    # Parallel dumps would talk over each other, so keep them quiet
+    verbosity = "full" if jobs == 1 else "errors"
+
+    failures = {}
 
     with RichProgress(console=_console) as progress:
         task = progress.add_task(
-            total=len(all_dbs), description=f"Exporting {len(all_dbs)} dbs"
+            total=len(db_sizes), description=f"Exporting {len(db_sizes)} dbs"
         )
-        for dbname in all_dbs:
-            if dbname != super_db_name:
-                db = PostgreSQL(dbname, **this_cluster)
-                db.db_export_pgdump_file(output_folder)
 
+        def backup_one(dbname):
+            # pg_dump doesn't report how far along it is, so this bar
+            # pulses until the dump is done and is then filled in
+            db_task = progress.add_task(
+                description=f"{dbname} ({db_sizes[dbname] / 1e6:,.0f} MB)",
+                total=None,
+            )
+            try:
+                db = PostgreSQL(
+                    dbname,
+                    verbosity=verbosity,
+                    lazy=True,
+                    create_if_missing=False,
+                    **this_cluster,
+                )
+                _, stats = db.db_export_pgdump_file(output_folder, return_stats=True)
+            except Exception:
+                progress.remove_task(db_task)
+                raise
+            finally:
                 progress.advance(task)
 
+            progress.update(
+                db_task,
+                total=1,
+                completed=1,
+                description=(
+                    f"{dbname} ({stats['bytes'] / 1e6:,.0f} MB dump "
+                    f"in {stats['seconds']:,.0f} seconds)"
+                ),
+            )
+            progress.stop_task(db_task)
+            return stats
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(backup_one, dbname): dbname for dbname in db_sizes}
+
+            for future in as_completed(futures):
+                dbname = futures[future]
+                if future.exception():
+                    failures[dbname] = future.exception()
+                else:
+                    stats = future.result()
+                    manifest[dbname] = {
+                        "fingerprint": fingerprints.get(dbname),
+                        "path": str(stats["path"]),
+                        "bytes": stats["bytes"],
+                        "seconds": stats["seconds"],
+                    }
+                    write_backup_manifest(output_folder, manifest)
+
+    succeeded = len(db_sizes) - len(failures)
+    _console.print(f":floppy_disk: Backed up {succeeded} of {len(db_sizes)} dbs")
+
+    if skipped:
+        saved_bytes = sum(manifest[dbname]["bytes"] for dbname in skipped)
+        saved_seconds = sum(manifest[dbname]["seconds"] for dbname in skipped)
+        _console.print(
+            f":zzz: Skipped {len(skipped)} unchanged dbs, avoiding "
+            f"{saved_bytes / 1e6:,.0f} MB of dumps and ~{saved_seconds:,.0f} seconds"
+        )
+
+    if failures:
+        for dbname, error in failures.items():
+            detail = getattr(error, "stderr", None) or str(error)
+            _console.print(f":cross_mark: {dbname}: {detail.strip()}")
+        raise SystemExit(1)
+
 
 # BACK UP A SINGLE DATABASE
 # -------------------------
@@ -139,5 +244,82 @@ def db_backup_single(database_name, host, folder):
             db.db_export_pgdump_file(output_folder)
 
 
+# BACK UP OR RESTORE SELECTED TABLES
+# ----------------------------------
+
+
+@main.command()
+@click.argument("database_name")
+@click.argument("host", default="localhost")
+@click.option("--folder", "-f", help="Folder where the dump will be stored.")
+@click.option("--table", "-t", multiple=True, help="Table to back up. Repeatable.")
+@click.option("--schema", "-n", multiple=True, help="Schema to back up. Repeatable.")
+@click.option(
+    "--exclude-table", "-T", multiple=True, help="Table to leave out. Repeatable."
+)
+def db_backup_tables(database_name, host, folder, table, schema, exclude_table):
+    """Back up some tables of DATABASE_NAME from HOST
+
+    HOST can be any named profile in the configuration
+    file and defaults to localhost.
+
+    The dump uses pg_dump's custom format, so it can be
+    restored table by table with db-restore-tables.
+    """
+
+    _console.print(f":direct_hit: Backing up tables from {database_name} on {host}")
+
+    this_cluster = configurations()[host]
+    db = PostgreSQL(database_name, **this_cluster)
+
+    if folder:
+        output_folder = Path(folder)
+    else:
+        output_folder = db.DATA_OUTBOX / host
+
+    dump_path = db.db_export_pgdump_file(
+        output_folder,
+        dump_format="custom",
+        tables=list(table),
+        schemas=list(schema),
+        exclude_tables=list(exclude_table),
+    )
+
+    _console.print(f":floppy_disk: Saved to {dump_path}")
+
+
+@main.command()
+@click.argument("database_name")
+@click.argument("dump_path")
+@click.argument("host", default="localhost")
+@click.option("--table", "-t", multiple=True, help="Table to restore. Repeatable.")
+@click.option("--schema", "-n", multiple=True, help="Schema to restore. Repeatable.")
+@click.option(
+    "--exclude-table", "-T", multiple=True, help="Table to leave out. Repeatable."
+)
+def db_restore_tables(database_name, dump_path, host, table, schema, exclude_table):
+    """Restore some tables from DUMP_PATH into DATABASE_NAME on HOST
+
+    HOST can be any named profile in the configuration
+    file and defaults to localhost.
+
+    Tables are staged in a separate schema and swapped in
+    at the end, so the rest of the database stays online.
+    With no --table/--schema options, every table is restored.
+    """
+
+    this_cluster = configurations()[host]
+    db = PostgreSQL(database_name, **this_cluster)
+
+    restored = db.db_load_tables_from_pgdump_file(
+        Path(dump_path),
+        tables=list(table),
+        schemas=list(schema),
+        exclude_tables=list(exclude_table),
+    )
+
+    _console.print(f":floppy_disk: Restored {len(restored)} tables into {database_name}")
+
+
 if __name__ == "__main__":
     main()
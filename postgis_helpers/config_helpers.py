@@ -9,8 +9,15 @@ code. This module provides a method for storing
 and retrieving connections to database clusters
 by named profiles inside ``[square_brackets]``.
 
+Parsed files are cached for the life of the process, and
+re-read whenever the file's modification time changes.
+Any value can be overridden with an environment variable
+named ``PGIS_<PROFILE>_<KEY>``, e.g. ``PGIS_LOCALHOST_PW``.
+
 TODO: update this with new features
 """
+import os
+import re
 import configparser
 from pathlib import Path
 from typing import Union
@@ -23,6 +30,12 @@ DEFAULT_DATA_OUTBOX = DATA_ROOT / "outbox"
 
 DB_CONFIG_FILEPATH = DATA_ROOT / "database_connections.cfg"
 
+# Keys that should come back as something other than a string
+TYPED_KEYS = {"port": int}
+
+# {(resolved filepath, mtime in ns): parsed profiles}
+_CONFIG_CACHE = {}
+
 STARTER_CONFIG_FILE = """
 [DEFAULT]
 pw = this-is-a-placeholder-password
@@ -78,7 +91,17 @@ def make_config_file(
         return True
 
 
-def read_config_file(filepath: Path = DB_CONFIG_FILEPATH) -> dict:
+def read_config_file(filepath: Path = DB_CONFIG_FILEPATH, silent: bool = False) -> dict:
+    """
+    Parse a config file into ``{profile: {key: value}}``.
+
+    :param filepath: path to the config file, defaults to DB_CONFIG_FILEPATH
+    :type filepath: Path, optional
+    :param silent: don't print anything, defaults to False
+    :type silent: bool, optional
+    :return: dictionary of profiles, with typed values (e.g. an int ``port``)
+    :rtype: dict
+    """
 
     config = configparser.ConfigParser()
     config.read(filepath)
@@ -91,16 +114,70 @@ def read_config_file(filepath: Path = DB_CONFIG_FILEPATH) -> dict:
         for key in config[host]:
             value = config[host][key]
 
+            if key in TYPED_KEYS:
+                value = TYPED_KEYS[key](value)
+
             all_hosts[host][key] = value
 
-    _console.print(f"Loaded db configurations from {filepath}")
+    if not silent:
+        _console.print(f"Loaded db configurations from {filepath}")
+
+    return all_hosts
+
+
+def _environment_overrides(all_hosts: dict) -> dict:
+    """
+    Apply any ``PGIS_<PROFILE>_<KEY>`` environment variables
+    on top of the profiles read from the file.
+    """
+
+    for host, values in all_hosts.items():
+        prefix = "PGIS_" + re.sub(r"\W", "_", host).upper() + "_"
+
+        for env_var, value in os.environ.items():
+            if not env_var.startswith(prefix):
+                continue
+
+            key = env_var[len(prefix) :].lower()
+
+            if key in TYPED_KEYS:
+                value = TYPED_KEYS[key](value)
+
+            values[key] = value
 
     return all_hosts
 
 
-def configurations(filepath: Path = DB_CONFIG_FILEPATH) -> dict:
+def configurations(filepath: Path = DB_CONFIG_FILEPATH, silent: bool = False) -> dict:
+    """
+    Get all connection profiles from the config file.
+
+    The file is only parsed again when it has changed on disk,
+    so repeated calls are cheap. A fresh copy is returned each
+    time, so callers are free to modify it.
+
+    :param filepath: path to the config file, defaults to DB_CONFIG_FILEPATH
+    :type filepath: Path, optional
+    :param silent: don't print anything, defaults to False
+    :type silent: bool, optional
+    :return: dictionary of profiles, e.g. ``configurations()["localhost"]``
+    :rtype: dict
+    """
+
+    filepath = Path(filepath)
 
     if not filepath.exists():
         make_config_file(filepath)
 
-    return read_config_file(filepath)
+    cache_key = (filepath.resolve(), filepath.stat().st_mtime_ns)
+
+    if cache_key not in _CONFIG_CACHE:
+        # Drop anything cached for older versions of this file
+        for old_key in [k for k in _CONFIG_CACHE if k[0] == cache_key[0]]:
+            del _CONFIG_CACHE[old_key]
+
+        _CONFIG_CACHE[cache_key] = read_config_file(filepath, silent=silent)
+
+    all_hosts = {host: dict(values) for host, values in _CONFIG_CACHE[cache_key].items()}
+
+    return _environment_overrides(all_hosts)
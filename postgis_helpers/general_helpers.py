@@ -1,7 +1,43 @@
+import sys
 import datetime
+import importlib.util
 from pytz import timezone
 
 
+def lazy_import(module_name: str):
+    """
+    Import a module without running it until one of its
+    attributes is first used.
+
+    Heavy dependencies like ``pandas`` and ``geopandas`` take
+    seconds to import. Loading them this way keeps the CLI and
+    ``import postgis_helpers`` fast when they aren't needed.
+
+    :param module_name: name of the module, e.g. ``"pandas"``
+    :type module_name: str
+    :raises ImportError: if the module isn't installed
+    :return: the (not yet executed) module
+    :rtype: module
+    """
+
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.find_spec(module_name)
+
+    if spec is None:
+        raise ImportError(f"No module named '{module_name}'", name=module_name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    loader.exec_module(module)
+
+    return module
+
+
 def now(tz: str = None) -> datetime.datetime:
     """
     Return the current date/time. Optionally provide
@@ -1,5 +1,15 @@
-import pandas as pd
-import geopandas as gpd
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .general_helpers import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import geopandas as gpd
+else:
+    pd = lazy_import("pandas")
+    gpd = lazy_import("geopandas")
 
 
 def spatialize_point_dataframe(
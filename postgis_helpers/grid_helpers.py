@@ -0,0 +1,206 @@
+"""
+Summary of ``grid_helpers.py``
+------------------------------
+
+Build hexagon and square grids on the client with ``numpy``.
+
+The vertices for every cell are computed with array math, turned
+into geometries in bulk with ``shapely``'s vectorized constructors,
+and handed back as hex-encoded EWKB, ready for ``COPY``.
+
+The hexagon layout matches the ``hex_grid()`` SQL function in
+``sql_helpers.py``, except that cell dimensions aren't rounded
+to whole units.
+
+``coordinates_to_h3()`` assigns points to cells of Uber's
+H3 grid instead, using ``h3ronpy``.
+"""
+from __future__ import annotations
+
+import math
+from typing import Iterator, TYPE_CHECKING
+
+from .general_helpers import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    import shapely
+else:
+    np = lazy_import("numpy")
+    shapely = lazy_import("shapely")
+
+GRID_SHAPES = ["hexagon", "square"]
+
+
+def hexagon_dimensions(cell_size: float) -> tuple:
+    """
+    Get the quarter-width and half-height of a
+    hexagon with an area of ``cell_size`` square KM.
+
+    :param cell_size: area of each hexagon, 1 = 1 square KM
+    :type cell_size: float
+    :return: ``(quarter_width, half_height)`` in map units
+    :rtype: tuple
+    """
+
+    aream2 = cell_size * 1000000.0
+    qtrwidth = math.sqrt(aream2 / (math.sqrt(3.0) * (3.0 / 2.0))) / 2.0
+    halfheight = qtrwidth * math.sqrt(3.0)
+
+    return qtrwidth, halfheight
+
+
+def _series(start: float, stop: float, step: float) -> np.ndarray:
+    """ Like ``generate_series()``: ``start`` to ``stop`` inclusive """
+    num_steps = math.floor((stop - start) / step) + 1
+
+    return start + step * np.arange(max(num_steps, 0))
+
+
+def _cell_template(shape: str, cell_size: float) -> tuple:
+    """
+    Get the vertices of one cell at the origin, plus the
+    spacing between grid columns and rows.
+
+    :return: ``(templates, column_step, row_step)``, where ``templates``
+             has one ``(vertices, 2)`` array per cell drawn at each point
+    :rtype: tuple
+    """
+
+    if shape == "hexagon":
+        q, h = hexagon_dimensions(cell_size)
+
+        hexagon = np.array(
+            [[0, 0], [q, h], [3 * q, h], [4 * q, 0], [3 * q, -h], [q, -h], [0, 0]]
+        )
+
+        # Hexagons come in pairs, with the second one nudged up and over
+        templates = [hexagon, hexagon + np.array([3 * q, h])]
+
+        return templates, 6 * q, 2 * h
+
+    if shape == "square":
+        side = math.sqrt(cell_size * 1000000.0)
+
+        square = np.array([[0, 0], [0, side], [side, side], [side, 0], [0, 0]])
+
+        return [square], side, side
+
+    raise ValueError(f"shape must be one of: {GRID_SHAPES}")
+
+
+def grid_vertices(
+    xmin: float,
+    ymin: float,
+    xmax: float,
+    ymax: float,
+    cell_size: float,
+    shape: str = "hexagon",
+    max_cells: int = 500000,
+) -> Iterator[np.ndarray]:
+    """
+    Compute the vertices of every cell in a grid covering a
+    bounding box, a block of grid columns at a time.
+
+    :param xmin: left edge of the area to cover, in map units
+    :type xmin: float
+    :param ymin: bottom edge of the area to cover, in map units
+    :type ymin: float
+    :param xmax: right edge of the area to cover, in map units
+    :type xmax: float
+    :param ymax: top edge of the area to cover, in map units
+    :type ymax: float
+    :param cell_size: area of each cell, 1 = 1 square KM
+    :type cell_size: float
+    :param shape: ``"hexagon"`` or ``"square"``, defaults to ``"hexagon"``
+    :type shape: str, optional
+    :param max_cells: most cells to return at a time, defaults to 500000
+    :type max_cells: int, optional
+    :yield: arrays shaped ``(cells, vertices, 2)``
+    :rtype: Iterator[np.ndarray]
+    """
+
+    templates, column_step, row_step = _cell_template(shape, cell_size)
+
+    xs = _series(xmin, xmax, column_step)
+    ys = _series(ymin, ymax, row_step)
+
+    cells_per_column = len(ys) * len(templates)
+    columns_per_chunk = max(1, max_cells // max(cells_per_column, 1))
+
+    for start in range(0, len(xs), columns_per_chunk):
+        xx, yy = np.meshgrid(xs[start : start + columns_per_chunk], ys)
+        origins = np.column_stack([xx.ravel(), yy.ravel()])
+
+        yield np.concatenate(
+            [origins[:, np.newaxis, :] + template[np.newaxis, :, :] for template in templates]
+        )
+
+
+def grid_as_ewkb(
+    xmin: float,
+    ymin: float,
+    xmax: float,
+    ymax: float,
+    cell_size: float,
+    epsg: int,
+    shape: str = "hexagon",
+    max_cells: int = 500000,
+) -> Iterator[bytes]:
+    """
+    Build a grid covering a bounding box and encode it for
+    ``COPY table (geom) FROM STDIN``: one hex EWKB polygon per line.
+
+    Takes the same arguments as ``grid_vertices()``, plus the ``epsg``
+    that the bounding box (and the grid) are in.
+
+    :yield: newline-delimited hex EWKB, one block of cells at a time
+    :rtype: Iterator[bytes]
+    """
+
+    for vertices in grid_vertices(xmin, ymin, xmax, ymax, cell_size, shape, max_cells):
+        polygons = shapely.set_srid(shapely.polygons(vertices), epsg)
+        ewkb = shapely.to_wkb(polygons, hex=True, include_srid=True)
+
+        yield ("\n".join(ewkb) + "\n").encode()
+
+
+def _import_h3ronpy():
+    try:
+        from arro3.core import Array
+        from h3ronpy.vector import coordinates_to_cells
+    except ImportError:
+        raise ImportError("H3 indexing requires: pip install h3ronpy>=0.22")
+
+    return Array, coordinates_to_cells
+
+
+def coordinates_to_h3(lat: np.ndarray, lng: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Get the H3 cell that each lat/lng point falls in.
+
+    ``h3ronpy`` does the whole array at once in Rust,
+    with no Python-level loop over the points.
+
+    :param lat: latitudes, in EPSG:4326
+    :type lat: np.ndarray
+    :param lng: longitudes, in EPSG:4326
+    :type lng: np.ndarray
+    :param resolution: H3 resolution, from 0 (coarse) to 15 (fine)
+    :type resolution: int
+    :return: H3 cell IDs as 64-bit integers
+    :rtype: np.ndarray
+    """
+
+    if not 0 <= resolution <= 15:
+        raise ValueError("resolution must be between 0 and 15")
+
+    Array, coordinates_to_cells = _import_h3ronpy()
+
+    lat = np.ascontiguousarray(lat, dtype="float64")
+    lng = np.ascontiguousarray(lng, dtype="float64")
+
+    cells = coordinates_to_cells(Array.from_numpy(lat), Array.from_numpy(lng), resolution)
+
+    # Cells come back as uint64, but every valid H3 index fits in a bigint
+    return np.asarray(cells).astype("int64")
@@ -0,0 +1,380 @@
+"""
+Summary of ``io_helpers.py``
+----------------------------
+
+Stream bytes between two database connections
+without holding the whole payload in memory.
+
+``BoundedPipe`` is a file-like object with a fixed
+number of in-flight chunks. ``copy_between_connections()``
+uses it to feed ``COPY ... TO STDOUT`` from one
+connection into ``COPY ... FROM STDIN`` on another.
+
+``CompressedWriter`` and ``DecompressedReader`` compress
+and decompress backups on the fly with ``gzip`` or ``zstd``,
+keeping a SHA-256 of the compressed bytes as they pass.
+"""
+import gzip
+import queue
+import hashlib
+import threading
+import zlib
+from pathlib import Path
+
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class BoundedPipe:
+    """
+    A thread-safe, file-like pipe with a bounded buffer.
+
+    The writer blocks once ``max_chunks`` chunks are waiting,
+    so memory use is capped no matter how fast the source is.
+    Either side can ``abort()`` the pipe, which unblocks and
+    fails the other side instead of leaving it hanging.
+    """
+
+    def __init__(self, max_chunks: int = 64):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._leftover = b""
+        self._finished = False
+        self._aborted = threading.Event()
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+
+        while True:
+            if self._aborted.is_set():
+                raise IOError("Pipe was aborted by the reading side")
+            try:
+                self._queue.put(bytes(data), timeout=0.5)
+                break
+            except queue.Full:
+                continue
+
+        self.bytes_written += len(data)
+
+        return len(data)
+
+    def close(self) -> None:
+        """ Signal the reader that no more data is coming """
+        self._put_sentinel()
+
+    def abort(self) -> None:
+        """ Stop both sides of the pipe """
+        self._aborted.set()
+        self._put_sentinel()
+
+    def _put_sentinel(self) -> None:
+        while True:
+            try:
+                self._queue.put(None, timeout=0.5)
+                return
+            except queue.Full:
+                if self._aborted.is_set():
+                    # Make room so the reader can see the sentinel
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def read(self, size: int = -1) -> bytes:
+        if self._aborted.is_set():
+            raise IOError("Pipe was aborted by the writing side")
+
+        chunks = [self._leftover]
+        length = len(self._leftover)
+
+        while not self._finished and (size < 0 or length < size):
+            chunk = self._queue.get()
+
+            if self._aborted.is_set():
+                raise IOError("Pipe was aborted by the writing side")
+
+            if chunk is None:
+                self._finished = True
+                break
+
+            chunks.append(chunk)
+            length += len(chunk)
+
+        data = b"".join(chunks)
+
+        if size < 0:
+            self._leftover = b""
+            return data
+
+        self._leftover = data[size:]
+
+        return data[:size]
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+def copy_between_connections(
+    source_connection,
+    copy_out_sql: str,
+    target_connection,
+    copy_in_sql: str,
+    max_chunks: int = 64,
+) -> int:
+    """
+    Pipe ``COPY ... TO STDOUT`` on one ``psycopg2`` connection
+    into ``COPY ... FROM STDIN`` on another.
+
+    The source side runs in a background thread and the target
+    side runs in the calling thread. Neither connection is
+    committed here; that is left to the caller.
+
+    :param source_connection: connection to read from
+    :param copy_out_sql: a ``COPY ... TO STDOUT`` statement
+    :type copy_out_sql: str
+    :param target_connection: connection to write into
+    :param copy_in_sql: a ``COPY ... FROM STDIN`` statement
+    :type copy_in_sql: str
+    :param max_chunks: number of chunks buffered between the two,
+                       defaults to 64
+    :type max_chunks: int, optional
+    :return: number of bytes that passed through the pipe
+    :rtype: int
+    """
+
+    pipe = BoundedPipe(max_chunks=max_chunks)
+    errors = []
+
+    def produce():
+        try:
+            with source_connection.cursor() as cursor:
+                cursor.copy_expert(copy_out_sql, pipe)
+        except Exception as e:
+            errors.append(e)
+            pipe.abort()
+        else:
+            pipe.close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        with target_connection.cursor() as cursor:
+            cursor.copy_expert(copy_in_sql, pipe)
+    except Exception:
+        # The producer records its error before aborting the pipe, so
+        # anything already recorded is what made the target side fail.
+        # Otherwise the target failed on its own, and the producer's
+        # "aborted" error is only a consequence of that.
+        producer_failed_first = bool(errors)
+        pipe.abort()
+        producer.join()
+        if producer_failed_first:
+            raise errors[0]
+        raise
+
+    producer.join()
+
+    if errors:
+        raise errors[0]
+
+    return pipe.bytes_written
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires: pip install zstandard")
+
+    return zstandard
+
+
+class CompressedWriter:
+    """
+    A writable file-like object that compresses everything
+    written to it and saves the result to ``path``.
+
+    ``zstd`` compresses on all available cores. ``gzip`` only
+    uses one, but needs nothing beyond the standard library.
+
+    Closing the writer saves a ``sha256sum``-style sidecar file
+    next to the output, and returns the checksum. If whatever was
+    feeding the writer failed, call ``discard()`` instead, so a
+    partial file is never left behind with a matching sidecar.
+    """
+
+    def __init__(self, path: Path, compression: str = "zstd", level: int = None):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"compression must be one of: {list(COMPRESSION_EXTENSIONS)}")
+
+        self.path = Path(path)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._sha256 = hashlib.sha256()
+        self._file = open(self.path, "wb")
+
+        if compression == "zstd":
+            zstandard = _import_zstandard()
+            compressor = zstandard.ZstdCompressor(level=3 if level is None else level, threads=-1)
+            self._compressor = compressor.compressobj()
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+
+    def _write_out(self, data: bytes) -> None:
+        if data:
+            self._sha256.update(data)
+            self._file.write(data)
+            self.bytes_out += len(data)
+
+    def write(self, data: bytes) -> int:
+        self.bytes_in += len(data)
+        self._write_out(self._compressor.compress(data))
+
+        return len(data)
+
+    def close(self) -> str:
+        """ Finish the file, write the sidecar and return the SHA-256 """
+        self._write_out(self._compressor.flush())
+        self._file.close()
+
+        checksum = self._sha256.hexdigest()
+
+        with open(sidecar_path(self.path), "w") as open_file:
+            open_file.write(f"{checksum}  {self.path.name}\n")
+
+        return checksum
+
+    def discard(self) -> None:
+        """ Throw away a partial output file, without a sidecar """
+        self._file.close()
+        self.path.unlink()
+
+
+def sidecar_path(path: Path) -> Path:
+    """ Path of the ``.sha256`` file that goes with a backup """
+    path = Path(path)
+
+    return path.with_name(path.name + ".sha256")
+
+
+class _HashingReader:
+    """ Wrap a binary file and hash every byte read from it """
+
+    def __init__(self, raw_file):
+        self._raw_file = raw_file
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw_file.read(size)
+        self.sha256.update(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        # Hash anything the decompressor didn't need to read
+        while self.read(1 << 20):
+            pass
+        self._raw_file.close()
+
+
+class DecompressedReader:
+    """
+    A readable file-like object that decompresses a
+    ``.gz`` or ``.zst`` file as it is read.
+
+    After ``close()`` the SHA-256 of the compressed file is
+    compared with its sidecar (if there is one), and an
+    ``IOError`` is raised when they don't match.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._peeked = b""
+        self._hashing_reader = _HashingReader(open(self.path, "rb"))
+
+        if self.path.suffix == COMPRESSION_EXTENSIONS["zstd"]:
+            zstandard = _import_zstandard()
+            self._reader = zstandard.ZstdDecompressor().stream_reader(
+                self._hashing_reader, closefd=False
+            )
+        else:
+            self._reader = gzip.GzipFile(fileobj=self._hashing_reader, mode="rb")
+
+    def peek(self, size: int) -> bytes:
+        """ Look at the first bytes without consuming them """
+        if len(self._peeked) < size:
+            self._peeked += self._reader.read(size - len(self._peeked))
+
+        return self._peeked[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        if self._peeked:
+            data = self._peeked if size < 0 else self._peeked[:size]
+            self._peeked = self._peeked[len(data) :]
+            if size < 0:
+                data += self._reader.read()
+            return data
+
+        return self._reader.read(size)
+
+    def close(self) -> str:
+        """ Finish reading, verify the checksum and return it """
+        self._reader.close()
+        self._hashing_reader.close()
+
+        checksum = self._hashing_reader.sha256.hexdigest()
+
+        sidecar = sidecar_path(self.path)
+        if sidecar.exists():
+            expected = sidecar.read_text().split()[0]
+            if expected != checksum:
+                raise IOError(f"SHA-256 of {self.path} does not match {sidecar}")
+
+        return checksum
+
+    def discard(self) -> None:
+        """ Stop reading without verifying, e.g. after the consumer failed """
+        self._reader.close()
+        self._hashing_reader._raw_file.close()
+
+
+def verify_checksum(path: Path) -> str:
+    """
+    Hash a file and compare it with its ``.sha256`` sidecar,
+    raising an ``IOError`` when they don't match.
+
+    :param path: filepath of a compressed backup
+    :type path: Path
+    :return: the file's SHA-256, or None if it has no sidecar
+    :rtype: str
+    """
+
+    sidecar = sidecar_path(path)
+    if not sidecar.exists():
+        return None
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as open_file:
+        for chunk in iter(lambda: open_file.read(1 << 20), b""):
+            sha256.update(chunk)
+
+    checksum = sha256.hexdigest()
+
+    if sidecar.read_text().split()[0] != checksum:
+        raise IOError(f"SHA-256 of {path} does not match {sidecar}")
+
+    return checksum
+
+
+def is_compressed(path: Path) -> bool:
+    """ Does this filepath end in a compression extension we can read? """
+    return Path(path).suffix in COMPRESSION_EXTENSIONS.values()
@@ -1,9 +1,11 @@
-import requests
 import zipfile
 import io
 from pathlib import Path
 
 from .config_helpers import DEFAULT_DATA_INBOX, DEFAULT_DATA_OUTBOX
+from .general_helpers import lazy_import
+
+requests = lazy_import("requests")
 
 
 class DataSource:
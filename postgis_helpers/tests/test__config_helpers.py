@@ -0,0 +1,60 @@
+import os
+import tempfile
+from pathlib import Path
+
+from ward import test
+
+from postgis_helpers.config_helpers import configurations, STARTER_CONFIG_FILE
+
+
+# Are config files cached, typed, and re-read when they change?
+# ---------- ---------- ---------- ---------- ----------
+def _test_configurations_cache():
+
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = Path(folder) / "database_connections.cfg"
+        filepath.write_text(STARTER_CONFIG_FILE)
+
+        first = configurations(filepath, silent=True)
+
+        # Changes to the returned dictionary don't leak into the cache
+        first["localhost"]["port"] = 1
+        second = configurations(filepath, silent=True)
+
+        # Bump the mtime so the edit is seen even on coarse filesystems
+        filepath.write_text(STARTER_CONFIG_FILE.replace("5432", "6543"))
+        stat = filepath.stat()
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        third = configurations(filepath, silent=True)
+
+    assert second["localhost"]["port"] == 5432
+    assert third["localhost"]["port"] == 6543
+
+
+# Can environment variables override values in the file?
+# ---------- ---------- ---------- ---------- ----------
+def _test_configurations_env_override():
+
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = Path(folder) / "database_connections.cfg"
+        filepath.write_text(STARTER_CONFIG_FILE)
+
+        os.environ["PGIS_LOCALHOST_PORT"] = "7777"
+        try:
+            config = configurations(filepath, silent=True)
+        finally:
+            del os.environ["PGIS_LOCALHOST_PORT"]
+
+    assert config["localhost"]["port"] == 7777
+    assert config["digitalocean"]["port"] == 98765
+
+
+@test("configurations() returns typed copies and reloads a changed file")
+def _():
+    _test_configurations_cache()
+
+
+@test("configurations() applies PGIS_<PROFILE>_<KEY> environment variables")
+def _():
+    _test_configurations_env_override()
@@ -54,3 +54,125 @@ def _test_transfer_data_spatial(db1: PostgreSQL, db2: PostgreSQL, shp: DataForTe
 @using(database1=database_1, database2=database_2, shp=test_shp_data)
 def _(database1, database2, shp):
     _test_transfer_data_spatial(database1, database2, shp)
+
+
+# Does the transferred spatial table keep its SRID and rows?
+# ---------- ---------- ---------- ---------- ---------- ---
+def _test_transfer_data_spatial_matches(
+    db1: PostgreSQL, db2: PostgreSQL, shp: DataForTest
+):
+
+    table_name = shp.NAME
+
+    db1.transfer_data_to_another_db(table_name, db2)
+
+    query = f"SELECT COUNT(*) FROM {table_name}"
+
+    assert db2.all_spatial_tables_as_dict()[table_name] == shp.EPSG
+    assert db1.query_as_single_item(query) == db2.query_as_single_item(query)
+
+
+@test("PostgreSQL().transfer_data_to_another_db() keeps the SRID and all rows")
+@using(database1=database_1, database2=database_2, shp=test_shp_data)
+def _(database1, database2, shp):
+    _test_transfer_data_spatial_matches(database1, database2, shp)
+
+
+# Can we transfer several tables at once, splitting them into ranges?
+# ---------- ---------- ---------- ---------- ---------- ---------- --
+def _test_transfer_tables_split(
+    db1: PostgreSQL, db2: PostgreSQL, csv: DataForTest, shp: DataForTest
+):
+
+    tables = [csv.NAME, shp.NAME]
+
+    # Force every table down the range-partitioned path
+    db1.transfer_tables(db2, tables=tables, workers=3, split_above_rows=-1)
+
+    for table_name in tables:
+        query = f"SELECT COUNT(*) FROM {table_name}"
+        assert db1.query_as_single_item(query) == db2.query_as_single_item(query)
+
+
+@test("PostgreSQL().transfer_tables() copies every row of range-split tables")
+@using(
+    database1=database_1, database2=database_2, csv=test_csv_data, shp=test_shp_data
+)
+def _(database1, database2, csv, shp):
+    _test_transfer_tables_split(database1, database2, csv, shp)
+
+
+# Can we transfer data on the server when both DBs share a cluster?
+# ---------- ---------- ---------- ---------- ---------- ---------- -
+def _test_transfer_data_fdw(db1: PostgreSQL, db2: PostgreSQL, shp: DataForTest):
+
+    table_name = shp.NAME
+
+    # Both fixtures live on localhost, so this must not fall back
+    db1.transfer_data_to_another_db(table_name, db2, mode="fdw")
+
+    query = f"SELECT COUNT(*) FROM {table_name}"
+
+    # The foreign server and its user mapping (with the password) are gone
+    leftovers = db2.query_as_single_item(
+        "SELECT COUNT(*) FROM pg_foreign_server WHERE srvname LIKE 'pgis_fdw_%'"
+    )
+
+    assert db1.same_cluster_as(db2)
+    assert db1.query_as_single_item(query) == db2.query_as_single_item(query)
+    assert leftovers == 0
+
+
+@test("PostgreSQL().transfer_data_to_another_db(mode='fdw') copies on the server")
+@using(database1=database_1, database2=database_2, shp=test_shp_data)
+def _(database1, database2, shp):
+    _test_transfer_data_fdw(database1, database2, shp)
+
+
+# Do foreign keys between the copied tables, and their sequences, come along?
+# ---------- ---------- ---------- ---------- ---------- ---------- ----------
+def _test_transfer_tables_foreign_keys(db1: PostgreSQL, db2: PostgreSQL):
+
+    db1.execute(
+        """
+        DROP TABLE IF EXISTS test_fk_child, test_fk_parent;
+        DROP SEQUENCE IF EXISTS test_fk_seq;
+
+        CREATE SEQUENCE test_fk_seq START WITH 100;
+        CREATE TABLE test_fk_parent (id bigint PRIMARY KEY DEFAULT nextval('test_fk_seq'));
+        CREATE TABLE test_fk_child (
+            id serial PRIMARY KEY,
+            parent_id bigint REFERENCES test_fk_parent (id)
+        );
+
+        INSERT INTO test_fk_parent SELECT FROM generate_series(1, 3);
+        INSERT INTO test_fk_child (parent_id) SELECT id FROM test_fk_parent;
+    """
+    )
+
+    db1.transfer_tables(db2, tables=["test_fk_parent", "test_fk_child"], workers=2)
+
+    foreign_keys = db2.query_as_single_item(
+        """
+        SELECT COUNT(*) FROM pg_constraint
+        WHERE contype = 'f' AND conrelid = 'test_fk_child'::regclass
+    """
+    )
+    next_id = db2.query_as_single_item("SELECT nextval('test_fk_seq')")
+
+    for db in [db1, db2]:
+        db.execute(
+            """
+            DROP TABLE IF EXISTS test_fk_child, test_fk_parent;
+            DROP SEQUENCE IF EXISTS test_fk_seq;
+        """
+        )
+
+    assert foreign_keys == 1
+    assert next_id == 103
+
+
+@test("PostgreSQL().transfer_tables() keeps foreign keys and sequences between tables")
+@using(database1=database_1, database2=database_2)
+def _(database1, database2):
+    _test_transfer_tables_foreign_keys(database1, database2)
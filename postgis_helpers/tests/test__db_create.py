@@ -0,0 +1,71 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.PgSQL import TEMPLATE_DB
+from postgis_helpers.config_helpers import configurations
+from postgis_helpers.tests.fixtures import database_1
+
+
+# Do databases cloned from the template have everything installed?
+# ---------- ---------- ---------- ---------- ----------
+def _test_db_create_from_template(db: PostgreSQL):
+
+    db.db_template_ensure()
+
+    # all_databases_on_cluster_as_list() leaves templates out, so look it up directly
+    template = db.query_as_list(
+        f"""
+        SELECT shobj_description(oid, 'pg_database')
+        FROM pg_database
+        WHERE datname = '{TEMPLATE_DB}' AND datistemplate;
+    """,
+        super_uri=True,
+    )
+
+    assert template
+    assert template[0][0] == db._template_stamp()
+    assert template[0][0].startswith("postgis_helpers ")
+
+    new_db = PostgreSQL(
+        "test_from_template", verbosity="minimal", **configurations()["localhost"]
+    )
+
+    postgis = new_db.query_as_list("SELECT extname FROM pg_extension WHERE extname = 'postgis';")
+    hex_function = new_db.query_as_list("SELECT proname FROM pg_proc WHERE proname = 'hex_grid';")
+
+    new_db.db_delete()
+
+    assert postgis
+    assert hex_function
+
+
+@test("PostgreSQL().db_create() clones a template with PostGIS and the helper functions")
+@using(database=database_1)
+def _(database):
+    _test_db_create_from_template(database)
+
+
+# Does a lazy PostgreSQL() wait until it's used to create the database?
+# ---------- ---------- ---------- ---------- ----------
+def _test_lazy_db_create(db: PostgreSQL):
+
+    lazy_db = PostgreSQL(
+        "test_lazy_create", verbosity="minimal", lazy=True, **configurations()["localhost"]
+    )
+
+    created_up_front = lazy_db.DATABASE in db.all_databases_on_cluster_as_list()
+
+    lazy_db.all_tables_as_list()
+
+    created_on_use = lazy_db.DATABASE in db.all_databases_on_cluster_as_list()
+
+    lazy_db.db_delete()
+
+    assert not created_up_front
+    assert created_on_use
+
+
+@test("PostgreSQL(lazy=True) creates the database on first use")
+@using(database=database_1)
+def _(database):
+    _test_lazy_db_create(database)
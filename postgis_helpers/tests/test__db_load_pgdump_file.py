@@ -1 +1,187 @@
-# TODO: Test db.db_load_pgdump_file()
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import (
+    DataForTest,
+    database_1,
+    database_2,
+    test_shp_data,
+)
+
+
+# Does a directory-format dump restore in parallel with every table?
+# ---------- ---------- ---------- ---------- ---------- ---------- --
+def _test_db_load_pgdump_directory(db1: PostgreSQL, db2: PostgreSQL):
+
+    dump_folder = db1.db_export_pgdump_file(dump_format="directory", jobs=2)
+
+    db2.db_load_pgdump_file(dump_folder, overwrite=True, jobs=2)
+
+    assert set(db1.all_tables_as_list("public")) == set(db2.all_tables_as_list("public"))
+
+
+@test("PostgreSQL().db_load_pgdump_file() restores a directory-format dump")
+@using(database1=database_1, database2=database_2)
+def _(database1, database2):
+    _test_db_load_pgdump_directory(database1, database2)
+
+
+# Does a compressed dump stream back in without a temp file?
+# ---------- ---------- ---------- ---------- ---------- ----
+def _test_db_load_pgdump_compressed(db1: PostgreSQL, db2: PostgreSQL):
+
+    dump_file = db1.db_export_pgdump_file(dump_format="custom", compress="gzip")
+
+    db2.db_load_pgdump_file(dump_file, overwrite=True)
+
+    assert set(db1.all_tables_as_list("public")) == set(db2.all_tables_as_list("public"))
+
+
+@test("PostgreSQL().db_load_pgdump_file() restores a gzip-compressed archive")
+@using(database1=database_1, database2=database_2)
+def _(database1, database2):
+    _test_db_load_pgdump_compressed(database1, database2)
+
+
+# Can a single table be restored while the rest of the DB stays put?
+# ---------- ---------- ---------- ---------- ---------- ---------- -
+def _test_db_load_selected_tables(db1: PostgreSQL, db2: PostgreSQL, shp: DataForTest):
+
+    dump_file = db1.db_export_pgdump_file(dump_format="custom", tables=[shp.NAME])
+
+    # A table that isn't in the dump and must survive the restore
+    db2.execute("CREATE TABLE IF NOT EXISTS untouched_table (id INT);")
+
+    db2.db_load_pgdump_file(dump_file, tables=[shp.NAME])
+
+    query = f"SELECT COUNT(*) FROM {shp.NAME}"
+
+    assert "untouched_table" in db2.all_tables_as_list()
+    assert db1.query_as_single_item(query) == db2.query_as_single_item(query)
+
+
+@test("PostgreSQL().db_load_pgdump_file(tables=...) restores only those tables")
+@using(database1=database_1, database2=database_2, shp=test_shp_data)
+def _(database1, database2, shp):
+    _test_db_load_selected_tables(database1, database2, shp)
+
+
+# Does a view on a restored table stop the restore, instead of being dropped?
+# ---------- ---------- ---------- ---------- ---------- ---------- ---------
+def _test_db_load_selected_tables_with_dependents(
+    db1: PostgreSQL, db2: PostgreSQL, shp: DataForTest
+):
+
+    dump_file = db1.db_export_pgdump_file(dump_format="custom", tables=[shp.NAME])
+
+    db2.db_load_pgdump_file(dump_file, tables=[shp.NAME])
+    db2.execute(f"CREATE OR REPLACE VIEW dependent_view AS SELECT * FROM {shp.NAME};")
+
+    error = None
+    try:
+        db2.db_load_pgdump_file(dump_file, tables=[shp.NAME])
+    except ValueError as e:
+        error = str(e)
+
+    view_survived = db2.query_as_single_item("SELECT to_regclass('dependent_view') IS NOT NULL")
+
+    db2.execute("DROP VIEW dependent_view;")
+
+    assert error and "dependent_view" in error
+    assert view_survived
+
+
+@test("PostgreSQL().db_load_pgdump_file(tables=...) won't drop dependent views")
+@using(database1=database_1, database2=database_2, shp=test_shp_data)
+def _(database1, database2, shp):
+    _test_db_load_selected_tables_with_dependents(database1, database2, shp)
+
+
+# Does a shadow restore swap in the new DB and keep the old one?
+# ---------- ---------- ---------- ---------- ---------- -------
+def _test_db_load_via_shadow(db1: PostgreSQL, db2: PostgreSQL):
+
+    dump_file = db1.db_export_pgdump_file(dump_format="custom")
+
+    old_name = db2.db_load_pgdump_file_via_shadow(dump_file, force=True)
+
+    old_db = PostgreSQL(old_name, verbosity="errors", **db2.connection_details())
+
+    assert set(db1.all_tables_as_list("public")) == set(db2.all_tables_as_list("public"))
+
+    old_db.db_delete()
+
+
+@test("PostgreSQL().db_load_pgdump_file_via_shadow() swaps in the restored DB")
+@using(database1=database_1, database2=database_2)
+def _(database1, database2):
+    _test_db_load_via_shadow(database1, database2)
+
+
+# Does the row count check let a matching dump through, and stop a bad one?
+# ---------- ---------- ---------- ---------- ---------- ---------- --------
+def _test_db_load_via_shadow_validation(db1: PostgreSQL, db2: PostgreSQL):
+
+    dump_file = db1.db_export_pgdump_file(dump_format="custom")
+
+    # Start db2 off with exactly what's in the dump, so validation passes
+    db2.db_load_pgdump_file(dump_file, overwrite=True)
+    old_name = db2.db_load_pgdump_file_via_shadow(dump_file)
+
+    old_db = PostgreSQL(old_name, verbosity="errors", lazy=True, **db2.connection_details())
+    old_db_existed = old_db.exists()
+    old_db.db_delete()
+
+    # A table that isn't in the dump would go missing, so this one must fail
+    db2.execute("CREATE TABLE only_in_live AS SELECT 1 AS id;")
+
+    error = None
+    try:
+        db2.db_load_pgdump_file_via_shadow(dump_file)
+    except RuntimeError as e:
+        error = e
+
+    still_live = "only_in_live" in db2.all_tables_as_list()
+
+    db2.execute("DROP TABLE only_in_live;")
+
+    assert old_db_existed
+    assert error is not None
+    assert still_live
+
+
+@test("PostgreSQL().db_load_pgdump_file_via_shadow() validates row counts before swapping")
+@using(database1=database_1, database2=database_2)
+def _(database1, database2):
+    _test_db_load_via_shadow_validation(database1, database2)
+
+
+# Is the old copy of a database with a long name kept under the name returned?
+# ---------- ---------- ---------- ---------- ---------- ---------- ----------
+def _test_db_load_via_shadow_long_name(db1: PostgreSQL):
+
+    dump_file = db1.db_export_pgdump_file(dump_format="custom")
+
+    long_db = PostgreSQL(
+        "test_shadow_restore_with_a_very_long_database_name",
+        verbosity="errors",
+        **db1.connection_details(),
+    )
+    long_db.db_load_pgdump_file(dump_file, overwrite=True)
+
+    old_name = long_db.db_load_pgdump_file_via_shadow(dump_file)
+
+    old_db = PostgreSQL(old_name, verbosity="errors", lazy=True, **db1.connection_details())
+    old_db_existed = old_db.exists()
+
+    old_db.db_delete()
+    long_db.db_delete()
+
+    assert len(old_name) <= 63
+    assert old_db_existed
+
+
+@test("PostgreSQL().db_load_pgdump_file_via_shadow() returns a real name for long DB names")
+@using(database1=database_1)
+def _(database1):
+    _test_db_load_via_shadow_long_name(database1)
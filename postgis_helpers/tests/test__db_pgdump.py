@@ -18,3 +18,42 @@ def _test_db_export_pgdump_file(db: PostgreSQL):
 @using(database=database_1)
 def _(database):
     _test_db_export_pgdump_file(database)
+
+
+# Does a parallel directory-format dump produce a folder and stats?
+# ---------- ---------- ---------- ---------- ---------- ---------- -
+def _test_db_export_pgdump_directory(db: PostgreSQL):
+
+    output_folder, stats = db.db_export_pgdump_file(
+        db.DATA_OUTBOX, dump_format="directory", jobs=2, return_stats=True
+    )
+
+    assert output_folder.is_dir()
+    assert (output_folder / "toc.dat").exists()
+    assert stats["bytes"] > 0
+
+
+@test("PostgreSQL().db_export_pgdump_file(dump_format='directory') creates a dump folder")
+@using(database=database_1)
+def _(database):
+    _test_db_export_pgdump_directory(database)
+
+
+# Does a compressed dump come with a matching checksum sidecar?
+# ---------- ---------- ---------- ---------- ---------- -------
+def _test_db_export_pgdump_compressed(db: PostgreSQL):
+
+    output_file, stats = db.db_export_pgdump_file(
+        db.DATA_OUTBOX, compress="gzip", return_stats=True
+    )
+
+    sidecar = output_file.with_name(output_file.name + ".sha256")
+
+    assert output_file.suffix == ".gz"
+    assert sidecar.read_text().split()[0] == stats["sha256"]
+
+
+@test("PostgreSQL().db_export_pgdump_file(compress='gzip') writes a .sha256 sidecar")
+@using(database=database_1)
+def _(database):
+    _test_db_export_pgdump_compressed(database)
@@ -0,0 +1,52 @@
+import json
+
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Does the GeoJSON export write one feature per row?
+# ---------- ---------- ---------- ---------- -----
+def _test_export_geojson_row_count(db: PostgreSQL, shp: DataForTest):
+
+    output_path = db.export_geojson(
+        shp.NAME, shp.EXPORT_FOLDER / f"{shp.NAME}.geojsonl"
+    )
+
+    with open(output_path) as open_file:
+        features = [json.loads(line) for line in open_file]
+
+    row_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+
+    assert len(features) == row_count
+    assert features[0]["type"] == "Feature"
+
+
+@test("PostgreSQL().export_geojson() writes one feature per row")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_export_geojson_row_count(database, shp)
+
+
+# Is the FeatureCollection output valid JSON?
+# ---------- ---------- ---------- ----------
+def _test_export_geojson_feature_collection(db: PostgreSQL, shp: DataForTest):
+
+    output_path = db.export_geojson(
+        f"SELECT * FROM {shp.NAME} LIMIT 10",
+        shp.EXPORT_FOLDER / f"{shp.NAME}.geojson",
+        newline_delimited=False,
+    )
+
+    with open(output_path) as open_file:
+        geojson = json.load(open_file)
+
+    assert geojson["type"] == "FeatureCollection"
+    assert len(geojson["features"]) == 10
+
+
+@test("PostgreSQL().export_geojson() writes a valid FeatureCollection")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_export_geojson_feature_collection(database, shp)
@@ -0,0 +1,75 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.grid_helpers import grid_vertices, coordinates_to_h3
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Are the numpy grid cells the right size, with no gaps or overlaps?
+# ---------- ---------- ---------- ---------- ----------
+def _test_grid_vertices(shape: str):
+    import shapely
+
+    cell_size = 0.5
+    chunks = list(grid_vertices(0, 0, 20000, 20000, cell_size, shape=shape, max_cells=100))
+
+    polygons = shapely.polygons(chunks[0])
+    areas = shapely.area(polygons)
+
+    union = shapely.union_all(polygons)
+
+    assert len(chunks) > 1
+    assert abs(areas.mean() - cell_size * 1000000) < 1
+    assert abs(union.area - areas.sum()) < 1
+
+
+@test("grid_helpers.grid_vertices() makes equal-area hexagons that tile")
+def _():
+    _test_grid_vertices("hexagon")
+
+
+@test("grid_helpers.grid_vertices() makes equal-area squares that tile")
+def _():
+    _test_grid_vertices("square")
+
+
+# Are points assigned to the right H3 cells?
+# ---------- ---------- ---------- ---------- ----------
+def _test_coordinates_to_h3():
+
+    # Philadelphia City Hall, and a point a few KM north-east of it
+    cells = coordinates_to_h3([39.95, 40.0], [-75.16, -75.1], 9)
+
+    assert cells.dtype == "int64"
+    assert list(cells) == [617733347175038975, 617733346460434431]
+
+
+@test("grid_helpers.coordinates_to_h3() matches known H3 cells")
+def _():
+    _test_coordinates_to_h3()
+
+
+# Does the numpy engine cover the same area as the SQL one?
+# ---------- ---------- ---------- ---------- ----------
+def _test_hexagon_overlay_numpy(db: PostgreSQL, shp: DataForTest):
+
+    kwargs = {"table_to_cover": shp.NAME, "desired_epsg": 2272, "hexagon_size": 5}
+
+    db.make_hexagon_overlay("test_hex_sql", **kwargs)
+    db.make_hexagon_overlay("test_hex_numpy", engine="numpy", **kwargs)
+
+    sql_count = db.query_as_single_item("SELECT COUNT(*) FROM test_hex_sql")
+    numpy_count = db.query_as_single_item("SELECT COUNT(*) FROM test_hex_numpy")
+
+    db.table_delete("test_hex_sql")
+    db.table_delete("test_hex_numpy")
+
+    # Unrounded cell dimensions can add or drop an edge row or column
+    assert numpy_count > 0
+    assert abs(numpy_count - sql_count) / sql_count < 0.1
+
+
+@test("PostgreSQL().make_hexagon_overlay(engine='numpy') creates a comparable grid")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_hexagon_overlay_numpy(database, shp)
@@ -0,0 +1,48 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Does every feature get an H3 cell at the requested resolution?
+# ---------- ---------- ---------- ---------- ----------
+def _test_table_add_h3_column(db: PostgreSQL, shp: DataForTest):
+
+    column = db.table_add_h3_column(shp.NAME, 8)
+
+    missing = db.query_as_single_item(
+        f"SELECT COUNT(*) FROM {shp.NAME} WHERE {column} IS NULL AND geom IS NOT NULL"
+    )
+
+    # Bits 52-55 of an H3 index hold its resolution
+    resolutions = db.query_as_list(
+        f"SELECT DISTINCT ({column} >> 52) & 15 FROM {shp.NAME} WHERE {column} IS NOT NULL"
+    )
+
+    assert missing == 0
+    assert resolutions == [(8,)]
+
+
+@test("PostgreSQL().table_add_h3_column() fills an H3 column for every feature")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_table_add_h3_column(database, shp)
+
+
+# Does every feature get a geohash of the requested length?
+# ---------- ---------- ---------- ---------- ----------
+def _test_table_add_geohash_column(db: PostgreSQL, shp: DataForTest):
+
+    column = db.table_add_geohash_column(shp.NAME, 7)
+
+    lengths = db.query_as_list(
+        f"SELECT DISTINCT length({column}) FROM {shp.NAME} WHERE geom IS NOT NULL"
+    )
+
+    assert lengths == [(7,)]
+
+
+@test("PostgreSQL().table_add_geohash_column() fills a geohash column for every feature")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_table_add_geohash_column(database, shp)
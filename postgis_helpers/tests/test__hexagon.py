@@ -22,3 +22,35 @@ def _test_hexagon_overlay(db: PostgreSQL, shp: DataForTest):
 @using(database=database_1, shp=test_shp_data)
 def _(database, shp):
     _test_hexagon_overlay(database, shp)
+
+
+# Do parallel strips and coverage clipping give the expected grids?
+# ---------- ---------- ---------- ---------- ----------
+def _test_hexagon_overlay_options(db: PostgreSQL, shp: DataForTest):
+
+    kwargs = {"table_to_cover": shp.NAME, "desired_epsg": 2272, "hexagon_size": 5}
+
+    db.make_hexagon_overlay("test_hex_serial", **kwargs)
+    db.make_hexagon_overlay("test_hex_parallel", workers=3, **kwargs)
+    db.make_hexagon_overlay("test_hex_clipped", clip_to_coverage=True, workers=3, **kwargs)
+
+    serial = db.query_as_single_item("SELECT COUNT(*) FROM test_hex_serial")
+    parallel = db.query_as_single_item("SELECT COUNT(*) FROM test_hex_parallel")
+    clipped = db.query_as_single_item("SELECT COUNT(*) FROM test_hex_clipped")
+
+    duplicates = db.query_as_single_item(
+        "SELECT COUNT(*) - COUNT(DISTINCT ST_AsBinary(geom)) FROM test_hex_parallel"
+    )
+
+    for table_name in ["test_hex_serial", "test_hex_parallel", "test_hex_clipped"]:
+        db.table_delete(table_name)
+
+    assert serial == parallel
+    assert duplicates == 0
+    assert 0 < clipped <= serial
+
+
+@test("PostgreSQL().make_hexagon_overlay() builds in parallel and clips to coverage")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_hexagon_overlay_options(database, shp)
@@ -0,0 +1,48 @@
+import sys
+import subprocess
+
+from ward import test
+
+HEAVY_MODULES = ["pandas", "geopandas", "sqlalchemy", "geoalchemy2", "psycopg2", "requests"]
+
+
+def _modules_imported_by(statement: str) -> dict:
+    """
+    Run ``statement`` in a fresh interpreter with ``-X importtime``
+    and return ``{module_name: cumulative_microseconds}``
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+
+    return modules
+
+
+# Does the CLI start without loading the heavy dependencies?
+# ---------- ---------- ---------- ---------- ----------
+def _test_cli_import_is_light():
+
+    modules = _modules_imported_by("import postgis_helpers.cli")
+
+    assert "postgis_helpers.cli" in modules
+
+    for heavy_module in HEAVY_MODULES:
+        assert heavy_module not in modules
+
+
+@test("Importing postgis_helpers.cli doesn't import pandas, geopandas, etc.")
+def _():
+    _test_cli_import_is_light()
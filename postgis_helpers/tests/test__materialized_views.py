@@ -0,0 +1,151 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+def _make_layered_views(db: PostgreSQL, shp: DataForTest) -> str:
+
+    geom_type = db.query_as_single_item(
+        f"SELECT type FROM geometry_columns WHERE f_table_name = '{shp.NAME}'"
+    )
+
+    db.execute(
+        f"""
+        DROP TABLE IF EXISTS test_mv_source CASCADE;
+        CREATE TABLE test_mv_source AS SELECT * FROM {shp.NAME};
+    """
+    )
+
+    db.make_materialized_geoview("SELECT * FROM test_mv_source", "test_mv_base", geom_type, 2272)
+    db.make_materialized_geoview(
+        "SELECT * FROM test_mv_base WHERE uid % 2 = 0", "test_mv_even", geom_type, 2272
+    )
+    db.make_materialized_geoview(
+        "SELECT * FROM test_mv_base WHERE uid % 2 = 1", "test_mv_odd", geom_type, 2272
+    )
+
+    return geom_type
+
+
+def _drop_layered_views(db: PostgreSQL) -> None:
+    db.execute("DROP TABLE test_mv_source CASCADE;")
+
+
+# Are dependencies between views found?
+# ---------- ---------- ---------- ---------- ----------
+def _test_materialized_view_dependencies(db: PostgreSQL, shp: DataForTest):
+
+    _make_layered_views(db, shp)
+
+    views = db.all_materialized_views_as_dict()
+    spatial_tables = db.all_spatial_tables_as_dict()
+
+    _drop_layered_views(db)
+
+    assert views["test_mv_base"] == []
+    assert views["test_mv_even"] == ["test_mv_base"]
+    assert views["test_mv_odd"] == ["test_mv_base"]
+    assert spatial_tables["test_mv_base"] == 2272
+
+
+@test("all_materialized_views_as_dict() finds the views each view reads from")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_materialized_view_dependencies(database, shp)
+
+
+# Do upstream changes reach every layer?
+# ---------- ---------- ---------- ---------- ----------
+def _test_refresh_all(db: PostgreSQL, shp: DataForTest):
+
+    _make_layered_views(db, shp)
+
+    db.execute("DELETE FROM test_mv_source WHERE uid IN (SELECT MIN(uid) FROM test_mv_source)")
+    source_count = db.query_as_single_item("SELECT COUNT(*) FROM test_mv_source")
+
+    runtimes = db.refresh_all(workers=2)
+
+    view_count = db.query_as_single_item(
+        "SELECT (SELECT COUNT(*) FROM test_mv_even) + (SELECT COUNT(*) FROM test_mv_odd)"
+    )
+
+    _drop_layered_views(db)
+
+    assert sorted(runtimes) == ["test_mv_base", "test_mv_even", "test_mv_odd"]
+    assert view_count == source_count
+
+
+@test("refresh_all() refreshes views after the views they read from")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_refresh_all(database, shp)
+
+
+# Can a view be redefined while readers use it?
+# ---------- ---------- ---------- ---------- ----------
+def _test_redefine_materialized_view(db: PostgreSQL, shp: DataForTest):
+
+    geom_type = db.query_as_single_item(
+        f"SELECT type FROM geometry_columns WHERE f_table_name = '{shp.NAME}'"
+    )
+
+    db.make_materialized_geoview(f"SELECT * FROM {shp.NAME}", "test_mv_redefine", geom_type, 2272)
+    db.refresh("test_mv_redefine")
+
+    db.make_materialized_geoview(
+        f"SELECT * FROM {shp.NAME} WHERE uid < 10", "test_mv_redefine", geom_type, 2272
+    )
+
+    max_uid = db.query_as_single_item("SELECT MAX(uid) FROM test_mv_redefine")
+    indexed = db.table_has_spatial_index("test_mv_redefine")
+
+    db.execute("DROP MATERIALIZED VIEW test_mv_redefine;")
+
+    assert max_uid < 10
+    assert indexed
+
+
+@test("make_materialized_geoview() swaps in a new definition")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_redefine_materialized_view(database, shp)
+
+
+# Do two long view names that start the same way get their own indexes?
+# ---------- ---------- ---------- ---------- ----------
+def _test_materialized_view_long_names(db: PostgreSQL, shp: DataForTest):
+
+    geom_type = db.query_as_single_item(
+        f"SELECT type FROM geometry_columns WHERE f_table_name = '{shp.NAME}'"
+    )
+
+    prefix = "test_mv_" + "x" * 53
+    views = [f"{prefix}_a", f"{prefix}_b"]
+
+    for view_name in views:
+        db.make_materialized_geoview(f"SELECT * FROM {shp.NAME}", view_name, geom_type, 2272)
+
+    # Redefining one swaps it in under its full name
+    db.make_materialized_geoview(
+        f"SELECT * FROM {shp.NAME} WHERE uid < 10", views[0], geom_type, 2272
+    )
+
+    index_counts = db.query_as_list(
+        f"""
+        SELECT tablename, COUNT(*) FROM pg_indexes
+        WHERE tablename LIKE '{prefix}%'
+        GROUP BY tablename ORDER BY tablename
+    """
+    )
+
+    for view_name in views:
+        db.execute(f"DROP MATERIALIZED VIEW {view_name};")
+
+    assert index_counts == [(views[0], 2), (views[1], 2)]
+
+
+@test("make_materialized_geoview() keeps long index names unique")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_materialized_view_long_names(database, shp)
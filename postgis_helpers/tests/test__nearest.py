@@ -0,0 +1,44 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Does every feature get k ranked neighbors, matching a brute-force search?
+# ---------- ---------- ---------- ---------- ----------
+def _test_nearest(db: PostgreSQL, shp: DataForTest):
+
+    db.nearest(shp.NAME, shp.NAME, "test_nearest", k=3, workers=2)
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+    output_count = db.query_as_single_item("SELECT COUNT(*) FROM test_nearest")
+    self_matches = db.query_as_single_item(
+        "SELECT COUNT(*) FROM test_nearest WHERE src_id = target_id"
+    )
+
+    # Compare the closest neighbor with a brute-force search, for a sample
+    mismatches = db.query_as_single_item(
+        f"""
+        SELECT COUNT(*)
+        FROM test_nearest n
+        JOIN {shp.NAME} s ON s.uid = n.src_id
+        WHERE n.rank = 1 AND n.src_id % 50 = 0
+          AND n.distance > (
+            SELECT MIN(ST_Distance(s.geom, t.geom))
+            FROM {shp.NAME} t
+            WHERE t.uid <> s.uid
+          ) + 0.001
+    """
+    )
+
+    db.table_delete("test_nearest")
+
+    assert output_count == 3 * source_count
+    assert self_matches == 0
+    assert mismatches == 0
+
+
+@test("PostgreSQL().nearest() finds the k closest features for every feature")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_nearest(database, shp)
@@ -0,0 +1,132 @@
+import hashlib
+
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+def _partition_names(db: PostgreSQL, table_name: str) -> list:
+    return [
+        row[0]
+        for row in db.query_as_list(
+            f"""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = '{table_name}'::regclass
+        """
+        )
+    ]
+
+
+# Are monthly partitions made, filled, and removable?
+# ---------- ---------- ---------- ---------- ----------
+def _test_range_partitioned_geotable(db: PostgreSQL, shp: DataForTest):
+
+    geom_type = db.query_as_single_item(
+        f"SELECT type FROM geometry_columns WHERE f_table_name = '{shp.NAME}'"
+    )
+
+    query = f"""
+        SELECT *, (DATE '2020-01-01' + (uid % 24) * interval '1 month')::date AS event_date
+        FROM {shp.NAME}
+    """
+    db.make_geotable_from_query(
+        query, "test_partitioned", geom_type, 2272, partition_by="event_date"
+    )
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+    loaded_count = db.query_as_single_item("SELECT COUNT(*) FROM test_partitioned")
+    partitions = _partition_names(db, "test_partitioned")
+
+    removed = db.table_detach_partitions("test_partitioned", older_than="2021-01-01")
+    remaining_dates = db.query_as_single_item(
+        "SELECT MIN(event_date) FROM test_partitioned"
+    )
+
+    db.table_delete("test_partitioned")
+
+    assert loaded_count == source_count
+    assert "test_partitioned_2020_01" in partitions
+    assert len(partitions) == min(source_count, 24)
+    assert len(removed) == min(source_count, 12)
+    assert str(remaining_dates) >= "2021-01-01"
+
+
+@test("make_geotable_from_query(partition_by=...) makes range partitions that can be dropped")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_range_partitioned_geotable(database, shp)
+
+
+# Does each partition get its own spatial index?
+# ---------- ---------- ---------- ---------- ----------
+def _test_list_partitioned_geotable(db: PostgreSQL, shp: DataForTest):
+
+    geom_type = db.query_as_single_item(
+        f"SELECT type FROM geometry_columns WHERE f_table_name = '{shp.NAME}'"
+    )
+
+    query = f"SELECT *, 'region ' || (uid % 3) AS region FROM {shp.NAME}"
+    db.make_geotable_from_query(
+        query,
+        "test_partitioned_list",
+        geom_type,
+        2272,
+        partition_by="region",
+        partition_method="list",
+    )
+
+    partitions = _partition_names(db, "test_partitioned_list")
+    indexed = [p for p in partitions if db.table_has_spatial_index(p)]
+
+    db.table_delete("test_partitioned_list")
+
+    assert sorted(partitions) == sorted(
+        f"test_partitioned_list_region_{i}_{hashlib.md5(f'region {i}'.encode()).hexdigest()[:6]}"
+        for i in range(3)
+    )
+    assert indexed == partitions
+
+
+@test("make_geotable_from_query(partition_method='list') indexes every partition")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_list_partitioned_geotable(database, shp)
+
+
+# Do values that look alike get their own partitions, load after load?
+# ---------- ---------- ---------- ---------- ----------
+def _test_list_partition_names_collide(db: PostgreSQL, shp: DataForTest):
+
+    for if_exists in ["replace", "append"]:
+        db.execute(
+            f"""
+            DROP TABLE IF EXISTS test_partitioned_alike_staging;
+            CREATE TABLE test_partitioned_alike_staging AS
+            SELECT *, CASE WHEN uid % 2 = 0 THEN 'Region 1' ELSE 'region-1' END AS region
+            FROM {shp.NAME};
+        """
+        )
+        db._load_partitioned(
+            "test_partitioned_alike_staging",
+            "test_partitioned_alike",
+            "region",
+            method="list",
+            if_exists=if_exists,
+        )
+
+    partitions = _partition_names(db, "test_partitioned_alike")
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+    loaded_count = db.query_as_single_item("SELECT COUNT(*) FROM test_partitioned_alike")
+
+    db.table_delete("test_partitioned_alike")
+
+    assert len(partitions) == 2
+    assert loaded_count == 2 * source_count
+
+
+@test("PostgreSQL()._load_partitioned() keeps look-alike list values apart across loads")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_list_partition_names_collide(database, shp)
@@ -0,0 +1,61 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import (
+    DataForTest,
+    database_1,
+    database_2,
+    test_shp_data,
+)
+
+
+# Does a second replication run only copy the new rows?
+# ---------- ---------- ---------- ---------- ---------- -
+def _test_replicate_incremental(db1: PostgreSQL, db2: PostgreSQL, shp: DataForTest):
+
+    table_name = shp.NAME
+
+    # Start from scratch on the target
+    db2.execute(f"DROP TABLE IF EXISTS {table_name} CASCADE;")
+    db2.execute("DROP TABLE IF EXISTS pgis_replication_watermarks;")
+
+    first_run = db1.replicate_incremental(table_name, db2, watermark_column="uid")
+    second_run = db1.replicate_incremental(table_name, db2, watermark_column="uid")
+
+    query = f"SELECT COUNT(*) FROM {table_name}"
+
+    assert first_run == db1.query_as_single_item(query)
+    assert second_run == 0
+    assert db2.query_as_single_item(query) == first_run
+
+
+@test("PostgreSQL().replicate_incremental() copies only rows past the watermark")
+@using(database1=database_1, database2=database_2, shp=test_shp_data)
+def _(database1, database2, shp):
+    _test_replicate_incremental(database1, database2, shp)
+
+
+# Does replicating onto an earlier full copy skip the rows it has?
+# ---------- ---------- ---------- ---------- ---------- ---------- -
+def _test_replicate_onto_existing_table(db1: PostgreSQL, db2: PostgreSQL, shp: DataForTest):
+
+    table_name = shp.NAME
+
+    db2.execute("DROP TABLE IF EXISTS pgis_replication_watermarks;")
+    db1.transfer_data_to_another_db(table_name, db2)
+
+    # Leave the newest row out of the copy
+    db2.execute(f"DELETE FROM {table_name} WHERE uid = (SELECT MAX(uid) FROM {table_name});")
+
+    rows_copied = db1.replicate_incremental(table_name, db2, watermark_column="uid")
+
+    query = f"SELECT COUNT(*) FROM {table_name}"
+
+    assert rows_copied == 1
+    assert db2.query_as_single_item(query) == db1.query_as_single_item(query)
+
+
+@test("PostgreSQL().replicate_incremental() doesn't duplicate rows already on the target")
+@using(database1=database_1, database2=database_2, shp=test_shp_data)
+def _(database1, database2, shp):
+    _test_replicate_onto_existing_table(database1, database2, shp)
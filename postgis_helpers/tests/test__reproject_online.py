@@ -0,0 +1,74 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Does an online reprojection match a regular ST_Transform()?
+# ---------- ---------- ---------- ---------- ----------
+def _test_reproject_online(db: PostgreSQL, shp: DataForTest):
+
+    geom_type = db.query_as_single_item(
+        f"SELECT type FROM geometry_columns WHERE f_table_name = '{shp.NAME}'"
+    )
+
+    db.execute(
+        f"""
+        DROP TABLE IF EXISTS test_reproject_online;
+        CREATE TABLE test_reproject_online AS SELECT * FROM {shp.NAME};
+        ALTER TABLE test_reproject_online ADD PRIMARY KEY (uid);
+    """
+    )
+
+    row_count = db.query_as_single_item("SELECT COUNT(*) FROM test_reproject_online")
+
+    db.table_reproject_spatial_data(
+        "test_reproject_online",
+        2272,
+        4326,
+        geom_type,
+        online=True,
+        batch_size=max(row_count // 5, 1),
+    )
+
+    # Running it again (as after an interruption late in the first run)
+    # must not transform the already-reprojected geometries a second time
+    db.table_reproject_spatial_data(
+        "test_reproject_online",
+        2272,
+        4326,
+        geom_type,
+        online=True,
+        batch_size=max(row_count // 5, 1),
+    )
+
+    mismatches = db.query_as_single_item(
+        f"""
+        SELECT COUNT(*)
+        FROM test_reproject_online r
+        JOIN {shp.NAME} s ON s.uid = r.uid
+        WHERE NOT ST_Equals(r.geom, ST_Transform(s.geom, 4326))
+    """
+    )
+
+    epsg = db.all_spatial_tables_as_dict()["test_reproject_online"]
+    has_index = db.table_has_spatial_index("test_reproject_online")
+    index_count = db.query_as_single_item(
+        "SELECT COUNT(*) FROM pg_indexes WHERE tablename = 'test_reproject_online' "
+        "AND indexdef LIKE '%gist%'"
+    )
+    columns = db.table_columns_as_list("test_reproject_online")
+
+    db.table_delete("test_reproject_online")
+
+    assert mismatches == 0
+    assert epsg == 4326
+    assert has_index
+    assert index_count == 1
+    assert "geom_reprojected" not in columns
+
+
+@test("PostgreSQL().table_reproject_spatial_data(online=True) reprojects in batches")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_reproject_online(database, shp)
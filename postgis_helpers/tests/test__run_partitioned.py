@@ -0,0 +1,118 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Does every feature come out exactly once from quadtree tiles?
+# ---------- ---------- ---------- ---------- ----------
+def _test_run_partitioned_quadtree(db: PostgreSQL, shp: DataForTest):
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+
+    tiles = db.quadtree_tiles(shp.NAME, max_rows_per_tile=max(source_count // 8, 1))
+
+    timings = db.run_partitioned(
+        f"SELECT uid, geom FROM {shp.NAME} WHERE geom && {{tile}}",
+        tiles,
+        "test_partitioned_quadtree",
+        workers=3,
+    )
+
+    output_count = db.query_as_single_item("SELECT COUNT(*) FROM test_partitioned_quadtree")
+    distinct_count = db.query_as_single_item(
+        "SELECT COUNT(DISTINCT uid) FROM test_partitioned_quadtree"
+    )
+
+    db.table_delete("test_partitioned_quadtree")
+
+    assert len(tiles) > 1
+    assert len(timings) == len(tiles)
+    assert output_count == distinct_count == source_count
+
+
+@test("PostgreSQL().run_partitioned() over quadtree tiles keeps each feature once")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_run_partitioned_quadtree(database, shp)
+
+
+# Does every feature come out exactly once from a hexagon grid?
+# ---------- ---------- ---------- ---------- ----------
+def _test_run_partitioned_hexagons(db: PostgreSQL, shp: DataForTest):
+
+    db.make_hexagon_overlay("test_partition_hexagons", shp.NAME, 2272, 50)
+
+    db.run_partitioned(
+        f"SELECT uid, geom FROM {shp.NAME} WHERE geom && {{tile}}",
+        "test_partition_hexagons",
+        "test_partitioned_hexagons",
+    )
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+    output_count = db.query_as_single_item("SELECT COUNT(*) FROM test_partitioned_hexagons")
+
+    db.table_delete("test_partitioned_hexagons")
+    db.table_delete("test_partition_hexagons")
+
+    assert output_count == source_count
+
+
+@test("PostgreSQL().run_partitioned() over a hexagon grid keeps each feature once")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_run_partitioned_hexagons(database, shp)
+
+
+# Are buffers that reach into other tiles kept once each, by key?
+# ---------- ---------- ---------- ---------- ----------
+def _test_run_partitioned_key_columns(db: PostgreSQL, shp: DataForTest):
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+
+    tiles = db.quadtree_tiles(shp.NAME, max_rows_per_tile=max(source_count // 8, 1))
+
+    db.run_partitioned(
+        f"SELECT uid, ST_Buffer(geom, 500) AS geom FROM {shp.NAME} WHERE geom && {{tile}}",
+        tiles,
+        "test_partitioned_buffers",
+        key_columns=["uid"],
+    )
+
+    output_count = db.query_as_single_item("SELECT COUNT(*) FROM test_partitioned_buffers")
+
+    db.table_delete("test_partitioned_buffers")
+
+    assert output_count == source_count
+
+
+@test("PostgreSQL().run_partitioned(key_columns=...) keeps each buffered feature once")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_run_partitioned_key_columns(database, shp)
+
+
+# Are aggregates, which return one row per tile, refused?
+# ---------- ---------- ---------- ---------- ----------
+def _test_run_partitioned_refuses_aggregates(db: PostgreSQL, shp: DataForTest):
+
+    tiles = db.quadtree_tiles(shp.NAME)
+
+    error = None
+    try:
+        db.run_partitioned(
+            f"SELECT ST_Union(geom) AS geom FROM {shp.NAME} WHERE geom && {{tile}}",
+            tiles,
+            "test_partitioned_union",
+        )
+    except ValueError as e:
+        error = e
+
+    assert error is not None
+    assert "test_partitioned_union" not in db.all_tables_as_list()
+
+
+@test("PostgreSQL().run_partitioned() refuses a query that aggregates each tile")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_run_partitioned_refuses_aggregates(database, shp)
@@ -0,0 +1,131 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Can every index method be built and measured?
+# ---------- ---------- ---------- ---------- ----------
+def _test_compare_spatial_indexes(db: PostgreSQL, shp: DataForTest):
+
+    results = db.table_compare_spatial_indexes(shp.NAME)
+
+    leftover_indexes = db.query_as_single_item(
+        f"""
+        SELECT COUNT(*) FROM pg_indexes
+        WHERE tablename = '{shp.NAME}'
+          AND indexname LIKE 'pgis_compare_%'
+    """
+    )
+
+    assert set(results) == {"gist", "spgist", "brin"}
+    assert all(r["bytes"] > 0 for r in results.values())
+    assert results["brin"]["bytes"] <= results["gist"]["bytes"]
+    assert leftover_indexes == 0
+
+
+@test("PostgreSQL().table_compare_spatial_indexes() reports size and build time")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_compare_spatial_indexes(database, shp)
+
+
+# Does clustering by geohash keep every row and leave a usable index?
+# ---------- ---------- ---------- ---------- ----------
+def _test_spatial_index_cluster(db: PostgreSQL, shp: DataForTest):
+
+    db.execute(
+        f"""
+        DROP TABLE IF EXISTS test_index_cluster;
+        CREATE TABLE test_index_cluster AS SELECT * FROM {shp.NAME};
+    """
+    )
+
+    stats = db.table_add_spatial_index(
+        "test_index_cluster", method="brin", concurrently=True, cluster="geohash"
+    )
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+    clustered_count = db.query_as_single_item("SELECT COUNT(*) FROM test_index_cluster")
+
+    db.table_delete("test_index_cluster")
+
+    assert stats["index"] == "test_index_cluster_geom_brin_idx"
+    assert stats["cluster_seconds"] is not None
+    assert clustered_count == source_count
+
+
+@test("PostgreSQL().table_add_spatial_index(cluster='geohash') rewrites the table in order")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_spatial_index_cluster(database, shp)
+
+
+# Do two long table names that start the same way get their own indexes?
+# ---------- ---------- ---------- ---------- ----------
+def _test_spatial_index_long_names(db: PostgreSQL, shp: DataForTest):
+
+    prefix = "test_index_" + "x" * 50
+    tables = [f"{prefix}_a", f"{prefix}_b"]
+
+    for table in tables:
+        db.execute(
+            f"""
+            DROP TABLE IF EXISTS {table};
+            CREATE TABLE {table} AS SELECT * FROM {shp.NAME};
+        """
+        )
+
+    stats = [db.table_add_spatial_index(table) for table in tables]
+
+    index_tables = db.query_as_list(
+        f"""
+        SELECT tablename FROM pg_indexes
+        WHERE indexname IN ('{stats[0]["index"]}', '{stats[1]["index"]}')
+    """
+    )
+
+    for table in tables:
+        db.table_delete(table)
+
+    assert stats[0]["index"] != stats[1]["index"]
+    assert all(len(s["index"]) <= 63 for s in stats)
+    assert sorted(row[0] for row in index_tables) == tables
+
+
+@test("PostgreSQL().table_add_spatial_index() keeps long index names unique")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_spatial_index_long_names(database, shp)
+
+
+# Can a geodataframe be appended to a table that already has its index?
+# ---------- ---------- ---------- ---------- ----------
+def _test_spatial_index_append(db: PostgreSQL, shp: DataForTest):
+
+    query = f"SELECT uid AS src_uid, geom FROM {shp.NAME}"
+
+    for if_exists in ["replace", "append"]:
+        gdf = db.query_as_geo_df(query)
+        db.import_geodataframe(gdf, "test_index_append", if_exists=if_exists)
+
+    source_count = db.query_as_single_item(f"SELECT COUNT(*) FROM {shp.NAME}")
+    appended_count = db.query_as_single_item("SELECT COUNT(*) FROM test_index_append")
+    gist_indexes = db.query_as_single_item(
+        """
+        SELECT COUNT(*) FROM pg_indexes
+        WHERE tablename = 'test_index_append'
+          AND indexname = 'test_index_append_geom_gist_idx'
+    """
+    )
+
+    db.table_delete("test_index_append")
+
+    assert appended_count == 2 * source_count
+    assert gist_indexes == 1
+
+
+@test("PostgreSQL().import_geodataframe(if_exists='append') keeps the existing index")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_spatial_index_append(database, shp)
@@ -0,0 +1,92 @@
+from ward import test, using
+
+from postgis_helpers import PostgreSQL
+from postgis_helpers.tests.fixtures import DataForTest, database_1, test_shp_data
+
+
+# Does every feature get joined to the hexagons it touches?
+# ---------- ---------- ---------- ---------- ----------
+def _test_spatial_join(db: PostgreSQL, shp: DataForTest):
+
+    db.make_hexagon_overlay("test_sjoin_hexagons", shp.NAME, 2272, 5)
+
+    db.spatial_join(shp.NAME, "test_sjoin_hexagons", "test_sjoin_result")
+
+    columns = db.table_columns_as_list("test_sjoin_result")
+    unmatched = db.query_as_single_item(
+        f"""
+        SELECT COUNT(*) FROM {shp.NAME} s
+        WHERE NOT EXISTS (SELECT 1 FROM test_sjoin_result j WHERE j.left_uid = s.uid)
+    """
+    )
+
+    db.table_delete("test_sjoin_result")
+    db.table_delete("test_sjoin_hexagons")
+
+    assert "test_sjoin_hexagons_gid" in columns
+    assert "left_uid" in columns
+    assert unmatched == 0
+
+
+@test("PostgreSQL().spatial_join() joins every feature to the hexagons it touches")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_spatial_join(database, shp)
+
+
+# Is 'dwithin' a superset of 'intersects'?
+# ---------- ---------- ---------- ---------- ----------
+def _test_spatial_join_dwithin(db: PostgreSQL, shp: DataForTest):
+
+    db.spatial_join(shp.NAME, shp.NAME, "test_sjoin_touching")
+    db.spatial_join(shp.NAME, shp.NAME, "test_sjoin_nearby", predicate="dwithin", distance=500)
+
+    touching = db.query_as_single_item("SELECT COUNT(*) FROM test_sjoin_touching")
+    nearby = db.query_as_single_item("SELECT COUNT(*) FROM test_sjoin_nearby")
+
+    db.table_delete("test_sjoin_touching")
+    db.table_delete("test_sjoin_nearby")
+
+    assert nearby >= touching > 0
+
+
+@test("PostgreSQL().spatial_join(predicate='dwithin') finds at least the intersecting pairs")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_spatial_join_dwithin(database, shp)
+
+
+# Does a left table with an untyped geometry column still get saved?
+# ---------- ---------- ---------- ---------- ----------
+def _test_spatial_join_untyped(db: PostgreSQL, shp: DataForTest):
+
+    db.execute(
+        f"""
+        DROP TABLE IF EXISTS test_sjoin_untyped;
+        CREATE TABLE test_sjoin_untyped AS
+        SELECT uid, geom::geometry AS geom FROM {shp.NAME};
+    """
+    )
+
+    db.spatial_join("test_sjoin_untyped", shp.NAME, "test_sjoin_untyped_result")
+
+    saved_type, saved_srid = db.query_as_list(
+        """
+        SELECT type, srid FROM geometry_columns
+        WHERE f_table_name = 'test_sjoin_untyped_result'
+    """
+    )[0]
+    joined = db.query_as_single_item("SELECT COUNT(*) FROM test_sjoin_untyped_result")
+
+    db.table_delete("test_sjoin_untyped_result")
+    db.table_delete("test_sjoin_untyped")
+
+    assert saved_type != "GEOMETRY"
+    assert saved_srid == shp.EPSG
+    assert joined > 0
+
+
+@test("PostgreSQL().spatial_join() reads the type and SRID of an untyped geometry column")
+@using(database=database_1, shp=test_shp_data)
+def _(database, shp):
+    _test_spatial_join_untyped(database, shp)